@@ -0,0 +1,159 @@
+# ------------ Imports
+import math
+import numpy as np
+import pandas as pd
+
+INITIAL_RATING = 1500
+# Non-elite events: fixed K
+DEFAULT_K = 6
+# Elite events: K = ELITE_BASE_K + (seconds the winner finished ahead) / ELITE_MARGIN_SECONDS
+ELITE_BASE_K = 12
+ELITE_MARGIN_SECONDS = 60
+
+
+# ------------ ELO Calculation
+class EloRatings:
+    """
+    Elo ratings of every athlete, kept in a NumPy array indexed by athlete.
+
+    Each event is a round robin of its finish order: every athlete beats every
+    athlete who finished behind them. Matchups are applied in that order (winner
+    1 against 2, 3, ..., then winner 2 against 3, ...), each using the ratings
+    left by the previous one, without building a matchups table.
+
+    Args:
+    initial_rating: Rating of an athlete in their first event.
+    """
+    def __init__(self, initial_rating=INITIAL_RATING):
+        self.initial_rating = initial_rating
+        self.names = []
+        self.index = {}
+        self.ratings = np.empty(0, dtype=np.float64)
+
+    def get_indices(self, names):
+        """
+        Integer index of every name, adding new athletes at the initial rating.
+        """
+        indices = np.empty(len(names), dtype=np.int64)
+        new_names = []
+        for position, name in enumerate(names):
+            index = self.index.get(name)
+            if index is None:
+                index = len(self.names)
+                self.index[name] = index
+                self.names.append(name)
+                new_names.append(name)
+            indices[position] = index
+        if new_names:
+            self.ratings = np.concatenate([self.ratings, np.full(len(new_names), float(self.initial_rating))])
+        return indices
+
+    def apply_event(self, names, total_seconds, event_elite):
+        """
+        Applies one event.
+
+        Args:
+        names: Athletes in finish order (fastest first).
+        total_seconds: Their finish times, same order.
+        event_elite: "Yes" for elite events (margin based K), anything else for fixed K.
+
+        Returns:
+        Indices of the event's athletes, in finish order.
+        """
+        indices = self.get_indices(names)
+        # Work on plain floats for the field: one slot per distinct athlete
+        slots_of, slots = np.unique(indices, return_inverse=True)
+        field = self.ratings[slots_of].tolist()
+        slots = slots.tolist()
+        seconds = [float(value) for value in total_seconds]
+        elite = event_elite == "Yes"
+        num_athletes = len(slots)
+        for i in range(num_athletes):
+            winner = slots[i]
+            winner_seconds = seconds[i]
+            for j in range(i + 1, num_athletes):
+                loser = slots[j]
+                winner_rating = field[winner]
+                loser_rating = field[loser]
+                if elite:
+                    k = ELITE_BASE_K + ((-1 * (winner_seconds - seconds[j])) / ELITE_MARGIN_SECONDS)
+                else:
+                    k = DEFAULT_K
+                # Expected score (probability of winning) of the winner
+                expected_score_winner = 1 / (1 + 10 ** ((loser_rating - winner_rating) / 400))
+                expected_score_loser = 1 - expected_score_winner
+                field[winner] = winner_rating + k * (1 - expected_score_winner)
+                field[loser] = loser_rating + k * (0 - expected_score_loser)
+        self.ratings[slots_of] = field
+        return indices
+
+    def to_frame(self):
+        """
+        Ratings as a DataFrame of clean_name, elo_rating, highest rated first.
+        """
+        return (
+            pd.DataFrame({"clean_name": self.names, "elo_rating": self.ratings})
+            .sort_values(["elo_rating"], ascending=False, kind="stable")
+            .reset_index(drop=True)
+        )
+
+
+# ------------ Data Prep
+def get_elo_prep_df(race_finisher_df, events, divisions=["Pro Men", "Elite Men"], time_group="sub_65"):
+    """
+    Finishers of the given divisions inside time_group, with the event Order and
+    elite flag from data/hyrox_events.csv, in event order.
+    """
+    race_finishers = (
+        race_finisher_df[race_finisher_df["race_division"].isin(divisions)]
+        .merge(
+            events,
+            how="left",
+            left_on = ["event_name", "season"],
+            right_on = ["Event Name", "season"]
+        )
+    )
+    return (
+        race_finishers[race_finishers[time_group]]
+        [["clean_name", "event_name", "Order", "elite", "total_seconds"]]
+        .reset_index(drop=True)
+        .sort_values("Order", kind="stable")
+    )
+
+
+def event_sort_key(order, event_name):
+    """
+    Events are rated by Order, then name; events without an Order go last.
+    """
+    return (math.inf if pd.isna(order) else float(order), event_name)
+
+
+def iter_events(elo_prep_df):
+    """
+    Yields (event_name, order, names, total_seconds, event_elite) per event in
+    event order (see event_sort_key), athletes in finish order.
+    """
+    event_groups = dict(tuple(elo_prep_df.groupby("event_name", sort=False)))
+    orders = {event_name: event_df["Order"].min() for event_name, event_df in event_groups.items()}
+    for event_name in sorted(event_groups, key=lambda name: event_sort_key(orders[name], name)):
+        event_df = event_groups[event_name].sort_values("total_seconds", kind="stable")
+        yield (
+            event_name,
+            orders[event_name],
+            event_df["clean_name"].tolist(),
+            event_df["total_seconds"].to_numpy(dtype=np.float64),
+            event_df["elite"].iloc[0]
+        )
+
+
+def compute_elo_ratings(elo_prep_df, initial_rating=INITIAL_RATING):
+    """
+    Elo ratings over every event of elo_prep_df (see get_elo_prep_df).
+
+    Returns:
+    (ratings_df, elo): ratings as a DataFrame sorted by rating, and the EloRatings state.
+    """
+    elo = EloRatings(initial_rating)
+    for _, _, names, total_seconds, event_elite in iter_events(elo_prep_df):
+        elo.apply_event(names, total_seconds, event_elite)
+    return elo.to_frame(), elo
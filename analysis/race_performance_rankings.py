@@ -11,131 +11,91 @@ from functions.data_functions import (
     get_elites_athletes,
     get_race_finisher_df
 )
+from functions.summary_results import (
+    clean_summary_results,
+    combine_finishers,
+    get_summary_finisher_df,
+    load_summary
+)
+from functions.athlete_index import AthleteIndex, add_athlete_ids
+from functions.athlete_history import AthleteHistoryStore
+from analysis.elo_ratings import get_elo_prep_df
+from analysis.rating_state import RatingState, verify_against_full_recompute
 import pandas as pd
-pd.set_option("display.precision", 2)
 
 # ------------ Data Paths
-results_path = "../data/hyrox_results_pro.csv"
-event_path = "../data/hyrox_events.csv"
-
-# ------------ Clean Results
-clean_results = get_clean_results(results_path)
-elite_athletes = get_elites_athletes(clean_results)
-events = pd.read_csv(event_path)
-race_finisher_df = get_race_finisher_df(clean_results, elite_athletes)
-race_finishers_pro_men = (
-    race_finisher_df[race_finisher_df["race_division"]
-    .isin(["Pro Men", "Elite Men"])]
-    .merge(
-        events,
-        how="left",
-        left_on = ["event_name", "season"],
-        right_on = ["Event Name", "season"]
-    )
-)
-
-# ------------ ELO Data Prep
-## Find first occurance of sub 65 time (sub 75 for women)
-elo_prep_df = (
-    race_finishers_pro_men[race_finishers_pro_men["sub_65"]]
-    [["clean_name", "event_name", "Order", "elite", "total_seconds"]]
-    .reset_index(drop=True)
-    .sort_values("Order")
-)
-
-# Initialize Elo ratings for each athlete
-initial_rating = 1500
-ratings = elo_prep_df["clean_name"].unique()
-ratings = pd.DataFrame(ratings, columns=["clean_name"])
-ratings["elo_rating"] = initial_rating
-
-# Generate pairwise matchups from each race
-matchups = []
-
-for event in elo_prep_df["event_name"].unique():
-    event_df = elo_prep_df[elo_prep_df["event_name"] == event].sort_values("total_seconds")
-    athletes = event_df["clean_name"].tolist()
-    event_elite = event_df[event_df["event_name"] == event]["elite"].unique()[0]
-    athlete_times = event_df["total_seconds"].tolist()
-
-    # Generate all pairwise matchups within this event
-    for i in range(len(athletes)):
-        for j in range(i+1, len(athletes)):
-            winner = athletes[i]
-            loser = athletes[j]
-            winner_seconds = athlete_times[i]
-            loser_seconds = athlete_times[j]
-            win_margin = winner_seconds - loser_seconds
-            matchups.append(
-                [winner, loser, event, event_elite, win_margin]
-            )
-
-matchups_df = pd.DataFrame(
-    matchups,
-    columns=[
-        "winner", 
-        "loser",
-        "event_name",
-        "event_elite",
-        "win_margin"
-    ]
-)
-
-# --------- ELO Calculation
-def calculate_expected_score(rating_a, rating_b):
+RESULTS_PATH = "data/hyrox_results_pro.csv"
+EVENT_PATH = "data/hyrox_events.csv"
+RATING_STATE_PATH = "data/elo_ratings.sqlite"
+ATHLETE_INDEX_PATH = "data/athlete_index.sqlite"
+ATHLETE_HISTORY_PATH = "data/athlete_history.sqlite"
+
+
+def update_rankings(
+    results_path=RESULTS_PATH,
+    event_path=EVENT_PATH,
+    rating_state_path=RATING_STATE_PATH,
+    athlete_index_path=ATHLETE_INDEX_PATH,
+    athlete_history_path=ATHLETE_HISTORY_PATH,
+    divisions=["Pro Men", "Elite Men"],
+    time_group="sub_65",
+    summary_path=None,
+    verify=False
+):
     """
-    Calculate the expected score (probability of winning) for A in a matchup of A vs. B.
-    """
-    return 1 / (1 + 10 ** ((rating_b - rating_a) / 400))
-
-def update_elo_ratings(winner_rating, loser_rating, event_elite):
-    """
-    Update Elo ratings for a single matchup.
-    Returns the updated ratings as (new_winner_rating, new_loser_rating).
-    """
-    if event_elite == "Yes":
-        k = 12 + ((-1*win_margin) / 60)
-    else:
-        k = 6
-
-    expected_score_winner = calculate_expected_score(winner_rating, loser_rating)
-    expected_score_loser = 1 - expected_score_winner
-    
-    # Actual scores: winner gets 1, loser gets 0
-    actual_score_winner = 1
-    actual_score_loser = 0
-    
-    # Update ratings
-    new_winner_rating = winner_rating + k * (actual_score_winner - expected_score_winner)
-    new_loser_rating = loser_rating + k * (actual_score_loser - expected_score_loser)
-    
-    return new_winner_rating, new_loser_rating
-
-# Apply the update for each matchup
-# Note: This is a simplified outline. Actual implementation will need to loop through matchups_df and update ratings.
-# This would typically involve looking up the current ratings in the ratings dataframe, updating them, and then saving the new ratings back.
+    Cleans the results, updates the athlete history and applies new or changed
+    events to the stored Elo ratings.
 
-# Placeholder for demonstration - replace with actual implementation
+    Elo only needs finish times, so a summary table (scraper.py summary mode)
+    can add the events that were not scraped in detail, or replace the detail
+    results altogether with results_path=None. With verify, the updated ratings
+    are checked against a full recompute over the same events (ValueError
+    when they differ, e.g. when the state holds events no longer in the results).
 
-# Since the actual loop through matchups_df involves updating the ratings DataFrame and depends on your specific data setup,
-# you'll need to implement this part in your environment. Here's a pseudo-code outline of the steps involved:
-
-for index, matchup in matchups_df.iterrows():
-    # Lookup current ratings
-    winner_rating = ratings.loc[ratings['clean_name'] == matchup['winner'], 'elo_rating'].values[0]
-    loser_rating = ratings.loc[ratings['clean_name'] == matchup['loser'], 'elo_rating'].values[0]
-
-
-    # Update ratings based on the matchup outcome
-    new_winner_rating, new_loser_rating = update_elo_ratings(
-        winner_rating,
-        loser_rating,
-        matchup["event_elite"]
-    )
-    
-    # Save the updated ratings back to the ratings DataFrame
-    ratings.loc[ratings['clean_name'] == matchup['winner'], 'elo_rating'] = new_winner_rating
-    ratings.loc[ratings['clean_name'] == matchup['loser'], 'elo_rating'] = new_loser_rating
-
-# Reminder: The actual implementation of the loop is necessary to update the ratings through all matchups.
-ratings = ratings.sort_values(["elo_rating"], ascending=False).reset_index(drop=True)
\ No newline at end of file
+    Returns:
+    The ratings DataFrame, highest rated first.
+    """
+    # ------------ Clean Results
+    # One clean_name per athlete across casing, accents and nationality tags
+    athlete_index = AthleteIndex(athlete_index_path)
+    events = pd.read_csv(event_path)
+    finisher_dfs = []
+    if results_path is not None:
+        clean_results = add_athlete_ids(get_clean_results(results_path), athlete_index, canonical_names=True)
+        elite_athletes = get_elites_athletes(clean_results)
+        race_finisher_df = get_race_finisher_df(clean_results, elite_athletes)
+
+        # ------------ Athlete History
+        # Per-athlete split history and top-K queries without rebuilding the tables,
+        # e.g. athlete_history.get_season_bests("Jane Doe", ["Sled-Pull", "avg_run_all"])
+        athlete_history = AthleteHistoryStore(athlete_history_path)
+        athlete_history.update(race_finisher_df, events)
+        finisher_dfs.append(race_finisher_df)
+    if summary_path is not None:
+        clean_summary = add_athlete_ids(clean_summary_results(load_summary(summary_path)), athlete_index, canonical_names=True)
+        finisher_dfs.append(get_summary_finisher_df(clean_summary, get_elites_athletes(clean_summary)))
+    if not finisher_dfs:
+        raise ValueError("update_rankings needs a results_path or a summary_path")
+    finishers = finisher_dfs[0] if len(finisher_dfs) == 1 else combine_finishers(*finisher_dfs)
+
+    # ------------ ELO Data Prep
+    ## Find first occurance of sub 65 time (sub 75 for women)
+    elo_prep_df = get_elo_prep_df(finishers, events, divisions=divisions, time_group=time_group)
+
+    # --------- ELO Calculation
+    # Every event is a round robin of its finish order, see analysis/elo_ratings.py
+    # Only events that are new or changed since the last run are (re)applied
+    rating_state = RatingState(rating_state_path)
+    rating_state.update(elo_prep_df)
+    if verify:
+        difference = verify_against_full_recompute(rating_state, elo_prep_df)
+        print(f"Ratings match a full recompute (max difference {difference:.2e})")
+    return rating_state.get_ratings()
+
+
+if __name__ == "__main__":
+    pd.set_option("display.precision", 2)
+    ratings = update_rankings(*(str(root_directory / path) for path in [
+        RESULTS_PATH, EVENT_PATH, RATING_STATE_PATH, ATHLETE_INDEX_PATH, ATHLETE_HISTORY_PATH
+    ]))
+    print(ratings.head(25))
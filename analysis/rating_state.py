@@ -0,0 +1,299 @@
+# ------------ Imports
+import bisect
+import hashlib
+import json
+import sqlite3
+import time
+import numpy as np
+import pandas as pd
+from analysis.elo_ratings import (
+    EloRatings,
+    INITIAL_RATING,
+    event_sort_key,
+    iter_events,
+    compute_elo_ratings
+)
+
+DEFAULT_RATING_STATE_PATH = "data/elo_ratings.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    event_name TEXT PRIMARY KEY,
+    event_order REAL,
+    elite TEXT,
+    fingerprint TEXT NOT NULL,
+    num_athletes_before INTEGER NOT NULL,
+    applied_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS event_results (
+    event_name TEXT NOT NULL,
+    place INTEGER NOT NULL,
+    clean_name TEXT NOT NULL,
+    total_seconds REAL,
+    athlete_index INTEGER NOT NULL,
+    rating_before REAL NOT NULL,
+    rating_after REAL NOT NULL,
+    PRIMARY KEY (event_name, place)
+);
+CREATE INDEX IF NOT EXISTS event_results_athlete ON event_results (athlete_index);
+CREATE TABLE IF NOT EXISTS athletes (
+    athlete_index INTEGER PRIMARY KEY,
+    clean_name TEXT NOT NULL UNIQUE,
+    rating REAL NOT NULL
+);
+"""
+
+
+def _fingerprint(order, names, total_seconds, event_elite):
+    # Changes when anything that affects the event's ratings or position changes
+    payload = [
+        None if pd.isna(order) else float(order),
+        list(names),
+        [float(seconds) for seconds in total_seconds],
+        None if pd.isna(event_elite) else event_elite
+    ]
+    return hashlib.sha1(json.dumps(payload).encode("utf-8")).hexdigest()
+
+
+class RatingState:
+    """
+    Persistent, incrementally updated Elo ratings backed by SQLite.
+
+    Stores the current rating of every athlete, every applied event (the last
+    one is the watermark) and each athlete's rating before and after every
+    event. Events after the watermark are applied in time proportional to
+    their own field. When an event is back-filled or changed, the events from
+    its position on are rolled back (using the stored ratings before each
+    event) and replayed, so the ratings always equal a full recompute over the
+    same events in event order.
+
+    Args:
+    path: Location of the SQLite database (defaults to data/elo_ratings.sqlite).
+    initial_rating: Rating of an athlete in their first event.
+    """
+    def __init__(self, path=DEFAULT_RATING_STATE_PATH, initial_rating=INITIAL_RATING):
+        self.path = path
+        self.initial_rating = initial_rating
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        self._load()
+
+    def close(self):
+        self.conn.close()
+
+    def _load(self):
+        self.elo = EloRatings(self.initial_rating)
+        rows = self.conn.execute("SELECT clean_name, rating FROM athletes ORDER BY athlete_index").fetchall()
+        self.elo.names = [name for name, _ in rows]
+        self.elo.index = {name: index for index, name in enumerate(self.elo.names)}
+        self.elo.ratings = np.array([rating for _, rating in rows], dtype=np.float64)
+        # Applied events in event order: (sort key, event_name, fingerprint, num_athletes_before)
+        self.events = sorted(
+            (event_sort_key(order, event_name), event_name, fingerprint, num_athletes_before)
+            for event_name, order, fingerprint, num_athletes_before in self.conn.execute(
+                "SELECT event_name, event_order, fingerprint, num_athletes_before FROM events"
+            )
+        )
+
+    @property
+    def watermark(self):
+        """
+        (order, event_name) of the last applied event, None before the first.
+        """
+        if not self.events:
+            return None
+        (order, event_name), _, _, _ = self.events[-1]
+        return (None if order == float("inf") else order, event_name)
+
+    # --- Applying & rolling back events
+    def _apply(self, event_name, order, names, total_seconds, event_elite, fingerprint):
+        num_athletes_before = len(self.elo.names)
+        indices = self.elo.get_indices(names)
+        ratings_before = self.elo.ratings[indices]
+        self.elo.apply_event(names, total_seconds, event_elite)
+        ratings_after = self.elo.ratings[indices]
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO events (event_name, event_order, elite, fingerprint, num_athletes_before, applied_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    event_name,
+                    None if pd.isna(order) else float(order),
+                    None if pd.isna(event_elite) else event_elite,
+                    fingerprint,
+                    num_athletes_before,
+                    time.time()
+                )
+            )
+            self.conn.executemany(
+                "INSERT INTO event_results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (event_name, place, name, float(seconds), int(index), float(before), float(after))
+                    for place, (name, seconds, index, before, after)
+                    in enumerate(zip(names, total_seconds, indices, ratings_before, ratings_after))
+                ]
+            )
+            self.conn.executemany(
+                "INSERT INTO athletes (athlete_index, clean_name, rating) VALUES (?, ?, ?)",
+                [
+                    (index, self.elo.names[index], float(self.elo.ratings[index]))
+                    for index in range(num_athletes_before, len(self.elo.names))
+                ]
+            )
+            self.conn.executemany(
+                "UPDATE athletes SET rating = ? WHERE athlete_index = ?",
+                [(float(self.elo.ratings[index]), int(index)) for index in np.unique(indices) if index < num_athletes_before]
+            )
+        bisect.insort(self.events, (event_sort_key(order, event_name), event_name, fingerprint, num_athletes_before))
+
+    def _event_inputs(self, event_name):
+        order, event_elite = self.conn.execute(
+            "SELECT event_order, elite FROM events WHERE event_name = ?", (event_name,)
+        ).fetchone()
+        rows = self.conn.execute(
+            "SELECT clean_name, total_seconds FROM event_results WHERE event_name = ? ORDER BY place", (event_name,)
+        ).fetchall()
+        names = [name for name, _ in rows]
+        total_seconds = np.array([seconds for _, seconds in rows], dtype=np.float64)
+        return (np.nan if order is None else order, names, total_seconds, event_elite)
+
+    def _rollback(self, position):
+        """
+        Undoes every applied event from position on, latest first.
+
+        Returns:
+        Dict of event_name -> (order, names, total_seconds, event_elite) of the undone events.
+        """
+        undone = self.events[position:]
+        if not undone:
+            return {}
+        inputs = {event_name: self._event_inputs(event_name) for _, event_name, _, _ in undone}
+        touched = set()
+        for _, event_name, _, _ in reversed(undone):
+            for index, rating_before in self.conn.execute(
+                "SELECT athlete_index, rating_before FROM event_results WHERE event_name = ?", (event_name,)
+            ):
+                self.elo.ratings[index] = rating_before
+                touched.add(index)
+        # Athletes first seen in the undone events get their indices back
+        num_athletes = undone[0][3]
+        for name in self.elo.names[num_athletes:]:
+            del self.elo.index[name]
+        self.elo.names = self.elo.names[:num_athletes]
+        self.elo.ratings = self.elo.ratings[:num_athletes]
+        with self.conn:
+            undone_names = [(event_name,) for _, event_name, _, _ in undone]
+            self.conn.executemany("DELETE FROM event_results WHERE event_name = ?", undone_names)
+            self.conn.executemany("DELETE FROM events WHERE event_name = ?", undone_names)
+            self.conn.execute("DELETE FROM athletes WHERE athlete_index >= ?", (num_athletes,))
+            self.conn.executemany(
+                "UPDATE athletes SET rating = ? WHERE athlete_index = ?",
+                [(float(self.elo.ratings[index]), index) for index in touched if index < num_athletes]
+            )
+        self.events = self.events[:position]
+        return inputs
+
+    def update_events(self, events):
+        """
+        Applies new or changed events.
+
+        Args:
+        events: Iterable of (event_name, order, names, total_seconds, event_elite),
+            names and times in finish order (see iter_events).
+
+        Returns:
+        Number of events applied, including replayed ones.
+        """
+        applied = {event_name: (key, fingerprint) for key, event_name, fingerprint, _ in self.events}
+        changed = {}
+        position = len(self.events)
+        for event_name, order, names, total_seconds, event_elite in events:
+            fingerprint = _fingerprint(order, names, total_seconds, event_elite)
+            if event_name in applied and applied[event_name][1] == fingerprint:
+                continue
+            changed[event_name] = (order, names, total_seconds, event_elite, fingerprint)
+            keys = [event_sort_key(order, event_name)]
+            if event_name in applied:
+                keys.append(applied[event_name][0])
+            position = min(position, bisect.bisect_left([event[0] for event in self.events], min(keys)))
+        if not changed:
+            return 0
+
+        # Back-filled or changed events: roll back to the earliest one and replay the suffix
+        replay = {
+            event_name: inputs + (_fingerprint(*inputs),)
+            for event_name, inputs in self._rollback(position).items()
+        }
+        replay.update(changed)
+        for event_name in sorted(replay, key=lambda name: event_sort_key(replay[name][0], name)):
+            self._apply(event_name, *replay[event_name])
+        return len(replay)
+
+    def update(self, elo_prep_df):
+        """
+        Applies the new or changed events of elo_prep_df (see get_elo_prep_df).
+        Events already applied and unchanged are skipped, events missing from
+        elo_prep_df are kept.
+        """
+        return self.update_events(iter_events(elo_prep_df))
+
+    # --- Queries
+    def get_ratings(self):
+        return self.elo.to_frame()
+
+    def get_history(self, clean_name):
+        """
+        An athlete's events in event order, with their rating before and after each.
+        """
+        index = self.elo.index.get(clean_name)
+        history = pd.DataFrame(
+            self.conn.execute(
+                """
+                SELECT r.event_name, e.event_order, r.place, r.total_seconds, r.rating_before, r.rating_after
+                FROM event_results r JOIN events e ON e.event_name = r.event_name
+                WHERE r.athlete_index = ?
+                """,
+                (-1 if index is None else index,)
+            ).fetchall(),
+            columns=["event_name", "Order", "place", "total_seconds", "rating_before", "rating_after"]
+        )
+        sort_keys = [event_sort_key(order, name) for name, order in zip(history["event_name"], history["Order"])]
+        history = history.iloc[sorted(range(len(history)), key=lambda i: (sort_keys[i], history["place"].iat[i]))]
+        return history.reset_index(drop=True)
+
+    # --- Snapshots
+    def snapshot(self, path):
+        """
+        Copies the whole state to path (a SQLite file).
+        """
+        destination = sqlite3.connect(path)
+        with destination:
+            self.conn.backup(destination)
+        destination.close()
+
+    def restore(self, path):
+        """
+        Replaces the state with a snapshot taken by snapshot.
+        """
+        source = sqlite3.connect(path)
+        source.backup(self.conn)
+        source.close()
+        self._load()
+
+
+def verify_against_full_recompute(state, elo_prep_df, atol=1e-9):
+    """
+    Checks that the state's ratings equal compute_elo_ratings over elo_prep_df
+    (which should hold every event the state has applied).
+
+    Returns:
+    The largest absolute rating difference.
+    """
+    full_ratings, _ = compute_elo_ratings(elo_prep_df, state.initial_rating)
+    compared = full_ratings.merge(state.get_ratings(), on="clean_name", how="outer", suffixes=("_full", ""))
+    if compared["elo_rating"].isna().any() or compared["elo_rating_full"].isna().any():
+        raise ValueError("Rated athletes differ from a full recompute")
+    max_difference = float((compared["elo_rating"] - compared["elo_rating_full"]).abs().max()) if len(compared) else 0.0
+    if max_difference > atol:
+        raise ValueError(f"Ratings differ from a full recompute by up to {max_difference}")
+    return max_difference
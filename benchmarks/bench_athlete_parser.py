@@ -0,0 +1,108 @@
+# ------------ Setup
+# Compares the per-row BeautifulSoup athlete parser with the columnar lxml parser.
+# Usage: python benchmarks/bench_athlete_parser.py [directory of saved detail pages]
+import sys
+import time
+from pathlib import Path
+current_script_path = Path(__file__).parent
+root_directory = current_script_path.parent
+if str(root_directory) not in sys.path:
+    sys.path.append(str(root_directory))
+
+import pandas as pd
+from bs4 import BeautifulSoup
+from functions.scrape_functions import parse_athlete_pages
+
+SPLIT_NAMES = [
+    "Running 1", "1000m SkiErg", "Running 2", "50m Sled Push", "Running 3", "50m Sled Pull",
+    "Running 4", "80m Burpee Broad Jump", "Running 5", "1000m Row", "Running 6",
+    "200m Farmers Carry", "Running 7", "100m Sandbag Lunges", "Running 8", "Wall Balls"
+]
+
+
+# ------------ Reference Implementation
+def legacy_get_athlete_table(page_source):
+    soup = BeautifulSoup(page_source, 'html.parser')
+    table = soup.select_one('table.table-condensed.table-striped')
+    rows = table.tbody.find_all('tr')
+    fullname = soup.find("td", class_="f-__fullname last").get_text(strip=True)
+    try:
+        age_class = soup.find("td", class_="f-_type_age_class last").get_text(strip=True)
+    except:
+        age_class = "_NONE_"
+    try:
+        start_no = soup.find("td", class_="f-start_no_text last").get_text(strip=True)
+    except:
+        start_no = "_NONE_"
+    all_rows = []
+    for row in rows:
+        cells = row.find_all('td')
+        desc = row.find('th').get_text(strip=True)
+        if len(cells) == 3:
+            time_day = cells[0].get_text(strip=True)
+            split_time = cells[1].get_text(strip=True)
+            diff = cells[2].get_text(strip=True)
+        if len(cells) == 2:
+            time_day = "_NONE_"
+            split_time = cells[0].get_text(strip=True)
+            diff = cells[1].get_text(strip=True)
+        all_rows.append(pd.DataFrame({
+            "desc": [desc],
+            "time_day": [time_day],
+            "time": [split_time],
+            "diff": [diff],
+            "fullname": [fullname],
+            "age_class": [age_class],
+            "start_no": [start_no]
+        }))
+    return pd.concat(all_rows, axis=0, ignore_index=True)
+
+
+# ------------ Synthetic Pages
+def make_detail_page(athlete_num):
+    rows = []
+    elapsed = 0
+    for split_num in range(30):
+        split = 240 + (athlete_num * 7 + split_num * 13) % 180
+        elapsed += split
+        name = SPLIT_NAMES[split_num // 2] if split_num % 2 == 0 else "Roxzone"
+        rows.append(
+            f"<tr><th class=\"desc\">{name}</th>"
+            f"<td class=\"time_day\">{10 + elapsed // 3600}:{(elapsed // 60) % 60:02d}:{elapsed % 60:02d}</td>"
+            f"<td class=\"time\">{elapsed // 3600:02d}:{(elapsed // 60) % 60:02d}:{elapsed % 60:02d}</td>"
+            f"<td class=\"diff\">{split // 60:02d}:{split % 60:02d}</td></tr>"
+        )
+    return f"""<html><head><title>Results</title></head><body>
+<div class="detail-box"><table class="table table-condensed">
+<tr><th>Name</th><td class="f-__fullname last">Athlete {athlete_num}, Test (GBR)</td></tr>
+<tr><th>Age Group</th><td class="f-_type_age_class last">30-34</td></tr>
+<tr><th>Number</th><td class="f-start_no_text last">{1000 + athlete_num}</td></tr>
+</table></div>
+<div class="box-splits"><table class="table table-condensed table-striped">
+<thead><tr><th>Split</th><th>Time Of Day</th><th>Time</th><th>Diff</th></tr></thead>
+<tbody>{''.join(rows)}</tbody></table></div></body></html>"""
+
+
+def load_pages(page_dir=None, num_pages=200):
+    if page_dir:
+        return [path.read_text(encoding="utf-8") for path in sorted(Path(page_dir).glob("*.html"))]
+    return [make_detail_page(i) for i in range(num_pages)]
+
+
+# ------------ Benchmark
+if __name__ == "__main__":
+    pages = load_pages(sys.argv[1] if len(sys.argv) > 1 else None)
+
+    start = time.perf_counter()
+    legacy_df = pd.concat([legacy_get_athlete_table(page) for page in pages], ignore_index=True)
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    columnar_df = parse_athlete_pages(pages)
+    columnar_seconds = time.perf_counter() - start
+
+    pd.testing.assert_frame_equal(legacy_df, columnar_df)
+    print(f"Pages: {len(pages)}, rows: {len(columnar_df)}")
+    print(f"legacy get_athlete_table: {legacy_seconds:.3f}s ({len(pages) / legacy_seconds:.1f} pages/sec)")
+    print(f"parse_athlete_pages:      {columnar_seconds:.3f}s ({len(pages) / columnar_seconds:.1f} pages/sec)")
+    print(f"speedup: {legacy_seconds / columnar_seconds:.1f}x")
@@ -0,0 +1,27 @@
+# ------------ Setup
+# Memory used by clean results before and after compact_clean_results.
+# Usage: python benchmarks/bench_compact_results.py [results csv]
+import sys
+import tempfile
+from pathlib import Path
+current_script_path = Path(__file__).parent
+root_directory = current_script_path.parent
+if str(root_directory) not in sys.path:
+    sys.path.append(str(root_directory))
+
+import pandas as pd
+from bench_results_store import make_results_csv
+from functions.data_functions import get_clean_results
+from functions.compact_results import compact_clean_results, decode_clean_results, memory_report
+
+# ------------ Benchmark
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = sys.argv[1] if len(sys.argv) > 1 else f"{tmp}/results.csv"
+        if len(sys.argv) == 1:
+            make_results_csv(csv_path, num_events=40, athletes_per_event=500)
+        clean_results = get_clean_results(csv_path)
+
+    compact = compact_clean_results(clean_results)
+    memory_report(clean_results, compact)
+    pd.testing.assert_frame_equal(decode_clean_results(compact), clean_results)
@@ -0,0 +1,95 @@
+# ------------ Setup
+# Compares analysis/elo_ratings.py with the original matchups table + iterrows loop,
+# then times it on an open-division sized set of events.
+# Usage: python benchmarks/bench_elo.py [events] [athletes per event]
+import sys
+import time
+from pathlib import Path
+current_script_path = Path(__file__).parent
+root_directory = current_script_path.parent
+if str(root_directory) not in sys.path:
+    sys.path.append(str(root_directory))
+
+import numpy as np
+import pandas as pd
+from analysis.elo_ratings import compute_elo_ratings
+
+
+# ------------ Synthetic Input
+def make_elo_prep_df(num_events=20, athletes_per_event=40, num_athletes=None, seed=0):
+    # Athletes come back across events; every fourth event is elite
+    rng = np.random.default_rng(seed)
+    num_athletes = num_athletes or max(athletes_per_event, num_events * athletes_per_event // 3)
+    rows = []
+    for event in range(num_events):
+        names = rng.choice(num_athletes, size=athletes_per_event, replace=False)
+        seconds = rng.normal(3600, 240, size=athletes_per_event).round()
+        rows.append(pd.DataFrame({
+            "clean_name": [f"Athlete {name}" for name in names],
+            "event_name": f"2024 City {event}",
+            "Order": event + 1,
+            "elite": "Yes" if event % 4 == 3 else "No",
+            "total_seconds": seconds
+        }))
+    elo_prep_df = pd.concat(rows, ignore_index=True)
+    # Same name twice in one event (e.g. Pro and Elite fields of the same event_name)
+    elo_prep_df.loc[1, "clean_name"] = elo_prep_df.loc[0, "clean_name"]
+    return elo_prep_df.sort_values("Order", kind="stable")
+
+
+# ------------ Reference Implementation
+def legacy_elo_ratings(elo_prep_df, initial_rating=1500):
+    # The original script, with win_margin taken from each matchup
+    ratings = elo_prep_df["clean_name"].unique()
+    ratings = pd.DataFrame(ratings, columns=["clean_name"])
+    ratings["elo_rating"] = float(initial_rating)
+    matchups = []
+    for event in elo_prep_df["event_name"].unique():
+        event_df = elo_prep_df[elo_prep_df["event_name"] == event].sort_values("total_seconds", kind="stable")
+        athletes = event_df["clean_name"].tolist()
+        event_elite = event_df["elite"].unique()[0]
+        athlete_times = event_df["total_seconds"].tolist()
+        for i in range(len(athletes)):
+            for j in range(i+1, len(athletes)):
+                matchups.append([athletes[i], athletes[j], event, event_elite, athlete_times[i] - athlete_times[j]])
+    matchups_df = pd.DataFrame(matchups, columns=["winner", "loser", "event_name", "event_elite", "win_margin"])
+
+    for _, matchup in matchups_df.iterrows():
+        winner_rating = ratings.loc[ratings["clean_name"] == matchup["winner"], "elo_rating"].values[0]
+        loser_rating = ratings.loc[ratings["clean_name"] == matchup["loser"], "elo_rating"].values[0]
+        if matchup["event_elite"] == "Yes":
+            k = 12 + ((-1*matchup["win_margin"]) / 60)
+        else:
+            k = 6
+        expected_score_winner = 1 / (1 + 10 ** ((loser_rating - winner_rating) / 400))
+        expected_score_loser = 1 - expected_score_winner
+        ratings.loc[ratings["clean_name"] == matchup["winner"], "elo_rating"] = winner_rating + k * (1 - expected_score_winner)
+        ratings.loc[ratings["clean_name"] == matchup["loser"], "elo_rating"] = loser_rating + k * (0 - expected_score_loser)
+    return ratings.sort_values(["elo_rating"], ascending=False).reset_index(drop=True)
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label}: {elapsed:.2f}s")
+    return result, elapsed
+
+
+# ------------ Benchmark
+if __name__ == "__main__":
+    num_events = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    athletes_per_event = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    reference_df = make_elo_prep_df(num_events=12, athletes_per_event=40)
+    legacy, legacy_time = timed("matchups table + iterrows (reference set)", lambda: legacy_elo_ratings(reference_df))
+    (ratings, _), ratings_time = timed("EloRatings (reference set)", lambda: compute_elo_ratings(reference_df))
+    compared = legacy.merge(ratings, on="clean_name", suffixes=("_legacy", ""))
+    assert len(compared) == len(legacy) == len(ratings)
+    np.testing.assert_allclose(compared["elo_rating"], compared["elo_rating_legacy"], rtol=0, atol=1e-9)
+    print(f"reference set speedup: {legacy_time / ratings_time:.0f}x")
+
+    open_df = make_elo_prep_df(num_events=num_events, athletes_per_event=athletes_per_event)
+    matchups = num_events * athletes_per_event * (athletes_per_event - 1) // 2
+    (ratings, _), seconds = timed(f"EloRatings ({num_events} events x {athletes_per_event} athletes)", lambda: compute_elo_ratings(open_df))
+    print(f"{matchups / seconds / 1e6:.1f}M matchups/s, {len(ratings)} athletes rated")
@@ -0,0 +1,69 @@
+# ------------ Setup
+# Athletes/sec of the HTTP detail page engine (scrape_athletes_http) against
+# fetching one page at a time, on a local results site with a fixed
+# per-request latency. Its behaviour is tested in tests/test_http_fetch.py.
+# Usage: python benchmarks/bench_http_engine.py [num athletes] [latency seconds]
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+current_script_path = Path(__file__).parent
+root_directory = current_script_path.parent
+if str(root_directory) not in sys.path:
+    sys.path.append(str(root_directory))
+
+from bench_athlete_parser import make_detail_page
+from functions.scrape_functions import fetch_url, scrape_athletes_http
+
+
+def make_list_page(athlete_ids):
+    rows = "".join(
+        f'<li class="list-group-item"><h4 class="list-field type-fullname">'
+        f'<a href="?content=detail&amp;idp={athlete_id}">Athlete</a></h4></li>'
+        for athlete_id in athlete_ids
+    )
+    return f'<html><body><ul class="list-group">{rows}</ul></body></html>'
+
+
+def start_site(latency):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            athlete_id = parse_qs(urlparse(self.path).query)["idp"][0]
+            time.sleep(latency)
+            body = make_detail_page(int(athlete_id)).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/"
+
+
+# ------------ Benchmark
+if __name__ == "__main__":
+    num_athletes = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    server, base_url = start_site(latency)
+    print(f"{num_athletes} athletes, {latency:.2f}s per request")
+
+    athlete_ids = [str(i) for i in range(num_athletes)]
+    start = time.perf_counter()
+    scrape_athletes_http([], make_list_page(athlete_ids), base_url, requests_per_second=None)
+    engine_seconds = time.perf_counter() - start
+
+    sequential_ids = athlete_ids[:50]
+    start = time.perf_counter()
+    for athlete_id in sequential_ids:
+        fetch_url(f"{base_url}?content=detail&idp={athlete_id}")
+    sequential_rate = len(sequential_ids) / (time.perf_counter() - start)
+    server.shutdown()
+    print(f"sequential fetch:      {sequential_rate:.1f} athletes/sec")
+    print(f"scrape_athletes_http:  {num_athletes / engine_seconds:.1f} athletes/sec (8 workers, no rate limit)")
@@ -0,0 +1,92 @@
+# ------------ Setup
+# Startup cost of the entry points: import time of functions.data_functions
+# and of everything `cli.py build --dry-run` loads before its first stage,
+# against the same imports at an earlier commit (the build scripts then
+# imported gspread and oauth2client at the top).
+# Usage: python benchmarks/bench_import_time.py [--baseline <commit>] [--repeat 7]
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+current_script_path = Path(__file__).parent
+root_directory = current_script_path.parent
+
+# name -> (statements run now, statements the baseline commit ran for the same thing)
+STARTUPS = {
+    "import functions.data_functions": (
+        "import functions.data_functions",
+        "import functions.data_functions"
+    ),
+    "build --dry-run startup": (
+        "import cli; cli.get_parser().parse_args(['build', '--dry-run']); import functions.build_pipeline",
+        # Header of the old open_table_builds.py / pro_table_builds.py scripts
+        "from functions.data_functions import *; import gspread; "
+        "from oauth2client.service_account import ServiceAccountCredentials"
+    )
+}
+# Third party modules worth knowing about when they are loaded
+HEAVY_MODULES = ["pandas", "pyarrow", "gspread", "oauth2client", "selenium", "seleniumbase", "bs4", "lxml"]
+TIMER = """
+import sys, time
+start = time.perf_counter()
+{statements}
+seconds = time.perf_counter() - start
+import json
+print(json.dumps({{"seconds": seconds, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def time_startup(statements, cwd, repeat):
+    """
+    Runs statements in repeat fresh interpreters from cwd.
+
+    Returns:
+    Dict with the median seconds and the heavy modules loaded, or the error.
+    """
+    runs = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-c", TIMER.format(statements=statements, heavy=HEAVY_MODULES)],
+            cwd=cwd, capture_output=True, text=True, env={**os.environ, "PYTHONPATH": str(cwd)}
+        )
+        if result.returncode:
+            return {"error": result.stderr.strip().splitlines()[-1]}
+        runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    return {"seconds": statistics.median(run["seconds"] for run in runs), "loaded": runs[0]["loaded"]}
+
+
+def _describe(result):
+    if "error" in result:
+        return f"fails ({result['error']})"
+    return f"{result['seconds']:.3f}s, loads {', '.join(result['loaded']) or 'nothing heavy'}"
+
+
+# ------------ Benchmark
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the imports of the entry points")
+    parser.add_argument("--baseline", help="Commit to compare with, defaults to the first commit")
+    parser.add_argument("--repeat", type=int, default=7, help="Fresh interpreters per measurement")
+    args = parser.parse_args()
+
+    baseline = args.baseline or subprocess.run(
+        ["git", "rev-list", "--max-parents=0", "HEAD"], cwd=root_directory, capture_output=True, text=True, check=True
+    ).stdout.split()[0]
+    with tempfile.TemporaryDirectory() as tmp:
+        worktree = os.path.join(tmp, "baseline")
+        subprocess.run(
+            ["git", "worktree", "add", "--detach", worktree, baseline],
+            cwd=root_directory, capture_output=True, check=True
+        )
+        try:
+            for name, (statements, baseline_statements) in STARTUPS.items():
+                before = time_startup(baseline_statements, worktree, args.repeat)
+                after = time_startup(statements, root_directory, args.repeat)
+                print(name)
+                print(f"  before ({baseline[:7]}): {_describe(before)}")
+                print(f"  after:           {_describe(after)}")
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", worktree], cwd=root_directory, check=True)
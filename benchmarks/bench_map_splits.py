@@ -0,0 +1,71 @@
+# ------------ Setup
+# Checks the vectorized map_splits against the original row-wise apply and times both.
+# Usage: python benchmarks/bench_map_splits.py [rows]
+import sys
+import time
+from pathlib import Path
+current_script_path = Path(__file__).parent
+root_directory = current_script_path.parent
+if str(root_directory) not in sys.path:
+    sys.path.append(str(root_directory))
+
+import numpy as np
+import pandas as pd
+from functions.data_functions import (
+    map_splits,
+    NO_ROXZONE_LIST,
+    SPLIT_MAPPING,
+    NO_ROX_SPLIT_MAPPING
+)
+
+
+# ------------ Reference Implementation
+def legacy_map_splits(results, no_rox_event_ids=NO_ROXZONE_LIST):
+    results["split_num"] = results.groupby(["event_id", "race_person_id"]).cumcount()+1
+    results["split_name"] = results.apply(
+        lambda row: NO_ROX_SPLIT_MAPPING[row["split_num"]]
+        if row["event_id"] in no_rox_event_ids
+        else SPLIT_MAPPING.get(row["split_num"], "Unknown"),
+        axis=1
+    )
+    return results
+
+
+# ------------ Synthetic Input
+def make_split_rows(num_rows=1_000_000, athletes_per_event=1000):
+    # Mostly 30-split athletes, some no-Rox (16 split) events and a few extra rows
+    event_ids, person_ids = [], []
+    athlete = 0
+    while len(event_ids) < num_rows:
+        event_num = athlete // athletes_per_event
+        if event_num % 10 == 0:
+            event_id, splits = NO_ROXZONE_LIST[event_num // 10 % 2], 16
+        else:
+            event_id, splits = f"2024 City {event_num}_HYROX_Men", 30 + (athlete % 97 == 0)
+        event_ids.extend([event_id] * splits)
+        person_ids.extend([f"{event_id}_Athlete {athlete}"] * splits)
+        athlete += 1
+    return pd.DataFrame({
+        "event_id": pd.array(event_ids[:num_rows], dtype="string"),
+        "race_person_id": pd.array(person_ids[:num_rows], dtype="string")
+    })
+
+
+# ------------ Benchmark
+if __name__ == "__main__":
+    num_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rows = make_split_rows(num_rows)
+
+    start = time.perf_counter()
+    vectorized = map_splits(rows.copy())
+    vectorized_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    legacy = legacy_map_splits(rows.copy())
+    legacy_seconds = time.perf_counter() - start
+
+    pd.testing.assert_frame_equal(legacy, vectorized)
+    print(f"Rows: {num_rows}")
+    print(f"row-wise apply: {legacy_seconds:.2f}s")
+    print(f"vectorized:     {vectorized_seconds:.2f}s")
+    print(f"speedup: {legacy_seconds / vectorized_seconds:.0f}x")
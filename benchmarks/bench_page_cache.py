@@ -0,0 +1,108 @@
+# ------------ Setup
+# Fills a page cache with synthetic list and athlete pages as a scrape would,
+# then times reparse_results against parsing the same pages serially, checks
+# that both give the same rows, and checks that eviction keeps the cache under
+# its size limit.
+# Usage: python benchmarks/bench_page_cache.py [num events] [pages per event]
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+current_script_path = Path(__file__).parent
+root_directory = current_script_path.parent
+if str(root_directory) not in sys.path:
+    sys.path.append(str(root_directory))
+
+import pandas as pd
+from bench_athlete_parser import make_detail_page
+from functions.page_cache import PageCache, reparse_results
+from functions.scrape_functions import parse_athlete_pages
+
+BASE_URL = "https://results.example.com/season-7/"
+ATHLETES_PER_PAGE = 100
+# Default per-host rate of fetch_pages, for the time a live scrape would take
+LIVE_REQUESTS_PER_SECOND = 5.0
+
+
+def make_list_page(athlete_urls):
+    rows = "".join(
+        f'<li class="list-group-item"><h4 class="list-field type-fullname"><a href="{url}">Athlete</a></h4></li>'
+        for url in athlete_urls
+    )
+    return f"<html><body><ul class=\"list-group\">{rows}</ul></body></html>"
+
+
+def fill_cache(cache, num_events, pages_per_event):
+    """
+    Caches list and athlete pages like a scrape of num_events events.
+
+    Returns:
+    The expected results DataFrame, in scrape order.
+    """
+    expected = []
+    athlete_num = 0
+    for event in range(num_events):
+        event_id = f"2024 City {event}_HYROX_Men"
+        for page in range(1, pages_per_event + 1):
+            urls = [f"?content=detail&idp=A{athlete_num + i}" for i in range(ATHLETES_PER_PAGE)]
+            details = [make_detail_page(athlete_num + i) for i in range(ATHLETES_PER_PAGE)]
+            athlete_num += ATHLETES_PER_PAGE
+            list_url = f"{BASE_URL}?event={event}&page={page}"
+            cache.put(list_url, make_list_page(urls), "list", event_id=event_id, season="2024-2025", page=page,
+                      export_path="data/hyrox_results_open_Men.csv")
+            cache.put_many(
+                [(BASE_URL + url, html) for url, html in zip(urls, details)],
+                "athlete", event_id=event_id, season="2024-2025", page=page
+            )
+            page_df = parse_athlete_pages(details)
+            page_df["event_id"] = event_id
+            page_df["season"] = "2024-2025"
+            expected.append(page_df)
+    return pd.concat(expected, ignore_index=True)
+
+
+# ------------ Benchmark
+if __name__ == "__main__":
+    num_events = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    pages_per_event = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    num_athletes = num_events * pages_per_event * ATHLETES_PER_PAGE
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = os.path.join(tmp, "page_cache")
+        cache = PageCache(cache_dir, max_bytes=None)
+        start = time.perf_counter()
+        expected = fill_cache(cache, num_events, pages_per_event)
+        fill_seconds = time.perf_counter() - start
+        raw_mb = sum(len(make_detail_page(i).encode("utf-8")) for i in range(100)) / 100 * num_athletes / 2**20
+        print(f"Cached {num_athletes} athlete pages in {fill_seconds:.1f}s (including parsing the expected rows), "
+              f"{cache.size() / 2**20:.1f} MB on disk for ~{raw_mb:.0f} MB of HTML")
+
+        pages = [make_detail_page(i) for i in range(num_athletes)]
+        start = time.perf_counter()
+        parse_athlete_pages(pages)
+        serial_seconds = time.perf_counter() - start
+
+        output_dir = os.path.join(tmp, "reparsed")
+        start = time.perf_counter()
+        written = reparse_results(cache_dir, output_dir)
+        reparse_seconds = time.perf_counter() - start
+        print(f"serial parse (pages in memory): {serial_seconds:.2f}s ({num_athletes / serial_seconds:.0f} pages/sec)")
+        print(f"reparse_results (from disk):    {reparse_seconds:.2f}s ({num_athletes / reparse_seconds:.0f} pages/sec, "
+              f"{os.cpu_count()} CPUs)")
+        print(f"live scrape at {LIVE_REQUESTS_PER_SECOND:.0f} requests/sec: ~{num_athletes / LIVE_REQUESTS_PER_SECOND:.0f}s")
+
+        reparsed = pd.read_csv(next(iter(written)), dtype=str, keep_default_na=False)
+        pd.testing.assert_frame_equal(reparsed, expected.astype(str))
+        print("reparsed rows identical to a direct parse")
+
+        # Eviction: half the current size, least recently used pages go first
+        limit = cache.size() // 2
+        cache.max_bytes = limit
+        recent_url = f"{BASE_URL}?content=detail&idp=A0"
+        cache.get(recent_url)
+        cache.put(f"{BASE_URL}?content=detail&idp=new", make_detail_page(num_athletes), "athlete")
+        assert cache.size() <= limit, "Cache above its size limit after eviction"
+        assert cache.get(recent_url) is not None, "Recently used page was evicted"
+        assert cache.get(f"{BASE_URL}?content=detail&idp=A1") is None, "Least recently used page was kept"
+        print(f"eviction: {cache.size() / 2**20:.1f} MB <= {limit / 2**20:.1f} MB limit, recently used page kept")
+        cache.close()
@@ -0,0 +1,105 @@
+# ------------ Setup
+# Pagination on a local results site with a fixed per-request latency: the old
+# loop (list pages 1-29 one after the other) against plan_list_pages plus a
+# concurrent fetch_pages, for fields of several sizes.
+# Usage: python benchmarks/bench_pagination.py [latency seconds]
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+current_script_path = Path(__file__).parent
+root_directory = current_script_path.parent
+if str(root_directory) not in sys.path:
+    sys.path.append(str(root_directory))
+
+from functions.scrape_functions import fetch_pages, fetch_url, get_athlete_urls, plan_list_pages, set_page
+
+NUM_RESULTS = 100
+# Last page the old scrape_event loop requested (while page < 30)
+LEGACY_LAST_PAGE = 29
+FIELD_SIZES = [250, 3000, 3456]
+
+
+def make_list_page(field_size, page):
+    first = (page - 1) * NUM_RESULTS
+    athletes = range(first, min(first + NUM_RESULTS, field_size))
+    rows = "".join(
+        f'<li><h4 class="list-field type-fullname"><a href="?content=detail&amp;idp=A{i}">Athlete {i}</a></h4></li>'
+        for i in athletes
+    )
+    num_pages = -(-field_size // NUM_RESULTS)
+    links = "".join(
+        f'<li><a href="?pid=list&amp;num_results={NUM_RESULTS}&amp;page={n}">{n}</a></li>'
+        for n in range(max(1, page - 2), min(num_pages, page + 2) + 1)
+    )
+    info = f"{first + 1} - {first + len(athletes)} / {field_size:,}" if len(athletes) else "No results"
+    return (
+        f'<html><body><div class="list-info"><ul><li class="list-info-text">{info}</li></ul></div>'
+        f'<ul class="list-group">{rows}</ul><ul class="pages">{links}</ul></body></html>'
+    )
+
+
+def start_site(field_size, latency):
+    class Handler(BaseHTTPRequestHandler):
+        requests = 0
+
+        def do_GET(self):
+            Handler.requests += 1
+            time.sleep(latency)
+            page = int(parse_qs(urlparse(self.path).query).get("page", ["1"])[0])
+            body = make_list_page(field_size, page).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, Handler, f"http://127.0.0.1:{server.server_port}/?pid=list&num_results={NUM_RESULTS}"
+
+
+def legacy_pages(first_url):
+    # Old loop: every page up to 29 in turn, empty or not
+    athletes = 0
+    for page in range(1, LEGACY_LAST_PAGE + 1):
+        athletes += len(get_athlete_urls(fetch_url(set_page(first_url, page)), first_url))
+    return athletes
+
+
+def planned_pages(first_url):
+    first_source = fetch_url(first_url)
+    plan = plan_list_pages(first_source, first_url, NUM_RESULTS)
+    sources = fetch_pages(plan["urls"])
+    athletes = plan["listed"] + sum(len(get_athlete_urls(source, first_url)) for source in sources)
+    return athletes, plan["total"]
+
+
+# ------------ Benchmark
+if __name__ == "__main__":
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.5
+    print(f"{NUM_RESULTS} results per page, {latency:.2f}s per request")
+    for field_size in FIELD_SIZES:
+        server, handler, first_url = start_site(field_size, latency)
+
+        start = time.perf_counter()
+        legacy_athletes = legacy_pages(first_url)
+        legacy_seconds = time.perf_counter() - start
+        legacy_requests, handler.requests = handler.requests, 0
+
+        start = time.perf_counter()
+        planned_athletes, total = planned_pages(first_url)
+        planned_seconds = time.perf_counter() - start
+        server.shutdown()
+
+        assert total == field_size, f"Planner read a total of {total}"
+        assert planned_athletes == field_size, f"Planner collected {planned_athletes} of {field_size}"
+        assert handler.requests == -(-field_size // NUM_RESULTS), "Planner requested pages past the last one"
+        print(f"{field_size} results:")
+        print(f"  old loop: {legacy_athletes} athletes, {legacy_requests} requests, {legacy_seconds:.1f}s")
+        print(f"  planner:  {planned_athletes} athletes, {handler.requests} requests, {planned_seconds:.1f}s")
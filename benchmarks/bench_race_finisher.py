@@ -0,0 +1,71 @@
+# ------------ Setup
+# Compares get_race_finisher_df with the original pivot + regex filter version.
+# Usage: python benchmarks/bench_race_finisher.py [finishers]
+import sys
+import tempfile
+import time
+from pathlib import Path
+current_script_path = Path(__file__).parent
+root_directory = current_script_path.parent
+if str(root_directory) not in sys.path:
+    sys.path.append(str(root_directory))
+
+import pandas as pd
+from bench_results_store import make_results_csv
+from functions.data_functions import get_clean_results, get_race_finisher_df, STATIONS
+
+
+# ------------ Reference Implementation
+def legacy_race_finisher_splits(clean_results, stations=STATIONS):
+    # The pivot and filter-based aggregates from the original get_race_finisher_df
+    race_finisher_df = clean_results[clean_results["split_name"]=="Wallballs"][
+        ["race_person_id", "total_seconds"]
+    ].reset_index(drop=True)
+    race_finishers = race_finisher_df["race_person_id"].drop_duplicates().to_list()
+    race_wide_splits = (
+        clean_results[clean_results["race_person_id"].isin(race_finishers)]
+        [["race_person_id", "split_name", "split_seconds"]]
+        .pivot(index="race_person_id", columns="split_name", values="split_seconds")
+    )
+    return (
+        pd.merge(race_finisher_df, race_wide_splits, on="race_person_id", how="left")
+        .assign(
+            total_run=lambda x: x.filter(regex=r"^Run-").sum(axis=1),
+            total_rox_zone=lambda x: x.filter(like="Rox").sum(axis=1),
+            total_station=lambda x: x.filter(items=stations).sum(axis=1),
+            avg_run_all=lambda x: x.filter(regex=r"^Run-").mean(axis=1),
+            avg_run_exclude_first=lambda x: x.filter(regex=r"^Run-(2|3|4|5|6|7)$").mean(axis=1),
+            min_run_exclude_first=lambda x: x.filter(regex=r"^Run-(2|3|4|5|6|7)$").min(axis=1),
+            max_run_exclude_first=lambda x: x.filter(regex=r"^Run-(2|3|4|5|6|7)$").max(axis=1)
+        )
+        .assign(total_run_and_rox=lambda x: x["total_run"] + x["total_rox_zone"])
+        .assign(
+            run_and_rox_pct=lambda x: x["total_run_and_rox"] / x["total_seconds"],
+            station_pct=lambda x: x["total_station"] / x["total_seconds"],
+            run_range_exclude_first=lambda x: x["max_run_exclude_first"] - x["min_run_exclude_first"],
+            run_range_pct_exclude_first=lambda x:
+                (x["max_run_exclude_first"] - x["min_run_exclude_first"])
+                / x["avg_run_exclude_first"]
+        )
+    )
+
+
+# ------------ Benchmark
+if __name__ == "__main__":
+    num_finishers = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as tmp:
+        make_results_csv(f"{tmp}/results.csv", num_events=num_finishers // 1000, athletes_per_event=1000)
+        clean_results = get_clean_results(f"{tmp}/results.csv")
+
+    start = time.perf_counter()
+    legacy = legacy_race_finisher_splits(clean_results)
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    race_finisher_df = get_race_finisher_df(clean_results, [])
+    seconds = time.perf_counter() - start
+
+    pd.testing.assert_frame_equal(legacy, race_finisher_df[legacy.columns])
+    print(f"Finishers: {len(race_finisher_df)}")
+    print(f"pivot + filter (splits and aggregates only): {legacy_seconds:.2f}s")
+    print(f"get_race_finisher_df (everything):           {seconds:.2f}s")
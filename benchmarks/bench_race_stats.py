@@ -0,0 +1,93 @@
+# ------------ Setup
+# Compares the batched percentile + time formatting stage with the per-column loops
+# it replaced, on a synthetic open-division finisher set.
+# Usage: python benchmarks/bench_race_stats.py [finishers]
+import sys
+import tempfile
+import time
+from pathlib import Path
+current_script_path = Path(__file__).parent
+root_directory = current_script_path.parent
+if str(root_directory) not in sys.path:
+    sys.path.append(str(root_directory))
+
+import pandas as pd
+from bench_results_store import make_results_csv
+from functions.data_functions import (
+    get_clean_results,
+    get_race_finisher_df,
+    get_race_averages_df,
+    get_final_ind_race_df,
+    add_percentile_and_time_columns,
+    percentile_rank,
+    convert_to_min_sec,
+    STATIONS
+)
+
+METRIC_COLUMNS = [
+    "total_seconds",
+    "total_run",
+    "total_station",
+    "total_run_and_rox",
+    "run_and_rox_pct",
+    "avg_run_all",
+    "avg_run_exclude_first",
+    "run_range_exclude_first",
+    "run_range_pct_exclude_first"
+] + STATIONS
+
+
+# ------------ Reference Implementation
+def legacy_percentile_and_time_columns(df, columns, group_col=None):
+    # One grouped transform and one apply per column, as in the original builders
+    df = df.copy()
+    for column in columns:
+        if group_col:
+            df[f"{column}_percentile"] = df.groupby(group_col)[column].transform(percentile_rank)
+        else:
+            df[f"{column}_percentile"] = df[column].transform(percentile_rank)
+        df[f"{column}_time"] = df[column].apply(convert_to_min_sec)
+    return df
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label}: {elapsed:.3f}s")
+    return result, elapsed
+
+
+# ------------ Benchmark
+if __name__ == "__main__":
+    num_finishers = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    with tempfile.TemporaryDirectory() as tmp:
+        make_results_csv(f"{tmp}/results.csv", num_events=num_finishers // 1000, athletes_per_event=1000)
+        race_finisher_df = get_race_finisher_df(get_clean_results(f"{tmp}/results.csv"), [])
+    open_finishers = race_finisher_df[race_finisher_df["race_division"].isin(["Open Men", "Open Women"])]
+    print(f"Open finishers: {len(open_finishers)}")
+
+    # Individual level: every finisher ranked against every other
+    legacy, legacy_time = timed(
+        "individual, per-column loop", lambda: legacy_percentile_and_time_columns(open_finishers, METRIC_COLUMNS)
+    )
+    batched, batched_time = timed(
+        "individual, batched", lambda: add_percentile_and_time_columns(open_finishers, METRIC_COLUMNS)
+    )
+    pd.testing.assert_frame_equal(legacy, batched)
+    print(f"individual speedup: {legacy_time / batched_time:.1f}x")
+    timed("get_final_ind_race_df", lambda: get_final_ind_race_df(open_finishers))
+
+    # Race level: event averages ranked within each division
+    race_averages = open_finishers.groupby(["event_name", "race_division", "sub_90"], as_index=False)[METRIC_COLUMNS].mean()
+    legacy, legacy_time = timed(
+        "race level, per-column loop",
+        lambda: legacy_percentile_and_time_columns(race_averages, METRIC_COLUMNS, group_col="race_division")
+    )
+    batched, batched_time = timed(
+        "race level, batched",
+        lambda: add_percentile_and_time_columns(race_averages, METRIC_COLUMNS, group_col="race_division")
+    )
+    pd.testing.assert_frame_equal(legacy, batched)
+    print(f"race level speedup: {legacy_time / batched_time:.1f}x")
+    timed("get_race_averages_df", lambda: get_race_averages_df(open_finishers, ["event_name", "race_division", "sub_90"]))
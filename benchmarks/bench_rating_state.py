@@ -0,0 +1,85 @@
+# ------------ Setup
+# Checks that analysis/rating_state.py always equals a full Elo recompute:
+# events applied in batches, a back-filled event, a changed event, snapshot /
+# restore and reopening the SQLite state. Then times adding one new event
+# against recomputing every event.
+# Usage: python benchmarks/bench_rating_state.py [events] [athletes per event]
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+current_script_path = Path(__file__).parent
+root_directory = current_script_path.parent
+if str(root_directory) not in sys.path:
+    sys.path.append(str(root_directory))
+
+import pandas as pd
+from bench_elo import make_elo_prep_df
+from analysis.elo_ratings import compute_elo_ratings
+from analysis.rating_state import RatingState, verify_against_full_recompute
+
+
+def check(label, state, elo_prep_df):
+    difference = verify_against_full_recompute(state, elo_prep_df, atol=0)
+    assert difference == 0, f"{label}: ratings differ from a full recompute by {difference}"
+    print(f"{label}: identical to a full recompute")
+
+
+# ------------ Benchmark
+if __name__ == "__main__":
+    num_events = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    athletes_per_event = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    elo_prep_df = make_elo_prep_df(num_events=num_events, athletes_per_event=athletes_per_event)
+    event_names = list(elo_prep_df["event_name"].unique())
+    backfilled = event_names[num_events // 2]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "elo_ratings.sqlite")
+        state = RatingState(path)
+
+        # Events in four batches, one event of the middle held back
+        applied = elo_prep_df[elo_prep_df["event_name"] != backfilled]
+        batch_size = -(-num_events // 4)
+        for first in range(0, num_events, batch_size):
+            batch_names = [name for name in event_names[first:first + batch_size] if name != backfilled]
+            state.update(applied[applied["event_name"].isin(batch_names)])
+            check(f"after events {first + 1}-{min(first + batch_size, num_events)}", state,
+                  applied[applied["event_name"].isin(event_names[:first + batch_size])])
+
+        # Back-filled event: the events after it are rolled back and replayed
+        state.update(elo_prep_df[elo_prep_df["event_name"] == backfilled])
+        check("back-filled event", state, elo_prep_df)
+
+        # Changed event: two athletes of an early event swap finish times
+        changed = elo_prep_df.copy()
+        rows = changed.index[changed["event_name"] == event_names[2]][:2]
+        changed.loc[rows, "total_seconds"] = changed.loc[rows[::-1], "total_seconds"].to_numpy()
+        state.update(changed[changed["event_name"] == event_names[2]])
+        check("changed event", state, changed)
+
+        # Snapshot, apply a new event, restore
+        snapshot_path = os.path.join(tmp, "snapshot.sqlite")
+        state.snapshot(snapshot_path)
+        new_event = changed[changed["event_name"] == event_names[-1]].assign(
+            event_name="2025 New City", Order=num_events + 1
+        )
+        with_new = pd.concat([changed, new_event], ignore_index=True)
+        start = time.perf_counter()
+        state.update(new_event)
+        incremental_seconds = time.perf_counter() - start
+        check("new event", state, with_new)
+        state.restore(snapshot_path)
+        check("restored snapshot", state, changed)
+
+        # Reopen: the state is read back from SQLite
+        state.close()
+        state = RatingState(path)
+        check("reopened state", state, changed)
+        state.close()
+
+    start = time.perf_counter()
+    compute_elo_ratings(with_new)
+    full_seconds = time.perf_counter() - start
+    print(f"one new event: {incremental_seconds:.3f}s incremental, {full_seconds:.3f}s full recompute "
+          f"({num_events + 1} events x {athletes_per_event} athletes)")
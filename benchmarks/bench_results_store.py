@@ -0,0 +1,72 @@
+# ------------ Setup
+# Compares load times of a results CSV and the Parquet results store.
+# Usage: python benchmarks/bench_results_store.py [results csv]
+import sys
+import tempfile
+import time
+from pathlib import Path
+current_script_path = Path(__file__).parent
+root_directory = current_script_path.parent
+if str(root_directory) not in sys.path:
+    sys.path.append(str(root_directory))
+
+import numpy as np
+import pandas as pd
+from functions.data_functions import load_data
+from functions.results_store import migrate_csv_to_parquet
+
+
+# ------------ Synthetic Results
+def make_results_csv(path, num_events=20, athletes_per_event=500, seed=0):
+    rng = np.random.default_rng(seed)
+    num_athletes = num_events * athletes_per_event
+    splits = rng.integers(60, 420, size=(num_athletes, 30)).cumsum(axis=1)
+    athlete = np.repeat(np.arange(num_athletes), 30)
+    elapsed = splits.ravel()
+    event = athlete // athletes_per_event
+    results = pd.DataFrame({
+        "desc": np.tile([f"Split {i}" for i in range(1, 31)], num_athletes),
+        "time_day": "_NONE_",
+        "time": [f"{s // 3600:02d}:{(s // 60) % 60:02d}:{s % 60:02d}" for s in elapsed],
+        "diff": "00:00",
+        "fullname": [f"Athlete {a} (GBR)" for a in athlete],
+        "age_class": "30-34",
+        "start_no": athlete.astype(str),
+        "event_id": [f"2024 City {e}_HYROX_{'Men' if e % 2 else 'Women'}" for e in event],
+        "season": np.where(event < num_events // 2, "2023-2024", "2024-2025")
+    })
+    results.to_csv(path, index=False)
+    return results
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    df = fn()
+    print(f"{label}: {time.perf_counter() - start:.3f}s ({len(df)} rows)")
+    return df
+
+
+# ------------ Benchmark
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = sys.argv[1] if len(sys.argv) > 1 else f"{tmp}/results.csv"
+        if len(sys.argv) == 1:
+            make_results_csv(csv_path)
+        parquet_path = f"{tmp}/results_parquet"
+        migrate_csv_to_parquet([csv_path], parquet_path)
+        some_event = pd.read_csv(csv_path, usecols=["event_id"], nrows=1)["event_id"][0]
+
+        csv_df = timed("CSV full load", lambda: load_data(csv_path))
+        parquet_df = timed("Parquet full load", lambda: load_data(parquet_path))
+        timed("CSV one event", lambda: load_data(csv_path, filters={"event_id": [some_event]}))
+        timed("Parquet one event", lambda: load_data(parquet_path, filters={"event_id": [some_event]}))
+        timed("Parquet one event, 3 columns", lambda: load_data(
+            parquet_path, columns=["time", "fullname", "event_id"], filters={"event_id": [some_event]}
+        ))
+
+        # Same rows regardless of storage
+        sort_columns = ["event_id", "start_no", "time"]
+        pd.testing.assert_frame_equal(
+            csv_df.sort_values(sort_columns).reset_index(drop=True),
+            parquet_df[csv_df.columns].sort_values(sort_columns).reset_index(drop=True)
+        )
@@ -0,0 +1,79 @@
+# ------------ Setup
+# Peak memory of get_clean_results against the streaming cleaner, and a check
+# that streaming stays under a memory ceiling and gives identical output.
+# Usage: python benchmarks/bench_stream_clean.py [results csv] [ceiling MB]
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+current_script_path = Path(__file__).parent
+root_directory = current_script_path.parent
+if str(root_directory) not in sys.path:
+    sys.path.append(str(root_directory))
+
+import pandas as pd
+from bench_results_store import make_results_csv
+from functions.data_functions import get_clean_results
+from functions.stream_clean import stream_clean_results, read_clean_results
+
+CHUNKSIZE = 200_000
+# Extra peak memory allowed for streaming, above the interpreter and imports
+DEFAULT_CEILING_MB = 400
+
+
+def _peak_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def write_results_csv(csv_path):
+    make_results_csv(csv_path, num_events=60, athletes_per_event=1500)
+
+
+def run_baseline():
+    return _peak_mb(), 0.0
+
+
+def run_in_memory(csv_path, output_path):
+    start = time.perf_counter()
+    # Pickled, so the check below also compares dtypes
+    get_clean_results(csv_path).to_pickle(output_path)
+    return _peak_mb(), time.perf_counter() - start
+
+
+def run_streaming(csv_path, output_path):
+    start = time.perf_counter()
+    stream_clean_results(csv_path, output_path, chunksize=CHUNKSIZE)
+    return _peak_mb(), time.perf_counter() - start
+
+
+def in_fresh_process(fn, *args):
+    # A new interpreter per run, so each peak is measured from the same start.
+    # The peak survives fork + exec, so this process must stay small as well.
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(fn, *args).result()
+
+
+# ------------ Benchmark
+if __name__ == "__main__":
+    ceiling_mb = float(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_CEILING_MB
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = sys.argv[1] if len(sys.argv) > 1 else f"{tmp}/results.csv"
+        if len(sys.argv) == 1:
+            in_fresh_process(write_results_csv, csv_path)
+        baseline_mb, _ = in_fresh_process(run_baseline)
+        in_memory_mb, in_memory_seconds = in_fresh_process(run_in_memory, csv_path, f"{tmp}/in_memory.pkl")
+        streaming_mb, streaming_seconds = in_fresh_process(run_streaming, csv_path, f"{tmp}/streamed.parquet")
+        print(f"in memory: {in_memory_seconds:.2f}s, peak {in_memory_mb - baseline_mb:.0f} MB above imports")
+        print(f"streaming: {streaming_seconds:.2f}s, peak {streaming_mb - baseline_mb:.0f} MB above imports "
+              f"(chunksize {CHUNKSIZE})")
+
+        expected = pd.read_pickle(f"{tmp}/in_memory.pkl")
+        streamed = read_clean_results(f"{tmp}/streamed.parquet")
+        pd.testing.assert_frame_equal(streamed, expected)
+        assert streaming_mb - baseline_mb <= ceiling_mb, f"Streaming peak above the {ceiling_mb:.0f} MB ceiling"
+        assert streaming_mb < in_memory_mb, "Streaming used more memory than get_clean_results"
+        print("identical output, under the memory ceiling")
@@ -0,0 +1,254 @@
+# ------------ Setup
+# Times and memory-profiles every table build stage on synthetic results of
+# several sizes and writes the numbers to JSON, one file per commit, so runs
+# can be compared across commits.
+# Usage: python benchmarks/bench_suite.py [--sizes 10000 100000 1000000] [--compare old.json]
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+current_script_path = Path(__file__).parent
+root_directory = current_script_path.parent
+if str(root_directory) not in sys.path:
+    sys.path.append(str(root_directory))
+
+import numpy as np
+import pandas as pd
+from synthetic_results import make_synthetic_results
+from functions.data_functions import (
+    get_clean_results,
+    get_elites_athletes,
+    get_race_finisher_df,
+    get_race_averages_df,
+    get_final_race_average_df,
+    get_final_ind_race_df
+)
+from functions.build_pipeline import BUILDS
+from analysis.elo_ratings import get_elo_prep_df, compute_elo_ratings
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+DEFAULT_OUTPUT_DIR = os.path.join(current_script_path, "results")
+# Slower than this ratio (and by more than MIN_REGRESSION_SECONDS, to ignore
+# noise on tiny stages) against the compared run is reported as a regression
+REGRESSION_RATIO = 1.1
+MIN_REGRESSION_SECONDS = 0.05
+DIVISIONS = [division for build in BUILDS.values() for division in build["divisions"]]
+
+
+# ------------ Stages
+# name -> (input names, function). Each stage's output is saved under its name
+# for the stages after it.
+def _race_averages(race_finishers):
+    return {
+        division["division"]: get_race_averages_df(
+            race_finishers[race_finishers["race_division"] == division["division"]],
+            group_cols=division["group_cols"]
+        )
+        for division in DIVISIONS
+    }
+
+
+def _final_race_averages(race_averages):
+    return {
+        division["division"]: get_final_race_average_df(
+            race_averages[division["division"]],
+            keep_percentiles=division.get("keep_percentiles", True),
+            time_group=division.get("time_group")
+        )
+        for division in DIVISIONS
+    }
+
+
+def _final_individual(race_finishers):
+    return {
+        division["division"]: get_final_ind_race_df(
+            race_finishers[race_finishers["race_division"] == division["division"]]
+        )
+        for division in DIVISIONS
+    }
+
+
+def _elo_prep(race_finishers, events):
+    return get_elo_prep_df(race_finishers, events, divisions=["Pro Men", "Elite Men"], time_group="sub_65")
+
+
+def _elo_ratings(elo_prep):
+    ratings, _ = compute_elo_ratings(elo_prep)
+    return ratings
+
+
+STAGES = {
+    "get_clean_results": (["csv_path"], get_clean_results),
+    "get_elites_athletes": (["clean_results"], get_elites_athletes),
+    "get_race_finisher_df": (["clean_results", "get_elites_athletes"], get_race_finisher_df),
+    "get_race_averages_df": (["get_race_finisher_df"], _race_averages),
+    "get_final_race_average_df": (["get_race_averages_df"], _final_race_averages),
+    "get_final_ind_race_df": (["get_race_finisher_df"], _final_individual),
+    "get_elo_prep_df": (["get_race_finisher_df", "events"], _elo_prep),
+    "compute_elo_ratings": (["get_elo_prep_df"], _elo_ratings)
+}
+# get_clean_results output is read by later stages as clean_results
+STAGE_OUTPUTS = {"get_clean_results": "clean_results"}
+
+
+def with_dependencies(stages):
+    """
+    The stages plus every stage whose output they read, in run order.
+    """
+    producers = {STAGE_OUTPUTS.get(name, name): name for name in STAGES}
+    needed = set()
+    pending = list(stages)
+    while pending:
+        name = pending.pop()
+        if name not in needed:
+            needed.add(name)
+            pending += [producers[input_name] for input_name in STAGES[name][0] if input_name in producers]
+    return [name for name in STAGES if name in needed]
+
+
+def _current_rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _rows(output):
+    if isinstance(output, dict):
+        return sum(len(value) for value in output.values())
+    return len(output)
+
+
+def run_stage(name, work_dir):
+    """
+    Runs one stage on the saved outputs of the stages before it.
+
+    Returns:
+    Dict with seconds, peak_mb (peak memory above the loaded inputs) and rows.
+    """
+    input_names, stage_fn = STAGES[name]
+    inputs = [pd.read_pickle(os.path.join(work_dir, f"{input_name}.pkl")) for input_name in input_names]
+    rss_before = _current_rss_mb()
+    start = time.perf_counter()
+    output = stage_fn(*inputs)
+    seconds = time.perf_counter() - start
+    peak_mb = max(0.0, _peak_rss_mb() - rss_before)
+    pd.to_pickle(output, os.path.join(work_dir, f"{STAGE_OUTPUTS.get(name, name)}.pkl"))
+    return {"seconds": round(seconds, 4), "peak_mb": round(peak_mb, 1), "rows": _rows(output)}
+
+
+def write_synthetic_inputs(num_athletes, work_dir, seed):
+    csv_path = os.path.join(work_dir, "results.csv")
+    start = time.perf_counter()
+    events = make_synthetic_results(csv_path, num_athletes, seed=seed)
+    pd.to_pickle(csv_path, os.path.join(work_dir, "csv_path.pkl"))
+    pd.to_pickle(events, os.path.join(work_dir, "events.pkl"))
+    return {"seconds": round(time.perf_counter() - start, 4), "csv_mb": round(os.path.getsize(csv_path) / 2**20, 1)}
+
+
+def in_fresh_process(fn, *args):
+    # A new interpreter per stage, so every peak is measured from the same start
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(fn, *args).result()
+
+
+# ------------ Suite
+def run_suite(sizes=DEFAULT_SIZES, stages=None, seed=0):
+    """
+    Generates synthetic results for every size and runs the stages on them.
+
+    Returns:
+    Dict of size -> {"generate": {...}, "stages": {stage name: {...}}}.
+    """
+    runs = {}
+    stages = stages or list(STAGES)
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as work_dir:
+            generate = in_fresh_process(write_synthetic_inputs, size, work_dir, seed)
+            print(f"{size} athletes: generated {generate['csv_mb']} MB in {generate['seconds']:.1f}s")
+            stage_results = {}
+            for name in with_dependencies(stages):
+                stage_results[name] = in_fresh_process(run_stage, name, work_dir)
+                result = stage_results[name]
+                print(f"  {name}: {result['seconds']:.3f}s, peak {result['peak_mb']:.0f} MB, {result['rows']} rows")
+            runs[str(size)] = {"generate": generate, "stages": stage_results}
+    return runs
+
+
+def get_metadata():
+    def git(*args):
+        try:
+            return subprocess.run(
+                ["git", *args], cwd=root_directory, capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    return {
+        "commit": git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count()
+    }
+
+
+def compare_runs(current, baseline, regression_ratio=REGRESSION_RATIO):
+    """
+    Prints the time ratio of every stage against a baseline run.
+
+    Returns:
+    List of (size, stage, ratio) slower than regression_ratio.
+    """
+    regressions = []
+    print(f"Compared with {baseline['metadata'].get('commit')} ({baseline['metadata'].get('timestamp')})")
+    for size, run in current["runs"].items():
+        baseline_stages = baseline["runs"].get(size, {}).get("stages", {})
+        for name, result in run["stages"].items():
+            if name not in baseline_stages or not baseline_stages[name]["seconds"]:
+                continue
+            ratio = result["seconds"] / baseline_stages[name]["seconds"]
+            slower = result["seconds"] - baseline_stages[name]["seconds"] > MIN_REGRESSION_SECONDS
+            flag = "  <- slower" if ratio > regression_ratio and slower else ""
+            print(f"  {size} {name}: {baseline_stages[name]['seconds']:.3f}s -> {result['seconds']:.3f}s ({ratio:.2f}x){flag}")
+            if flag:
+                regressions.append((size, name, ratio))
+    return regressions
+
+
+# ------------ Benchmark
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time and memory-profile the table build stages")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Numbers of athletes")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), help="Stages to report, defaults to all")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic data seed")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR, help="Directory for the JSON results")
+    parser.add_argument("--compare", help="Earlier JSON results to compare with")
+    args = parser.parse_args()
+
+    report = {"metadata": get_metadata(), "runs": run_suite(args.sizes, args.stages, args.seed)}
+    os.makedirs(args.output_dir, exist_ok=True)
+    output_path = os.path.join(
+        args.output_dir, f"bench_{report['metadata']['commit'] or 'unknown'}_{int(time.time())}.json"
+    )
+    with open(output_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {output_path}")
+    if args.compare:
+        with open(args.compare) as f:
+            if compare_runs(report, json.load(f)):
+                sys.exit(1)
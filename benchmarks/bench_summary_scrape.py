@@ -0,0 +1,149 @@
+# ------------ Setup
+# Summary scrape (list pages only) against the detail scrape (every athlete
+# page) of one event on a local results site: requests, time, and a check
+# that both give the same finish times and finish time table.
+# Usage: python benchmarks/bench_summary_scrape.py [field size] [latency seconds]
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+current_script_path = Path(__file__).parent
+root_directory = current_script_path.parent
+if str(root_directory) not in sys.path:
+    sys.path.append(str(root_directory))
+
+import pandas as pd
+from bench_athlete_parser import make_detail_page
+from functions.data_functions import clean_raw_results, get_race_finisher_df
+from functions.scrape_functions import fetch_pages, fetch_url, parse_summary_page, plan_list_pages, scrape_athletes_http
+from functions.summary_results import (
+    clean_summary_results,
+    get_final_finish_time_df,
+    get_finish_time_df,
+    get_summary_finisher_df
+)
+
+NUM_RESULTS = 100
+EVENT_ID = "2024 Local_HYROX PRO_Men"
+# Default per-host rate of fetch_pages, for the time a live scrape would take
+LIVE_REQUESTS_PER_SECOND = 5.0
+# Rate used here, the local site has no limit
+BENCH_REQUESTS_PER_SECOND = 100.0
+
+
+def finish_time(athlete_num):
+    # Time of the last row of make_detail_page, the finish (Wallballs) split
+    elapsed = sum(240 + (athlete_num * 7 + split_num * 13) % 180 for split_num in range(30))
+    return f"{elapsed // 3600:02d}:{(elapsed // 60) % 60:02d}:{elapsed % 60:02d}"
+
+
+def make_list_page(field_size, page):
+    first = (page - 1) * NUM_RESULTS
+    athletes = range(first, min(first + NUM_RESULTS, field_size))
+    rows = "".join(
+        f'<li class="list-group-item row">'
+        f'<h4 class="list-field type-fullname"><a href="?content=detail&amp;idp=A{i}">Athlete {i}, Test (GBR)</a></h4>'
+        f'<div class="list-field type-age_class"><div class="list-label">Age Group</div>30-34</div>'
+        f'<div class="list-field type-start_no"><div class="list-label">Number</div>{1000 + i}</div>'
+        f'<div class="list-field type-time"><div class="list-label">Total</div>{finish_time(i)}</div></li>'
+        for i in athletes
+    )
+    info = f"{first + 1} - {first + len(athletes)} / {field_size:,}" if len(athletes) else "No results"
+    return (
+        f'<html><body><div class="list-info"><ul><li class="list-info-text">{info}</li></ul></div>'
+        f'<ul class="list-group">{rows}</ul></body></html>'
+    )
+
+
+def start_site(field_size, latency):
+    class Handler(BaseHTTPRequestHandler):
+        requests = 0
+
+        def do_GET(self):
+            Handler.requests += 1
+            time.sleep(latency)
+            query = parse_qs(urlparse(self.path).query)
+            if "idp" in query:
+                body = make_detail_page(int(query["idp"][0][1:]))
+            else:
+                body = make_list_page(field_size, int(query.get("page", ["1"])[0]))
+            body = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, Handler, f"http://127.0.0.1:{server.server_port}/?pid=list&num_results={NUM_RESULTS}"
+
+
+def list_pages(first_url):
+    first_source = fetch_url(first_url)
+    plan = plan_list_pages(first_source, first_url, NUM_RESULTS)
+    sources = fetch_pages(plan["urls"], requests_per_second=BENCH_REQUESTS_PER_SECOND)
+    return list(zip([first_url] + plan["urls"], [first_source] + sources))
+
+
+def add_event(df):
+    df["event_id"] = EVENT_ID
+    df["season"] = "2024-2025"
+    return df
+
+
+def summary_scrape(first_url):
+    pages = [parse_summary_page(source, url) for url, source in list_pages(first_url)]
+    summary = add_event(pd.concat(pages, ignore_index=True))
+    return get_summary_finisher_df(clean_summary_results(summary, verbose=False), [])
+
+
+def detail_scrape(first_url):
+    athlete_list = []
+    for url, source in list_pages(first_url):
+        scrape_athletes_http(athlete_list, source, url, requests_per_second=BENCH_REQUESTS_PER_SECOND)
+    results = add_event(pd.concat(athlete_list, ignore_index=True)).astype("string")
+    return get_race_finisher_df(clean_raw_results(results, verbose=False), [])
+
+
+# ------------ Benchmark
+if __name__ == "__main__":
+    field_size = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    server, handler, first_url = start_site(field_size, latency)
+    print(f"{field_size} athletes, {NUM_RESULTS} per list page, {latency:.2f}s per request")
+
+    start = time.perf_counter()
+    summary_finishers = summary_scrape(first_url)
+    summary_seconds = time.perf_counter() - start
+    summary_requests, handler.requests = handler.requests, 0
+
+    start = time.perf_counter()
+    detail_finishers = detail_scrape(first_url)
+    detail_seconds = time.perf_counter() - start
+    detail_requests = handler.requests
+    server.shutdown()
+
+    for name, requests, seconds in [
+        ("summary", summary_requests, summary_seconds),
+        ("detail", detail_requests, detail_seconds)
+    ]:
+        print(f"  {name:8} {requests:5d} requests, {seconds:5.1f}s here, "
+              f"~{requests / LIVE_REQUESTS_PER_SECOND:.0f}s at {LIVE_REQUESTS_PER_SECOND:.0f} requests/sec")
+
+    # Same athletes and finish times, and the same finish time table
+    columns = ["race_person_id", "clean_name", "age_class", "total_seconds"]
+    summary_times = summary_finishers[columns].sort_values("race_person_id").reset_index(drop=True)
+    detail_times = detail_finishers[columns].sort_values("race_person_id").reset_index(drop=True)
+    assert len(summary_times) == field_size, f"Summary has {len(summary_times)} of {field_size} athletes"
+    pd.testing.assert_frame_equal(summary_times.astype(str), detail_times.astype(str))
+    pd.testing.assert_frame_equal(
+        get_final_finish_time_df(get_finish_time_df(summary_finishers)),
+        get_final_finish_time_df(get_finish_time_df(detail_finishers))
+    )
+    print("summary finish times identical to the detail scrape")
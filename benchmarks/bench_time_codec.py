@@ -0,0 +1,62 @@
+# ------------ Setup
+# Compares the time codec with regex + pd.to_timedelta parsing and per-value formatting.
+# Usage: python benchmarks/bench_time_codec.py [rows]
+import sys
+import time
+from pathlib import Path
+current_script_path = Path(__file__).parent
+root_directory = current_script_path.parent
+if str(root_directory) not in sys.path:
+    sys.path.append(str(root_directory))
+
+import numpy as np
+import pandas as pd
+from functions.data_functions import convert_to_min_sec
+from functions.time_codec import parse_durations, format_durations
+
+
+# ------------ Reference Implementation
+def legacy_parse(times):
+    valid = times.str.match(r"^[\d]{1,2}:[\d]{2}:[\d]{2}$")
+    seconds = pd.to_timedelta(times.where(valid == True)).dt.total_seconds()
+    return seconds, valid
+
+
+# ------------ Synthetic Input
+def make_times(num_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    seconds = rng.integers(0, 3 * 3600, size=num_rows)
+    times = np.array([f"{s // 3600:02d}:{(s // 60) % 60:02d}:{s % 60:02d}" for s in seconds], dtype=object)
+    # Unpadded hours, malformed strings and missing values
+    times[::7] = [t[1:] for t in times[::7]]
+    times[::1001] = "DNF"
+    times[::997] = "--"
+    times[::5003] = None
+    return pd.Series(times, dtype="string")
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label}: {elapsed:.3f}s")
+    return result, elapsed
+
+
+# ------------ Benchmark
+if __name__ == "__main__":
+    num_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    times = make_times(num_rows)
+    print(f"Rows: {num_rows}")
+
+    (legacy_seconds, legacy_valid), legacy_parse_time = timed("regex + to_timedelta", lambda: legacy_parse(times))
+    (seconds, valid, missing), parse_time = timed("parse_durations", lambda: parse_durations(times))
+    np.testing.assert_array_equal(legacy_valid.fillna(False).to_numpy(dtype=bool), valid)
+    np.testing.assert_array_equal(legacy_seconds.to_numpy(dtype=float), seconds)
+    print(f"parse speedup: {legacy_parse_time / parse_time:.1f}x")
+
+    values = pd.Series(np.where(valid, seconds, 0.0) + 0.4)
+    legacy_formatted, legacy_format_time = timed("apply(convert_to_min_sec)", lambda: values.apply(convert_to_min_sec))
+    formatted, format_time = timed("format_durations", lambda: format_durations(values))
+    assert legacy_formatted.tolist() == formatted.tolist()
+    print(f"format speedup: {legacy_format_time / format_time:.1f}x")
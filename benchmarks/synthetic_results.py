@@ -0,0 +1,207 @@
+# ------------ Setup
+# Synthetic HYROX results in the scraper's 9-column CSV schema, for benchmarks
+# when the real data is not available.
+# Usage: python benchmarks/synthetic_results.py <num athletes> <results csv> [events csv]
+import sys
+from pathlib import Path
+current_script_path = Path(__file__).parent
+root_directory = current_script_path.parent
+if str(root_directory) not in sys.path:
+    sys.path.append(str(root_directory))
+
+import numpy as np
+import pandas as pd
+from functions.data_functions import SPLIT_MAPPING, NO_ROX_SPLIT_MAPPING, NO_ROXZONE_LIST
+from functions.results_store import RESULTS_COLUMNS
+from functions.time_codec import format_durations
+
+# Typical split seconds of an open athlete of average ability
+TYPICAL_SECONDS = {
+    "Run": 300,
+    "Rox": 45,
+    "SkiErg": 290,
+    "Sled-Push": 200,
+    "Sled-Pull": 300,
+    "Burpee-Broad-Jump": 290,
+    "Row": 300,
+    "Farmers-Carry": 130,
+    "Lunges": 270,
+    "Wallballs": 360
+}
+# (division in event_id, share of an event's field, ability multiplier)
+DIVISION_FIELDS = [
+    ("HYROX", 0.8, 1.0),
+    ("HYROX PRO", 0.2, 0.8)
+]
+ELITE_DIVISION = ("HYROX ELITE", 0.68)
+ELITE_FIELD_SIZE = 15
+GENDERS = [("Men", 0.55, 1.0), ("Women", 0.45, 1.12)]
+AGE_CLASSES = ["16-24", "25-29", "30-34", "35-39", "40-44", "45-49", "50-54", "55-59", "60-64"]
+NATIONALITIES = ["GBR", "USA", "GER", "AUS", "NED", "FRA", "ESP", "ITA", "SWE", "POL", "IRL", "SUI"]
+SEASONS = ["2023-2024", "2024-2025"]
+FIRST_NAMES = {
+    "Men": ["James", "Lukas", "Tom", "Max", "Jack", "Ben", "Alex", "Sam", "Daniel", "David", "Felix", "Jonas"],
+    "Women": ["Anna", "Sophie", "Laura", "Emma", "Mia", "Lena", "Julia", "Hannah", "Chloe", "Olivia", "Sara", "Lea"]
+}
+SYLLABLES = ["ber", "son", "man", "ley", "ton", "ford", "sch", "mil", "ric", "van", "del", "hof", "gar", "lin"]
+# Malformed values seen in scraped time cells
+BAD_TIMES = ["DNF", "_NONE_", "--:--:--", "1:2:3", "100:00:00"]
+
+
+def _split_keys(mapping):
+    # TYPICAL_SECONDS key of every split of an event layout
+    return ["Run" if name.startswith("Run-") else "Rox" if "Rox" in name else name for name in mapping.values()]
+
+
+def make_events(num_events, seed=0):
+    """
+    Events table in the data/hyrox_events.csv schema. Every eighth event is an
+    elite event, the first one "2023 Stockholm" (the elite event without Roxzone splits).
+    """
+    rng = np.random.default_rng(seed)
+    names = [f"{2023 + i * len(SEASONS) // num_events} City {i}" for i in range(num_events)]
+    elite = np.arange(num_events) % 8 == 3
+    names[int(np.flatnonzero(elite)[0]) if elite.any() else 0] = "2023 Stockholm"
+    return pd.DataFrame({
+        "Event Name": names,
+        "Order": np.arange(1, num_events + 1),
+        "season": [SEASONS[min(i * len(SEASONS) // num_events, len(SEASONS) - 1)] for i in range(num_events)],
+        "elite": np.where(elite, "Yes", "No"),
+        "lcq_ind": "No",
+        "division_names": np.where(elite, "HYROX ELITE, HYROX PRO", "HYROX PRO"),
+        "weight": rng.uniform(0.5, 1.5, num_events)
+    })
+
+
+def _athlete_pool(num_names, gender, rng):
+    first = rng.choice(FIRST_NAMES[gender], num_names)
+    last = [
+        "".join(parts).capitalize()
+        for parts in rng.choice(SYLLABLES, size=(num_names, 3))
+    ]
+    nationality = rng.choice(NATIONALITIES, num_names)
+    return pd.DataFrame({
+        "fullname": [f"{f} {l} ({n})" for f, l, n in zip(first, last, nationality)],
+        "age_class": rng.choice(AGE_CLASSES, num_names),
+        "ability": rng.lognormal(0.0, 0.15, num_names)
+    })
+
+
+def _event_rows(event_id, season, athletes, ability, no_rox, start_no, rng, bad_rate, duplicate_rate):
+    mapping = NO_ROX_SPLIT_MAPPING if no_rox else SPLIT_MAPPING
+    typical = np.array([TYPICAL_SECONDS[key] for key in _split_keys(mapping)], dtype=np.float64)
+    num_athletes, num_splits = len(athletes), len(typical)
+    splits = np.rint(typical * ability[:, None] * rng.lognormal(0.0, 0.08, (num_athletes, num_splits)))
+    elapsed = splits.cumsum(axis=1)
+    start_clock = rng.integers(7 * 3600, 18 * 3600, num_athletes)[:, None]
+
+    times = format_durations(elapsed.ravel())
+    # A few races have a malformed time somewhere in their splits
+    bad = np.flatnonzero(rng.random(num_athletes) < bad_rate)
+    if len(bad):
+        times[bad * num_splits + rng.integers(0, num_splits, len(bad))] = rng.choice(BAD_TIMES, len(bad))
+    rows = pd.DataFrame({
+        "desc": np.tile(list(mapping.values()), num_athletes),
+        "time_day": format_durations(((start_clock + elapsed) % 86400).ravel()),
+        "time": times,
+        "diff": pd.Series(format_durations(splits.ravel()), dtype="str").str.slice(3).to_numpy(),
+        "fullname": np.repeat(athletes["fullname"].to_numpy(), num_splits),
+        "age_class": np.repeat(athletes["age_class"].to_numpy(), num_splits),
+        "start_no": np.repeat((start_no + np.arange(num_athletes)).astype(str), num_splits),
+        "event_id": event_id,
+        "season": season
+    })
+    # Pages scraped twice: whole athlete blocks repeated at the end of the event
+    repeated = np.flatnonzero(rng.random(num_athletes) < duplicate_rate)
+    if len(repeated):
+        rows = pd.concat(
+            [rows, rows.iloc[(repeated[:, None] * num_splits + np.arange(num_splits)).ravel()]],
+            ignore_index=True
+        )
+    return rows[RESULTS_COLUMNS]
+
+
+def make_synthetic_results(
+    csv_path,
+    num_athletes,
+    num_events=None,
+    events_path=None,
+    seed=0,
+    repeat_rate=0.4,
+    bad_rate=0.003,
+    duplicate_rate=0.01
+):
+    """
+    Writes about num_athletes synthetic race results (one row per split, as the
+    scraper writes them) to csv_path, one event at a time so memory stays
+    bounded.
+
+    Covers open, pro and elite divisions for men and women, 30-split events
+    and the 16-split elite events without Roxzone splits, malformed time
+    strings and athlete pages scraped twice. A repeat_rate share of results
+    comes from athletes who race more than once, so ratings and per-athlete
+    histories have something to work with.
+
+    Args:
+    csv_path: Results CSV to write.
+    num_athletes: Approximate number of race results (athletes x events).
+    num_events: Number of events, defaults to one per ~2000 results (at least 8).
+    events_path: Optional path for the matching events CSV.
+    seed: Random seed, the same arguments always give the same files.
+
+    Returns:
+    The events DataFrame.
+    """
+    rng = np.random.default_rng(seed)
+    num_events = num_events or max(8, num_athletes // 2000)
+    events = make_events(num_events, seed)
+    pools = {
+        gender: _athlete_pool(max(1, int(num_athletes * share * (1 - repeat_rate))), gender, rng)
+        for gender, share, _ in GENDERS
+    }
+    weights = events["weight"].to_numpy() / events["weight"].sum()
+    field_sizes = rng.multinomial(num_athletes, weights)
+
+    start_no = 1
+    header = True
+    for event, field_size in zip(events.itertuples(index=False), field_sizes):
+        fields = []
+        for (division, division_share, division_ability), (gender, gender_share, gender_ability) in (
+            (division, gender) for division in DIVISION_FIELDS for gender in GENDERS
+        ):
+            size = int(field_size * division_share * gender_share)
+            fields.append((division, gender, size, division_ability * gender_ability))
+        if event.elite == "Yes":
+            fields += [
+                (ELITE_DIVISION[0], gender, ELITE_FIELD_SIZE, ELITE_DIVISION[1] * gender_ability)
+                for gender, _, gender_ability in GENDERS
+            ]
+        for division, gender, size, ability in fields:
+            if size == 0:
+                continue
+            event_id = f"{event[0]}_{division}_{gender}"
+            pool = pools[gender]
+            athletes = pool.iloc[rng.integers(0, len(pool), size)].drop_duplicates("fullname")
+            rows = _event_rows(
+                event_id,
+                event.season,
+                athletes,
+                athletes["ability"].to_numpy() * ability,
+                event_id in NO_ROXZONE_LIST,
+                start_no,
+                rng,
+                bad_rate,
+                duplicate_rate
+            )
+            rows.to_csv(csv_path, mode="w" if header else "a", header=header, index=False)
+            header = False
+            start_no += len(athletes)
+
+    events = events.drop(columns="weight")
+    if events_path:
+        events.to_csv(events_path, index=False)
+    return events
+
+
+if __name__ == "__main__":
+    make_synthetic_results(sys.argv[2], int(sys.argv[1]), events_path=sys.argv[3] if len(sys.argv) > 3 else None)
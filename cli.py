@@ -0,0 +1,188 @@
+# ------------------ Command Line
+# python cli.py scrape  --events "2024 Amsterdam" --division pro --gender Men --season 2024-2025
+# python cli.py scrape  --events "2024 Amsterdam" --scrape-mode detail | --athletes "Doe, John"
+# python cli.py build   [open] [pro] [--dry-run]
+# python cli.py publish [open] [pro] [--dry-run]
+# python cli.py rank    [--top 25]
+# python cli.py reparse [--events <event_id> ...] [--output-dir data/reparsed]
+#
+# Every subcommand imports what it uses when it runs, so e.g. build never loads
+# Selenium and rank never loads gspread.
+import argparse
+import sys
+
+DEFAULT_EVENTS_PATH = "data/hyrox_events.csv"
+DEFAULT_RESULTS_URL = "https://results.hyrox.com/season-7/&lang=EN_CAP"
+DEFAULT_PAGE_CACHE_DIR = "data/page_cache"
+DEFAULT_MAX_JOB_ATTEMPTS = 3
+
+
+# ------------------ Subcommands
+def scrape(args):
+    import pandas as pd
+    import scraper
+    if args.athletes:
+        # Splits of a few athletes, from the detail URLs in the summary table
+        from functions.summary_results import get_summary_path
+        _, export_path = scraper.get_division_event(args.division, args.gender)
+        scraper.scrape_athlete_details(get_summary_path(export_path), args.athletes, export_path, cities=args.events)
+        return
+    events = pd.read_csv(args.events_csv)
+    if args.all_divisions:
+        for city in args.events:
+            scraper.scrape_single_event_all_divisions(
+                city,
+                season=args.season,
+                mode=args.mode,
+                results_url=args.results_url,
+                fetch_mode=args.fetch_mode,
+                parquet_path=args.parquet_path,
+                page_cache_dir=args.page_cache_dir,
+                scrape_mode=args.scrape_mode,
+                max_attempts=args.max_attempts,
+                retry_failed=args.retry_failed
+            )
+        return
+    scrape_events = events[events["Event Name"].isin(args.events)].reset_index(drop=True)
+    missing = set(args.events) - set(scrape_events["Event Name"])
+    if missing:
+        raise SystemExit(f"Events not in {args.events_csv}: {sorted(missing)}")
+    scraper.scrape_multiple_events(
+        scrape_events,
+        args.division,
+        args.gender,
+        season=args.season,
+        mode=args.mode,
+        results_url=args.results_url,
+        fetch_mode=args.fetch_mode,
+        num_workers=args.workers,
+        parquet_path=args.parquet_path,
+        page_cache_dir=args.page_cache_dir,
+        scrape_mode=args.scrape_mode,
+        max_attempts=args.max_attempts,
+        retry_failed=args.retry_failed
+    )
+
+
+def build(args, publish_only=False):
+    from functions.build_pipeline import BUILDS, run_builds
+    unknown = set(args.builds) - set(BUILDS)
+    if unknown:
+        raise SystemExit(f"Unknown builds {sorted(unknown)}, choose from {list(BUILDS)}")
+    run_builds(args, publish_only=publish_only)
+
+
+def publish(args):
+    build(args, publish_only=True)
+
+
+def rank(args):
+    import pandas as pd
+    from analysis.race_performance_rankings import update_rankings
+    ratings = update_rankings(
+        results_path=args.results,
+        event_path=args.events_csv,
+        rating_state_path=args.rating_state,
+        athlete_index_path=args.athlete_index,
+        athlete_history_path=args.athlete_history,
+        divisions=args.divisions,
+        time_group=args.time_group,
+        summary_path=args.summary,
+        verify=args.verify
+    )
+    pd.set_option("display.precision", 2)
+    print(ratings.head(args.top).to_string())
+
+
+def reparse(args):
+    from functions.page_cache import reparse_results
+    reparse_results(args.page_cache_dir, args.output_dir, args.events, args.workers, args.parquet_path)
+
+
+# ------------------ Parser
+def _add_build_arguments(parser, run=True):
+    # Defaults match functions/build_pipeline.py, which is only imported to run the build
+    parser.add_argument("builds", nargs="*", help="Builds to run (open, pro), defaults to all")
+    parser.add_argument("--dry-run", action="store_true", help="Write tables to --output-dir instead of Google Sheets")
+    parser.add_argument("--output-dir", default="data/build_output", help="Directory for dry run output")
+    parser.add_argument("--cache-dir", default="data/build_cache", help="Stage cache directory")
+    parser.add_argument("--credentials", default="google_credentials.json", help="Google service account credentials")
+    if run:
+        parser.add_argument("--athlete-index", default=None,
+                            help="Add stable athlete ids from this index, e.g. data/athlete_index.sqlite")
+        parser.add_argument("--athlete-history", default=None,
+                            help="Store the finishers in this athlete history, e.g. data/athlete_history.sqlite")
+        parser.add_argument("--no-cache", action="store_true", help="Recompute every stage")
+        parser.add_argument("--workers", type=int, default=None, help="Process pool size for division branches")
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description="Scrape HYROX results, build and publish the tables, update rankings")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    scrape_parser = subparsers.add_parser("scrape", help="Scrape event results into data/")
+    scrape_parser.add_argument("--events", nargs="+", required=True, help='Event names, e.g. "2024 Amsterdam"')
+    scrape_parser.add_argument("--events-csv", default=DEFAULT_EVENTS_PATH, help="Events table")
+    scrape_parser.add_argument("--division", default="pro", help='pro, pro-all, open, doubles, "pro doubles" or an ELITE event')
+    scrape_parser.add_argument("--gender", default="Men", choices=["Men", "Women"])
+    scrape_parser.add_argument("--all-divisions", action="store_true", help="Scrape every division of each event")
+    scrape_parser.add_argument("--season", default="2024-2025")
+    scrape_parser.add_argument("--mode", default="a", choices=["a", "w"], help="Append to or overwrite the results CSV")
+    scrape_parser.add_argument("--results-url", default=DEFAULT_RESULTS_URL)
+    scrape_parser.add_argument("--fetch-mode", default="http", choices=["http", "browser"])
+    scrape_parser.add_argument("--workers", type=int, default=1, help="Parallel browsers")
+    scrape_parser.add_argument("--parquet-path", default=None, help="Also write to the Parquet results store")
+    scrape_parser.add_argument("--page-cache-dir", default=DEFAULT_PAGE_CACHE_DIR, help="Raw page cache for reparse")
+    scrape_parser.add_argument("--no-page-cache", dest="page_cache_dir", action="store_const", const=None,
+                               help="Do not keep the raw pages")
+    scrape_parser.add_argument("--scrape-mode", default="detail", choices=["detail", "summary"],
+                               help="detail: every athlete page with splits (the results CSVs build reads); "
+                                    "summary: finish times from the list pages only")
+    scrape_parser.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_JOB_ATTEMPTS,
+                               help="Runs of an incomplete job before it is marked failed and skipped")
+    scrape_parser.add_argument("--retry-failed", action="store_true",
+                               help="Give failed jobs a new set of attempts, keeping their completed pages")
+    scrape_parser.add_argument("--athletes", nargs="+", help="Scrape the detail pages of these athletes from the summary table")
+    scrape_parser.set_defaults(handler=scrape)
+
+    build_parser = subparsers.add_parser("build", help="Build the race and individual tables and publish them")
+    _add_build_arguments(build_parser)
+    build_parser.set_defaults(handler=build)
+
+    publish_parser = subparsers.add_parser("publish", help="Publish the tables of the last build without rebuilding")
+    _add_build_arguments(publish_parser, run=False)
+    publish_parser.set_defaults(handler=publish)
+
+    rank_parser = subparsers.add_parser("rank", help="Update the Elo ratings with new events")
+    rank_parser.add_argument("--results", default="data/hyrox_results_pro.csv", help="Results CSV or Parquet store")
+    rank_parser.add_argument("--summary", default=None,
+                             help="Summary table (scrape --scrape-mode summary) with the events not scraped in detail")
+    rank_parser.add_argument("--summary-only", dest="results", action="store_const", const=None,
+                             help="Rank from --summary alone, without detail results")
+    rank_parser.add_argument("--events-csv", default=DEFAULT_EVENTS_PATH, help="Events table")
+    rank_parser.add_argument("--rating-state", default="data/elo_ratings.sqlite", help="Elo rating state")
+    rank_parser.add_argument("--athlete-index", default="data/athlete_index.sqlite", help="Athlete identity index")
+    rank_parser.add_argument("--athlete-history", default="data/athlete_history.sqlite", help="Athlete history store")
+    rank_parser.add_argument("--divisions", nargs="+", default=["Pro Men", "Elite Men"])
+    rank_parser.add_argument("--time-group", default="sub_65")
+    rank_parser.add_argument("--top", type=int, default=25, help="Number of athletes to print")
+    rank_parser.add_argument("--verify", action="store_true", help="Check the ratings against a full recompute")
+    rank_parser.set_defaults(handler=rank)
+
+    reparse_parser = subparsers.add_parser("reparse", help="Rebuild the results files from cached pages, without scraping")
+    reparse_parser.add_argument("--events", nargs="+", help="event_ids to rebuild, defaults to every cached event")
+    reparse_parser.add_argument("--page-cache-dir", default=DEFAULT_PAGE_CACHE_DIR, help="Raw page cache")
+    reparse_parser.add_argument("--output-dir", default="data/reparsed", help="Directory for the rebuilt results CSVs")
+    reparse_parser.add_argument("--workers", type=int, default=None, help="Process pool size")
+    reparse_parser.add_argument("--parquet-path", default=None, help="Also write to the Parquet results store")
+    reparse_parser.set_defaults(handler=reparse)
+    return parser
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
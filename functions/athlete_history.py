@@ -0,0 +1,235 @@
+# ------------------ Imports
+import sqlite3
+import numpy as np
+import pandas as pd
+from functions.data_functions import SPLIT_LAYOUT
+
+DEFAULT_ATHLETE_HISTORY_PATH = "data/athlete_history.sqlite"
+
+# Columns of get_race_finisher_df kept per result, with their SQLite types
+IDENTITY_COLUMNS = {
+    "race_person_id": "TEXT",
+    "event_id": "TEXT",
+    "event_name": "TEXT",
+    "season": "TEXT",
+    "event_order": "REAL",
+    "race_division": "TEXT",
+    "clean_name": "TEXT",
+    "athlete_id": "INTEGER",
+    "fullname": "TEXT",
+    "age_class": "TEXT",
+    "time_bucket": "TEXT",
+    "elite_athlete": "INTEGER"
+}
+AGGREGATE_COLUMNS = [
+    "total_run",
+    "total_rox_zone",
+    "total_station",
+    "avg_run_all",
+    "avg_run_exclude_first",
+    "min_run_exclude_first",
+    "max_run_exclude_first",
+    "total_run_and_rox",
+    "run_and_rox_pct",
+    "station_pct",
+    "run_range_exclude_first",
+    "run_range_pct_exclude_first"
+]
+# Every column that can be ranked or returned as a metric
+METRIC_COLUMNS = ["total_seconds"] + [name for name in SPLIT_LAYOUT if name != "Unknown"] + AGGREGATE_COLUMNS
+COLUMNS = list(IDENTITY_COLUMNS) + METRIC_COLUMNS
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS results (
+    {", ".join(f'"{column}" {IDENTITY_COLUMNS.get(column, "REAL")}' for column in COLUMNS)},
+    PRIMARY KEY (race_person_id)
+);
+CREATE INDEX IF NOT EXISTS results_name_order ON results (clean_name, event_order);
+CREATE INDEX IF NOT EXISTS results_athlete_order ON results (athlete_id, event_order);
+CREATE INDEX IF NOT EXISTS results_event ON results (event_id);
+CREATE TABLE IF NOT EXISTS events (
+    event_id TEXT PRIMARY KEY,
+    num_results INTEGER NOT NULL,
+    fingerprint TEXT NOT NULL
+);
+"""
+
+
+def _quote(column):
+    return f'"{column}"'
+
+
+def get_history_rows(race_finisher_df, events=None):
+    """
+    Finisher rows in the store's column layout, with the event Order from
+    data/hyrox_events.csv when events is given.
+    """
+    rows = race_finisher_df.reindex(columns=[column for column in COLUMNS if column != "event_order"])
+    if events is not None:
+        orders = events[["Event Name", "season", "Order"]].drop_duplicates(["Event Name", "season"])
+        rows["event_order"] = (
+            rows[["event_name", "season"]]
+            .merge(orders, how="left", left_on=["event_name", "season"], right_on=["Event Name", "season"])
+            ["Order"]
+            .to_numpy()
+        )
+    else:
+        rows["event_order"] = np.nan
+    return rows[COLUMNS]
+
+
+def _event_fingerprints(rows):
+    # Order-insensitive hash of each event's rows: (row count, sum of row hashes)
+    row_hashes = pd.Series(
+        pd.util.hash_pandas_object(rows, index=False).to_numpy(), index=rows["event_id"].to_numpy()
+    )
+    grouped = row_hashes.groupby(level=0, sort=False)
+    counts, totals = grouped.size(), grouped.sum()
+    return {
+        event_id: (int(count), f"{count}:{int(totals[event_id])}")
+        for event_id, count in counts.items()
+    }
+
+
+class AthleteHistoryStore:
+    """
+    Every finisher result (splits, aggregates and event Order) in one SQLite
+    table, indexed by athlete and event Order, so one athlete's history or a
+    top-K by any metric is a single indexed query instead of a rebuild of the
+    finisher table from the results CSVs.
+
+    Results are written per event: update rewrites only events that are new or
+    whose rows changed since the last update, and keeps events it is not given,
+    so several builds can share one store.
+
+    Args:
+    path: Location of the SQLite database (defaults to data/athlete_history.sqlite).
+    """
+    def __init__(self, path=DEFAULT_ATHLETE_HISTORY_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def update(self, race_finisher_df, events=None):
+        """
+        Stores the results of race_finisher_df (see get_race_finisher_df).
+
+        Args:
+        race_finisher_df: Finisher table, optionally with athlete_id (see functions/athlete_index.py).
+        events: Optional data/hyrox_events.csv DataFrame for the event Order.
+
+        Returns:
+        Number of events written.
+        """
+        rows = get_history_rows(race_finisher_df, events)
+        fingerprints = _event_fingerprints(rows)
+        stored = dict(self.conn.execute("SELECT event_id, fingerprint FROM events"))
+        changed = [
+            event_id for event_id, (_, fingerprint) in fingerprints.items()
+            if stored.get(event_id) != fingerprint
+        ]
+        if not changed:
+            return 0
+        rows = rows[rows["event_id"].isin(changed)]
+        values = rows.astype(object).where(rows.notna(), None)
+        values["elite_athlete"] = [None if flag is None else int(flag) for flag in values["elite_athlete"]]
+        values["athlete_id"] = [None if athlete_id is None else int(athlete_id) for athlete_id in values["athlete_id"]]
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        with self.conn:
+            self.conn.executemany("DELETE FROM results WHERE event_id = ?", [(event_id,) for event_id in changed])
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO results ({', '.join(map(_quote, COLUMNS))}) VALUES ({placeholders})",
+                values.itertuples(index=False, name=None)
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO events VALUES (?, ?, ?)",
+                [(event_id, *fingerprints[event_id]) for event_id in changed]
+            )
+        print(f"Athlete history: {len(changed)} events written, {len(fingerprints) - len(changed)} unchanged")
+        return len(changed)
+
+    # --- Queries
+    def _query(self, sql, params, columns):
+        frame = pd.DataFrame(self.conn.execute(sql, params).fetchall(), columns=columns)
+        return frame.rename(columns={"event_order": "Order"})
+
+    def _metrics(self, metrics):
+        metrics = METRIC_COLUMNS if metrics is None else list(metrics)
+        unknown = [metric for metric in metrics if metric not in METRIC_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown metrics: {unknown}")
+        return metrics
+
+    def get_history(self, athlete, metrics=None):
+        """
+        One athlete's results in event order (events without an Order last).
+
+        Args:
+        athlete: athlete_id (int) or clean_name (str).
+        metrics: Metric columns to return, defaults to every split and aggregate.
+
+        Returns:
+        A DataFrame with the event columns, Order and the metrics, one row per race.
+        """
+        key = "athlete_id" if isinstance(athlete, (int, np.integer)) else "clean_name"
+        columns = ["event_id", "event_name", "season", "event_order", "race_division", "clean_name", "athlete_id"]
+        columns += self._metrics(metrics)
+        return self._query(
+            f"""
+            SELECT {', '.join(map(_quote, columns))} FROM results
+            WHERE {key} = ?
+            ORDER BY event_order IS NULL, event_order, event_name
+            """,
+            (int(athlete) if key == "athlete_id" else athlete,),
+            columns
+        )
+
+    def get_season_bests(self, athlete, metrics):
+        """
+        An athlete's best (lowest) value of each metric per season, e.g. how
+        their Sled-Pull and runs progressed across seasons.
+        """
+        history = self.get_history(athlete, metrics)
+        return history.groupby("season", sort=True)[list(metrics)].min().reset_index()
+
+    def _ensure_index(self, columns):
+        # Indexes for top-K queries are created on first use, one per filter and metric
+        name = "top_" + "_".join(str(COLUMNS.index(column)) for column in columns)
+        self.conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON results ({', '.join(map(_quote, columns))})")
+        self.conn.commit()
+
+    def top_k(self, metric, k=10, ascending=True, race_division=None, season=None, metrics=None):
+        """
+        The k best results by metric, lowest first by default.
+
+        Args:
+        metric: Column to rank by (see METRIC_COLUMNS).
+        k: Number of results.
+        ascending: Lowest first (times), False for highest first.
+        race_division: Optional race_division filter, e.g. "Pro Men".
+        season: Optional season filter, e.g. "2024-2025".
+        metrics: Extra metric columns to return.
+
+        Returns:
+        A DataFrame of the top k results.
+        """
+        self._metrics([metric])
+        filters = {column: value for column, value in [("race_division", race_division), ("season", season)] if value is not None}
+        self._ensure_index(list(filters) + [metric])
+        columns = ["event_id", "event_name", "season", "event_order", "race_division", "clean_name", "athlete_id"]
+        columns += [metric] + [column for column in self._metrics(metrics or []) if column != metric]
+        where = " AND ".join([f"{_quote(metric)} IS NOT NULL"] + [f"{column} = ?" for column in filters])
+        return self._query(
+            f"""
+            SELECT {', '.join(map(_quote, columns))} FROM results
+            WHERE {where}
+            ORDER BY {_quote(metric)} {'ASC' if ascending else 'DESC'}
+            LIMIT ?
+            """,
+            (*filters.values(), int(k)),
+            columns
+        )
@@ -0,0 +1,300 @@
+# ------------------ Imports
+import re
+import sqlite3
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+import numpy as np
+import pandas as pd
+
+DEFAULT_ATHLETE_INDEX_PATH = "data/athlete_index.sqlite"
+# Minimum difflib ratio between two name keys in compatible blocks to be the same
+# athlete: one typo in a name of 13+ characters, never "john smith" / "joan smith"
+FUZZY_THRESHOLD = 0.92
+# Tokens shorter than this do not generate fuzzy candidates (initials, "de", ...)
+MIN_TOKEN_LENGTH = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS athletes (
+    athlete_id INTEGER PRIMARY KEY,
+    canonical_name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS aliases (
+    fullname TEXT NOT NULL,
+    age_class TEXT NOT NULL,
+    athlete_id INTEGER NOT NULL,
+    name_key TEXT NOT NULL,
+    nationality TEXT NOT NULL,
+    match TEXT NOT NULL,
+    score REAL,
+    PRIMARY KEY (fullname, age_class)
+);
+CREATE INDEX IF NOT EXISTS aliases_athlete ON aliases (athlete_id);
+CREATE TABLE IF NOT EXISTS name_keys (
+    name_key TEXT NOT NULL,
+    block TEXT NOT NULL,
+    athlete_id INTEGER NOT NULL,
+    PRIMARY KEY (name_key, block)
+);
+CREATE INDEX IF NOT EXISTS name_keys_block ON name_keys (block);
+"""
+
+_NATIONALITY = re.compile(r"^(.*?)\s*\(([^()]*)\)\s*$")
+_NON_ALPHANUMERIC = re.compile(r"[^a-z0-9]+")
+_DIGITS = re.compile(r"\d")
+_AGE_BOUNDS = re.compile(r"\d+")
+# age_class of athlete pages without one (see functions/scrape_functions.py)
+MISSING_AGE_CLASS = "_NONE_"
+
+
+def parse_fullname(fullname):
+    """
+    "Jane Doe (GBR)" -> ("Jane Doe", "GBR"), same name part as clean_name.
+    """
+    match = _NATIONALITY.match(fullname)
+    if match:
+        return fullname.split(" (")[0].strip(), match.group(2).strip().upper()
+    return fullname.split(" (")[0].strip(), ""
+
+
+def normalize_name(name):
+    """
+    Name key: accents removed, case folded, punctuation dropped and tokens
+    sorted, so "Doe, Jane", "JANE DOE" and "Jane Döe" share one key.
+    """
+    text = unicodedata.normalize("NFKD", name)
+    text = "".join(char for char in text if not unicodedata.combining(char)).casefold()
+    return " ".join(sorted(_NON_ALPHANUMERIC.sub(" ", text).split()))
+
+
+def get_block(nationality, age_class):
+    return f"{nationality}|{age_class}"
+
+
+def _age_range(age_class):
+    # "30-34" -> (30, 34), "70+" -> (70, None), anything else -> None
+    bounds = _AGE_BOUNDS.findall(age_class)
+    if not bounds:
+        return None
+    return int(bounds[0]), int(bounds[1]) if len(bounds) > 1 else None
+
+
+def is_compatible(nationality, age_class, other_nationality, other_age_class):
+    """
+    Whether two aliases may be one athlete: the same nationality or one of
+    them untagged, and the same or an adjacent age class (one athlete moves up
+    an age group between seasons). A missing age class matches any.
+    """
+    if nationality and other_nationality and nationality != other_nationality:
+        return False
+    if age_class == other_age_class or MISSING_AGE_CLASS in (age_class, other_age_class):
+        return True
+    age_range, other_range = _age_range(age_class), _age_range(other_age_class)
+    if age_range is None or other_range is None:
+        return False
+    return (
+        (age_range[1] is not None and age_range[1] + 1 == other_range[0])
+        or (other_range[1] is not None and other_range[1] + 1 == age_range[0])
+    )
+
+
+class AthleteIndex:
+    """
+    Persistent athlete identity index backed by SQLite.
+
+    Every distinct (fullname, age_class) seen in the results is an alias of one
+    athlete with a stable integer athlete_id. Aliases are resolved by:
+    1. the same normalized name key in any nationality or age class, preferring
+       the alias's own block (nationality and age class), then compatible
+       blocks (see is_compatible), then
+    2. fuzzy matching of name keys in compatible blocks, only against keys
+       sharing a name token, so nothing is compared all-pairs,
+    3. otherwise a new athlete_id.
+    An athlete already in one of the alias's events is never matched, so two
+    people with the same name in one race stay apart.
+
+    Only aliases not already in the index are resolved, so re-indexing after a
+    new event costs time proportional to its new names. IDs are never reassigned.
+
+    Args:
+    path: Location of the SQLite database (defaults to data/athlete_index.sqlite).
+    threshold: Minimum fuzzy match ratio.
+    """
+    def __init__(self, path=DEFAULT_ATHLETE_INDEX_PATH, threshold=FUZZY_THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        self.aliases = {
+            (fullname, age_class): athlete_id
+            for fullname, age_class, athlete_id in self.conn.execute("SELECT fullname, age_class, athlete_id FROM aliases")
+        }
+        # Name key -> blocks it was seen in, as (nationality, age_class, athlete_id)
+        self.key_ids = defaultdict(list)
+        # Token -> name keys, so fuzzy candidates share at least one token
+        self.tokens = defaultdict(set)
+        for name_key, block, athlete_id in self.conn.execute(
+            "SELECT name_key, block, athlete_id FROM name_keys ORDER BY rowid"
+        ):
+            self._add_key_entry(name_key, block, athlete_id)
+        self.canonical = dict(self.conn.execute("SELECT athlete_id, canonical_name FROM athletes"))
+        self.next_id = max(self.canonical, default=0) + 1
+
+    def close(self):
+        self.conn.close()
+
+    def _add_key_entry(self, name_key, block, athlete_id):
+        nationality, age_class = block.split("|", 1)
+        self.key_ids[name_key].append((nationality, age_class, athlete_id))
+        for token in name_key.split():
+            if len(token) >= MIN_TOKEN_LENGTH:
+                self.tokens[token].add(name_key)
+
+    def _exact_match(self, name_key, nationality, age_class, is_excluded):
+        # Own block first, then compatible blocks, then any block; oldest athlete on ties
+        best = None
+        for other_nationality, other_age_class, athlete_id in self.key_ids.get(name_key, ()):
+            if is_excluded(athlete_id):
+                continue
+            if (other_nationality, other_age_class) == (nationality, age_class):
+                rank = 0
+            elif is_compatible(nationality, age_class, other_nationality, other_age_class):
+                rank = 1
+            else:
+                rank = 2
+            if best is None or (rank, athlete_id) < best:
+                best = (rank, athlete_id)
+        return None if best is None else best[1]
+
+    def _fuzzy_match(self, name_key, nationality, age_class, is_excluded):
+        # Best scoring key of a compatible block that shares a token with name_key
+        candidates = set()
+        for token in name_key.split():
+            if len(token) >= MIN_TOKEN_LENGTH:
+                candidates.update(self.tokens.get(token, ()))
+        candidates.discard(name_key)
+        best = None
+        length = len(name_key)
+        # Tokens with digits (numbered placeholders, relay legs) must match exactly
+        numbered = {token for token in name_key.split() if _DIGITS.search(token)}
+        for candidate in candidates:
+            # Upper bound of the ratio from the lengths alone (difflib's real_quick_ratio)
+            if 2 * min(length, len(candidate)) < self.threshold * (length + len(candidate)):
+                continue
+            if numbered != {token for token in candidate.split() if _DIGITS.search(token)}:
+                continue
+            athlete_ids = [
+                athlete_id
+                for other_nationality, other_age_class, athlete_id in self.key_ids[candidate]
+                if is_compatible(nationality, age_class, other_nationality, other_age_class)
+                and not is_excluded(athlete_id)
+            ]
+            if not athlete_ids:
+                continue
+            matcher = SequenceMatcher(None, name_key, candidate)
+            if matcher.quick_ratio() < self.threshold:
+                continue
+            score = matcher.ratio()
+            if score < self.threshold:
+                continue
+            # Ties go to the oldest athlete so the result does not depend on set order
+            athlete_id = min(athlete_ids)
+            if best is None or (score, -athlete_id) > (best[1], -best[0]):
+                best = (athlete_id, score)
+        return best
+
+    def _add_key(self, name_key, block, athlete_id, new_keys):
+        if (name_key, block) in new_keys or any(
+            get_block(nationality, age_class) == block for nationality, age_class, _ in self.key_ids.get(name_key, ())
+        ):
+            return
+        new_keys[(name_key, block)] = athlete_id
+        self._add_key_entry(name_key, block, athlete_id)
+
+    def resolve(self, results):
+        """
+        athlete_id of every row of results, adding new aliases to the index.
+
+        Args:
+        results: DataFrame with fullname, age_class and event_id columns (raw,
+            clean or finisher results).
+
+        Returns:
+        A Series of athlete ids aligned with results.
+        """
+        pairs = results[["fullname", "age_class", "event_id"]].astype(str)
+        codes, uniques = pd.factorize(pairs["fullname"] + "\x00" + pairs["age_class"])
+        unique_pairs = [tuple(unique.split("\x00", 1)) for unique in uniques]
+        new_codes = [code for code, pair in enumerate(unique_pairs) if pair not in self.aliases]
+        if new_codes:
+            self._index_pairs(pairs[np.isin(codes, new_codes)])
+        athlete_ids = np.array([self.aliases[pair] for pair in unique_pairs], dtype=np.int64)
+        return pd.Series(athlete_ids[codes], index=results.index)
+
+    def _index_pairs(self, pairs):
+        # Events of each new alias, so two different names in the same race are never merged
+        alias_events = pairs.groupby(["fullname", "age_class"], sort=False)["event_id"].unique()
+        event_ids = defaultdict(set)
+        new_aliases, new_keys, new_athletes = [], {}, []
+        for (fullname, age_class), events in alias_events.items():
+            name, nationality = parse_fullname(fullname)
+            name_key = normalize_name(name)
+            block = get_block(nationality, age_class)
+            is_excluded = lambda athlete_id: any(athlete_id in event_ids[event_id] for event_id in events)
+            athlete_id = self._exact_match(name_key, nationality, age_class, is_excluded)
+            if athlete_id is not None:
+                match, score = "exact", 1.0
+            else:
+                # A known but excluded exact key is another person of the same name in the race
+                best = None if name_key in self.key_ids else self._fuzzy_match(name_key, nationality, age_class, is_excluded)
+                if best:
+                    athlete_id, score = best
+                    match = "fuzzy"
+                else:
+                    athlete_id, match, score = self.next_id, "new", None
+                    self.next_id += 1
+                    self.canonical[athlete_id] = name
+                    new_athletes.append((athlete_id, name))
+            self._add_key(name_key, block, athlete_id, new_keys)
+            self.aliases[(fullname, age_class)] = athlete_id
+            new_aliases.append((fullname, age_class, athlete_id, name_key, nationality, match, score))
+            for event_id in events:
+                event_ids[event_id].add(athlete_id)
+        with self.conn:
+            self.conn.executemany("INSERT INTO athletes VALUES (?, ?)", new_athletes)
+            self.conn.executemany("INSERT INTO aliases VALUES (?, ?, ?, ?, ?, ?, ?)", new_aliases)
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO name_keys VALUES (?, ?, ?)",
+                [(name_key, block, athlete_id) for (name_key, block), athlete_id in new_keys.items()]
+            )
+        print(f"Athlete index: {len(new_aliases)} new aliases, {len(new_athletes)} new athletes")
+
+    def get_canonical_names(self, athlete_ids):
+        return [self.canonical[athlete_id] for athlete_id in athlete_ids]
+
+    def get_aliases(self, athlete_id):
+        return pd.DataFrame(
+            self.conn.execute(
+                "SELECT fullname, age_class, nationality, match, score FROM aliases WHERE athlete_id = ?",
+                (athlete_id,)
+            ).fetchall(),
+            columns=["fullname", "age_class", "nationality", "match", "score"]
+        )
+
+
+def add_athlete_ids(results, athlete_index, canonical_names=False):
+    """
+    Copy of results with an athlete_id column. With canonical_names, clean_name
+    is also replaced by the athlete's canonical name, so every alias of an
+    athlete shares one clean_name.
+    """
+    results = results.copy()
+    results["athlete_id"] = athlete_index.resolve(results)
+    if not canonical_names:
+        return results
+    codes, athlete_ids = pd.factorize(results["athlete_id"])
+    dtype = results["clean_name"].dtype if "clean_name" in results else "string"
+    canonical_names = pd.array(athlete_index.get_canonical_names(athlete_ids), dtype=dtype)
+    results["clean_name"] = canonical_names.take(codes)
+    return results
@@ -0,0 +1,492 @@
+# ------------------ Imports
+import hashlib
+import importlib.util
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import pandas as pd
+from functions.data_functions import (
+    get_elites_athletes,
+    get_race_finisher_df,
+    get_race_averages_df,
+    get_final_race_average_df,
+    get_final_ind_race_df
+)
+from functions.clean_cache import get_clean_results_cached, CLEAN_CACHE_VERSION
+from functions.summary_results import (
+    clean_summary_results,
+    combine_finishers,
+    get_final_finish_time_df,
+    get_finish_time_df,
+    get_summary_finisher_df,
+    load_summary
+)
+from functions.sheets_publisher import SheetsPublisher, LocalSheetsBackend, get_google_publisher
+from functions.athlete_index import AthleteIndex, add_athlete_ids
+from functions.athlete_history import AthleteHistoryStore
+
+DEFAULT_BUILD_CACHE_DIR = "data/build_cache"
+DEFAULT_DRY_RUN_DIR = "data/build_output"
+DEFAULT_CREDENTIALS_JSON = "google_credentials.json"
+DEFAULT_EVENTS_PATH = "data/hyrox_events.csv"
+# Bump when a change outside STAGE_MODULES (e.g. a pandas upgrade) changes the
+# build stages, so cached stage outputs are rebuilt
+BUILD_CACHE_VERSION = 2
+# Modules whose code computes the stage outputs. Their source is part of every
+# stage cache key, so editing any of them rebuilds the cached stages.
+STAGE_MODULES = [
+    "functions.build_pipeline",
+    "functions.data_functions",
+    "functions.time_codec",
+    "functions.results_store",
+    "functions.clean_cache",
+    "functions.summary_results",
+    "functions.athlete_index"
+]
+
+# ------------------ Build Configs
+# One entry per results source. Every division is a branch off the shared
+# clean -> elites -> finishers stages, with its own grouping and destinations
+# (sheet name, tab name) for the race level and individual tables. An optional
+# "athlete_index" path adds a stable athlete_id to every result (the published
+# clean_name is unchanged, see functions/athlete_index.py). An optional
+# "athlete_history" path stores the finisher table for per-athlete and top-K
+# queries (see functions/athlete_history.py). Both are off by default and set by
+# build --athlete-index / --athlete-history; a dry run writes neither. A division with a
+# "finish_time_destination" also gets a finish time table (racers, quartiles,
+# sub-N counts per event), from the finishers plus the races of the optional
+# "summary_paths" tables, which are scraped from the list pages only (see
+# functions/summary_results.py), e.g.
+#   "summary_paths": ["data/hyrox_summary_pro.csv"],
+#   ... "finish_time_destination": ["data_driven_hyrox_source", "Finish-Pro-Men"]
+BUILDS = {
+    "open": {
+        "paths": ["data/hyrox_results_open_Men.csv", "data/hyrox_results_open_Women.csv"],
+        "divisions": [
+            {
+                "division": "Open Men",
+                "group_cols": ["event_name", "sub_90"],
+                "time_group": "sub_90",
+                "race_destination": ["data_driven_hyrox_source", "Race-Open-Men"],
+                "ind_destination": ["hyrox_open_individual", "Ind-Open-Men"]
+            },
+            {
+                "division": "Open Women",
+                "group_cols": ["event_name", "sub_90"],
+                "time_group": "sub_90",
+                "race_destination": ["data_driven_hyrox_source", "Race-Open-Women"],
+                "ind_destination": ["hyrox_open_individual", "Ind-Open-Women"]
+            }
+        ]
+    },
+    "pro": {
+        "paths": ["data/hyrox_results_pro.csv"],
+        "divisions": [
+            {
+                "division": "Pro Men",
+                "group_cols": ["event_name", "sub_75"],
+                "time_group": "sub_75",
+                "race_destination": ["data_driven_hyrox_source", "Race-Pro-Men"],
+                "ind_destination": ["hyrox_pro_individual", "Ind-Pro-Men"]
+            },
+            {
+                "division": "Elite Men",
+                "group_cols": ["event_name"],
+                "keep_percentiles": False,
+                "race_destination": ["data_driven_hyrox_source", "Race-Elite-Men"],
+                "ind_destination": ["hyrox_pro_individual", "Ind-Elite-Men"]
+            },
+            {
+                "division": "Pro Women",
+                "group_cols": ["event_name", "sub_85"],
+                "time_group": "sub_85",
+                "race_destination": ["data_driven_hyrox_source", "Race-Pro-Women"],
+                "ind_destination": ["hyrox_pro_individual", "Ind-Pro-Women"]
+            },
+            {
+                "division": "Elite Women",
+                "group_cols": ["event_name"],
+                "keep_percentiles": False,
+                "race_destination": ["data_driven_hyrox_source", "Race-Elite-Women"],
+                "ind_destination": ["hyrox_pro_individual", "Ind-Elite-Women"]
+            }
+        ]
+    }
+}
+
+
+# ------------------ Stage Cache
+def _key(value):
+    return hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+@lru_cache(maxsize=None)
+def _stage_code_key():
+    # Hash of the source of STAGE_MODULES, read without importing them
+    digest = hashlib.sha1()
+    for module_name in STAGE_MODULES:
+        with open(importlib.util.find_spec(module_name).origin, "rb") as source:
+            digest.update(source.read())
+    return digest.hexdigest()[:16]
+
+
+def _source_signature(path):
+    """
+    Size and modification time of a results CSV, or of every file in a Parquet store.
+    """
+    if os.path.isdir(path):
+        files = sorted(
+            os.path.join(directory, name)
+            for directory, _, names in os.walk(path)
+            for name in names
+        )
+    else:
+        files = [path]
+    signature = []
+    for file_path in files:
+        stat = os.stat(file_path)
+        signature.append([file_path, stat.st_size, stat.st_mtime_ns])
+    return signature
+
+
+def _load_stage(cache_dir, name, key):
+    if cache_dir is None:
+        return None
+    file_path = os.path.join(cache_dir, f"{name}_{key}.pkl")
+    if not os.path.exists(file_path):
+        return None
+    print(f"{name}: cached")
+    return pd.read_pickle(file_path)
+
+
+def _save_stage(cache_dir, name, key, output):
+    # Replaces any older output of the same stage
+    if cache_dir is None:
+        return
+    os.makedirs(cache_dir, exist_ok=True)
+    for old_name in os.listdir(cache_dir):
+        if old_name.startswith(f"{name}_") and old_name.endswith(".pkl"):
+            os.remove(os.path.join(cache_dir, old_name))
+    pd.to_pickle(output, os.path.join(cache_dir, f"{name}_{key}.pkl"))
+
+
+def _cached_stage(cache_dir, name, key, build_fn):
+    """
+    Returns the cached output of a stage when its key matches, otherwise builds and caches it.
+    """
+    output = _load_stage(cache_dir, name, key)
+    if output is None:
+        output = build_fn()
+        _save_stage(cache_dir, name, key, output)
+    return output
+
+
+def _sources_key(build):
+    # Sources, cleaning and stage code of the shared finisher stage
+    return _key([
+        BUILD_CACHE_VERSION,
+        _stage_code_key(),
+        CLEAN_CACHE_VERSION,
+        [_source_signature(path) for path in build["paths"]]
+    ])
+
+
+def _finishers_key(build):
+    # The finisher table also has the athlete_id column of the athlete index, if any
+    return _key([_sources_key(build), build.get("athlete_index")])
+
+
+def _summary_key(build):
+    # Summary tables and stage code of the finish time tables
+    return _key([
+        BUILD_CACHE_VERSION,
+        _stage_code_key(),
+        [_source_signature(path) for path in build.get("summary_paths", [])]
+    ])
+
+
+def _division_key(sources_key, division, summary_key=None):
+    # Published tables do not depend on the athlete index, so publish needs no index
+    key = [sources_key, division["division"], division["group_cols"],
+           division.get("time_group"), division.get("keep_percentiles", True)]
+    # Only divisions with a finish time table depend on the summary tables
+    if division.get("finish_time_destination"):
+        key.append(summary_key)
+    return _key(key)
+
+
+def _division_file_name(name, division):
+    return f"{name}_{division['division'].replace(' ', '_')}"
+
+
+# ------------------ Stages
+def build_race_finishers(paths, athlete_index_path=None):
+    """
+    Shared stages of a build: clean results for every path, elite athletes and
+    the race finisher table. Run once per build, whatever the number of divisions.
+    With athlete_index_path, the finishers also get an athlete_id.
+    """
+    clean_results = pd.concat([get_clean_results_cached(path) for path in paths], ignore_index=True)
+    if athlete_index_path:
+        athlete_index = AthleteIndex(athlete_index_path)
+        clean_results = add_athlete_ids(clean_results, athlete_index)
+        athlete_index.close()
+    elite_athletes = get_elites_athletes(clean_results)
+    return get_race_finisher_df(clean_results, elite_athletes)
+
+
+def build_summary_finishers(paths, athlete_index_path=None):
+    """
+    Finisher table (finish times only, no splits) of the summary tables of a
+    build. With athlete_index_path, the finishers also get an athlete_id.
+    """
+    clean_summary = pd.concat([clean_summary_results(load_summary(path)) for path in paths], ignore_index=True)
+    if athlete_index_path:
+        athlete_index = AthleteIndex(athlete_index_path)
+        clean_summary = add_athlete_ids(clean_summary, athlete_index)
+        athlete_index.close()
+    return get_summary_finisher_df(clean_summary, get_elites_athletes(clean_summary))
+
+
+def build_division(race_finishers, division, finish_time_finishers=None):
+    """
+    Division branch of a build: race averages, the final race table and the
+    individual table for one division's finishers.
+
+    Args:
+    race_finishers: The division's rows of the race finisher table.
+    division: A division config of the build.
+    finish_time_finishers: Finishers for the finish time table (race_finishers
+        plus summary-only races), defaults to race_finishers.
+
+    Returns:
+    A dict with the "race" and "individual" DataFrames, and "finish_times" when
+    the division has a finish_time_destination.
+    """
+    race_averages = get_race_averages_df(race_finishers, group_cols=division["group_cols"])
+    race_final = get_final_race_average_df(
+        race_averages,
+        keep_percentiles=division.get("keep_percentiles", True),
+        time_group=division.get("time_group")
+    )
+    output = {"race": race_final, "individual": get_final_ind_race_df(race_finishers)}
+    if division.get("finish_time_destination"):
+        finish_times = get_finish_time_df(race_finishers if finish_time_finishers is None else finish_time_finishers)
+        output["finish_times"] = get_final_finish_time_df(finish_times)
+    return output
+
+
+def update_athlete_history(race_finisher_df, path, events_path=DEFAULT_EVENTS_PATH):
+    """
+    Writes the new or changed events of the finisher table to the athlete
+    history store at path, with the event Order from events_path when it exists.
+    """
+    events = pd.read_csv(events_path) if os.path.exists(events_path) else None
+    store = AthleteHistoryStore(path)
+    store.update(race_finisher_df, events)
+    store.close()
+
+
+def get_publisher(dry_run=False, output_dir=DEFAULT_DRY_RUN_DIR, credentials_json=DEFAULT_CREDENTIALS_JSON):
+    """
+    Google Sheets publisher, or with dry_run one that writes each tab to
+    output_dir/<sheet name>/<tab name>.csv so builds can be checked offline.
+    """
+    if dry_run:
+        return SheetsPublisher(LocalSheetsBackend(output_dir), snapshot_dir=None, requests_per_minute=None)
+    return get_google_publisher(credentials_json)
+
+
+# ------------------ Runner
+def run_build(
+    build,
+    name="build",
+    cache_dir=DEFAULT_BUILD_CACHE_DIR,
+    dry_run=False,
+    output_dir=DEFAULT_DRY_RUN_DIR,
+    credentials_json=DEFAULT_CREDENTIALS_JSON,
+    num_workers=None,
+    publisher=None
+):
+    """
+    Runs one build config: the shared stages once, then every division branch
+    (in parallel on a process pool), then publishes all of its tables.
+
+    Stage outputs are cached in cache_dir. The finisher table is keyed by the
+    size and modification time of the source files and the code of the stages
+    (see STAGE_MODULES), and each division by that key plus its own config (and
+    the summary tables, for a finish time table), so an unchanged build
+    publishes without recomputing.
+
+    Args:
+    build: A build config, e.g. BUILDS["pro"].
+    name: Name used for the cache files.
+    cache_dir: Stage cache directory, None disables caching.
+    dry_run: Write tables to output_dir instead of Google Sheets.
+    output_dir: Directory for dry run output.
+    credentials_json: Google service account credentials.
+    num_workers: Process pool size for division branches, 1 runs them in this process.
+    publisher: Optional SheetsPublisher, overrides dry_run / output_dir / credentials_json.
+
+    Returns:
+    Dict of division -> {"race": DataFrame, "individual": DataFrame} (plus
+    "finish_times" for divisions with a finish_time_destination).
+    """
+    if dry_run:
+        # The athlete index and history are persistent stores, a dry run only writes output_dir
+        build = {key: value for key, value in build.items() if key not in ("athlete_index", "athlete_history")}
+    finishers_key = _finishers_key(build)
+    sources_key = _sources_key(build)
+    summary_key = _summary_key(build)
+    race_finisher_df = _cached_stage(
+        cache_dir,
+        f"{name}_finishers",
+        finishers_key,
+        lambda: build_race_finishers(build["paths"], build.get("athlete_index"))
+    )
+    if build.get("athlete_history"):
+        update_athlete_history(race_finisher_df, build["athlete_history"])
+
+    outputs = {}
+    pending = []
+    for division in build["divisions"]:
+        division_key = _division_key(sources_key, division, summary_key)
+        file_name = _division_file_name(name, division)
+        output = _load_stage(cache_dir, file_name, division_key)
+        if output is None:
+            pending.append((division, file_name, division_key))
+        else:
+            outputs[division["division"]] = output
+
+    # Finish time tables also count the races only in the summary tables
+    finish_time_df = race_finisher_df
+    if build.get("summary_paths") and any(division.get("finish_time_destination") for division, _, _ in pending):
+        summary_finisher_df = _cached_stage(
+            cache_dir,
+            f"{name}_summary_finishers",
+            _key([summary_key, build.get("athlete_index")]),
+            lambda: build_summary_finishers(build["summary_paths"], build.get("athlete_index"))
+        )
+        finish_time_df = combine_finishers(race_finisher_df, summary_finisher_df)
+
+    division_finishers = {
+        division["division"]: (
+            race_finisher_df[race_finisher_df["race_division"] == division["division"]],
+            division,
+            finish_time_df[finish_time_df["race_division"] == division["division"]]
+            if division.get("finish_time_destination") else None
+        )
+        for division, _, _ in pending
+    }
+    if pending and num_workers == 1:
+        built = [build_division(*division_finishers[division["division"]]) for division, _, _ in pending]
+    elif pending:
+        with ProcessPoolExecutor(max_workers=num_workers) as pool:
+            futures = [
+                pool.submit(build_division, *division_finishers[division["division"]])
+                for division, _, _ in pending
+            ]
+            built = [future.result() for future in futures]
+    else:
+        built = []
+    for (division, file_name, division_key), output in zip(pending, built):
+        _save_stage(cache_dir, file_name, division_key, output)
+        outputs[division["division"]] = output
+
+    if publisher is None:
+        publisher = get_publisher(dry_run, output_dir, credentials_json)
+    publish_outputs(build, outputs, publisher)
+    return outputs
+
+
+def publish_build(
+    build,
+    name="build",
+    cache_dir=DEFAULT_BUILD_CACHE_DIR,
+    dry_run=False,
+    output_dir=DEFAULT_DRY_RUN_DIR,
+    credentials_json=DEFAULT_CREDENTIALS_JSON,
+    publisher=None
+):
+    """
+    Publishes the tables cached by the last run_build of a build config without
+    building anything. Raises FileNotFoundError when the sources changed since
+    (or the build never ran), as the cached tables would be stale.
+    """
+    sources_key = _sources_key(build)
+    summary_key = _summary_key(build)
+    outputs = {}
+    for division in build["divisions"]:
+        division_key = _division_key(sources_key, division, summary_key)
+        output = _load_stage(cache_dir, _division_file_name(name, division), division_key)
+        if output is None:
+            raise FileNotFoundError(
+                f"No cached {division['division']} tables for the current sources in {cache_dir}, run the build first"
+            )
+        outputs[division["division"]] = output
+    if publisher is None:
+        publisher = get_publisher(dry_run, output_dir, credentials_json)
+    publish_outputs(build, outputs, publisher)
+    return outputs
+
+
+def publish_outputs(build, outputs, publisher):
+    """
+    Publishes the race and individual table (and finish time table, if any) of
+    every division to its destinations.
+    """
+    tables = []
+    for division in build["divisions"]:
+        output = outputs[division["division"]]
+        for table, destination in [
+            ("race", "race_destination"),
+            ("individual", "ind_destination"),
+            ("finish_times", "finish_time_destination")
+        ]:
+            if destination not in division:
+                continue
+            sheet_name, tab_name = division[destination]
+            tables.append((output[table], sheet_name, tab_name))
+    publisher.publish_many(tables)
+
+
+# ------------------ Command Line
+def run_builds(args, publish_only=False):
+    """
+    Runs (or with publish_only, publishes) the builds named in args, parsed by
+    the build / publish subcommands of cli.py.
+    """
+    pd.set_option("display.precision", 2)
+    for build_name in args.builds or list(BUILDS):
+        build = dict(BUILDS[build_name])
+        if publish_only:
+            publish_build(
+                build,
+                name=build_name,
+                cache_dir=args.cache_dir,
+                dry_run=args.dry_run,
+                output_dir=args.output_dir,
+                credentials_json=args.credentials
+            )
+            continue
+        if args.athlete_index:
+            build["athlete_index"] = args.athlete_index
+        if args.athlete_history:
+            build["athlete_history"] = args.athlete_history
+        run_build(
+            build,
+            name=build_name,
+            cache_dir=None if args.no_cache else args.cache_dir,
+            dry_run=args.dry_run,
+            output_dir=args.output_dir,
+            credentials_json=args.credentials,
+            num_workers=args.workers
+        )
+
+
+if __name__ == "__main__":
+    # Same as python cli.py build ...
+    import sys
+    from cli import main
+    main(["build", *sys.argv[1:]])
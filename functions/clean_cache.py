@@ -0,0 +1,91 @@
+# ------------------ Imports
+import hashlib
+import json
+import os
+import pandas as pd
+from functions.data_functions import load_data, clean_raw_results
+
+DEFAULT_CLEAN_CACHE_DIR = "data/clean_cache"
+# Bump when clean_raw_results changes so cached events are rebuilt
+CLEAN_CACHE_VERSION = 2
+
+
+def _key(text):
+    return hashlib.sha1(str(text).encode("utf-8")).hexdigest()[:16]
+
+
+def get_event_hashes(results):
+    """
+    Content hash of each event's raw rows (in file order), keyed by event_id.
+    """
+    row_hashes = pd.util.hash_pandas_object(results, index=False).to_numpy()
+    event_ids = results["event_id"].to_numpy()
+    codes, uniques = pd.factorize(event_ids)
+    hashes = {}
+    for code, event_id in enumerate(uniques):
+        event_rows = row_hashes[codes == code]
+        hashes[event_id] = hashlib.sha1(event_rows.tobytes()).hexdigest()
+    return hashes
+
+
+def get_clean_results_cached(path, cache_dir=DEFAULT_CLEAN_CACHE_DIR, filters=None):
+    """
+    Incremental version of get_clean_results.
+
+    Cleaned results are cached per event_id together with a content hash of the
+    event's raw rows. Only events whose raw rows changed (or are new) are cleaned
+    again; unchanged events are loaded from the cache exactly as they were saved.
+
+    Args:
+    path: Results CSV or Parquet store, as for load_data.
+    cache_dir: Directory for the cache. Each source path gets its own sub-directory.
+    filters: Optional load_data filters.
+
+    Returns:
+    The clean results DataFrame, with events in order of first appearance.
+    """
+    results = load_data(path, filters=filters)
+    source_dir = os.path.join(cache_dir, _key(os.path.abspath(path)))
+    os.makedirs(source_dir, exist_ok=True)
+    manifest_path = os.path.join(source_dir, "manifest.json")
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest.get("version") != CLEAN_CACHE_VERSION:
+            manifest = {}
+    events = manifest.get("events", {})
+
+    hashes = get_event_hashes(results)
+    event_codes, event_ids = pd.factorize(results["event_id"])
+    clean_events = []
+    rebuilt = []
+    for code, event_id in enumerate(event_ids):
+        file_path = os.path.join(source_dir, f"{_key(event_id)}.pkl")
+        cached = events.get(event_id)
+        if cached and cached["hash"] == hashes[event_id] and os.path.exists(file_path):
+            clean_events.append(pd.read_pickle(file_path))
+            continue
+        event_results = results[event_codes == code]
+        clean_event = clean_raw_results(event_results.copy(), verbose=False)
+        clean_event.to_pickle(file_path)
+        events[event_id] = {"hash": hashes[event_id]}
+        clean_events.append(clean_event)
+        rebuilt.append(event_id)
+
+    # Forget events that are no longer in the source
+    removed = set(events) - set(hashes) if not filters else set()
+    for event_id in removed:
+        stale_path = os.path.join(source_dir, f"{_key(event_id)}.pkl")
+        if os.path.exists(stale_path):
+            os.remove(stale_path)
+        del events[event_id]
+    with open(manifest_path, "w") as f:
+        json.dump({"version": CLEAN_CACHE_VERSION, "path": str(path), "events": events}, f, indent=2)
+
+    print(f"Clean results: {len(event_ids) - len(rebuilt)} events cached, {len(rebuilt)} rebuilt")
+    # Events where every race was dropped would upcast the concatenated dtypes
+    clean_events = [clean_event for clean_event in clean_events if len(clean_event)]
+    if not clean_events:
+        return clean_raw_results(results, verbose=False)
+    return pd.concat(clean_events, ignore_index=True)
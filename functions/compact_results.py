@@ -0,0 +1,99 @@
+# ------------------ Imports
+import pandas as pd
+from functions.data_functions import SPLIT_LAYOUT
+
+# Split-name enum shared by every event layout
+SPLIT_NAME_DTYPE = pd.CategoricalDtype(SPLIT_LAYOUT)
+
+# Identity columns, one category per athlete / event / race
+CATEGORY_COLUMNS = [
+    "fullname",
+    "clean_name",
+    "age_class",
+    "start_no",
+    "event_id",
+    "race_person_id",
+    "season",
+    "desc",
+    "time_day",
+    "time",
+    "diff"
+]
+
+
+def compact_clean_results(clean_results):
+    """
+    Re-encodes clean results with compact types: categorical identities (athlete,
+    event, race), a split-name enum, int8 split numbers, int32 seconds and
+    boolean flags.
+
+    Args:
+    clean_results: DataFrame from get_clean_results.
+
+    Returns:
+    A new DataFrame with the same columns and values, using much less memory.
+    """
+    compact = clean_results.copy()
+    # Remember the original dtypes so decode_clean_results can restore them exactly
+    compact.attrs["source_dtypes"] = clean_results.dtypes.to_dict()
+    for column in CATEGORY_COLUMNS:
+        if column in compact:
+            compact[column] = compact[column].astype("category")
+    if "split_name" in compact:
+        compact["split_name"] = compact["split_name"].astype(SPLIT_NAME_DTYPE)
+    if "split_num" in compact:
+        compact["split_num"] = compact["split_num"].astype("int8")
+    if "time_format_valid" in compact:
+        valid = compact["time_format_valid"]
+        compact["time_format_valid"] = valid.astype("bool" if valid.notna().all() else "boolean")
+    for column in ["total_seconds", "split_seconds"]:
+        if column in compact:
+            # Whole seconds fit int32; missing times need the nullable type
+            dtype = "int32" if compact[column].notna().all() else "Int32"
+            compact[column] = compact[column].astype(dtype)
+    return compact
+
+
+def decode_clean_results(compact):
+    """
+    Decodes a compact frame back to the dtypes get_clean_results produced
+    (string identities, float seconds), so downstream code sees the original frame.
+    """
+    decoded = compact.copy()
+    source_dtypes = compact.attrs.get("source_dtypes", {})
+    for column in CATEGORY_COLUMNS + ["split_name"]:
+        if column in decoded:
+            decoded[column] = decoded[column].astype(source_dtypes.get(column, "string"))
+    if "split_num" in decoded:
+        decoded["split_num"] = decoded["split_num"].astype(source_dtypes.get("split_num", "int64"))
+    if "time_format_valid" in decoded:
+        decoded["time_format_valid"] = decoded["time_format_valid"].astype(source_dtypes.get("time_format_valid", "boolean"))
+    for column in ["total_seconds", "split_seconds"]:
+        if column in decoded:
+            decoded[column] = decoded[column].astype(source_dtypes.get(column, "float64"))
+    decoded.attrs = {}
+    return decoded
+
+
+def is_compact(clean_results):
+    return isinstance(clean_results["race_person_id"].dtype, pd.CategoricalDtype)
+
+
+def memory_report(clean_results, compact=None):
+    """
+    Prints deep memory use per column for clean results and their compact form.
+
+    Returns:
+    A DataFrame of bytes per column (before, after) with a total row.
+    """
+    if compact is None:
+        compact = compact_clean_results(clean_results)
+    report = pd.DataFrame({
+        "before": clean_results.memory_usage(index=False, deep=True),
+        "after": compact.memory_usage(index=False, deep=True)
+    })
+    report.loc["total"] = report.sum()
+    report["ratio"] = (report["before"] / report["after"]).round(1)
+    mb = report[["before", "after"]] / 1e6
+    print(pd.concat([mb.round(2).add_suffix("_mb"), report["ratio"]], axis=1).to_string())
+    return report
@@ -1,7 +1,8 @@
+import os
+from functools import lru_cache
 import pandas as pd
 import numpy as np
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+from functions.time_codec import parse_durations, format_durations
 
 NO_ROXZONE_LIST = ["2023 Stockholm_HYROX ELITE_Men", "2023 Stockholm_HYROX ELITE_Women"]
 STATIONS = [
@@ -14,93 +15,149 @@ STATIONS = [
     "Lunges",
     "Wallballs"
 ]
+# race_division from event_id ("<event name>_<division>_<gender>"), first match wins
+DIVISION_RULES = [
+    ("PRO_Men", "Pro Men"),
+    ("ELITE_Men", "Elite Men"),
+    ("PRO_Women", "Pro Women"),
+    ("ELITE_Women", "Elite Women"),
+    ("HYROX_Men", "Open Men"),
+    ("HYROX_Women", "Open Women")
+]
+# Finish time thresholds in minutes, each gets a sub_N flag
+TIME_BUCKETS = [60, 65, 70, 75, 80, 85, 90]
 
 # --- Data Loaders
-def load_data(path):
-    results = pd.read_csv(
-        path,
-        dtype={
-            "desc": "string",
-            "time_day": "string",
-            "time": "string",
-            "diff": "string",
-            "fullname": "string",
-            "age_class": "string",
-            "start_no": "string",
-            "event_id": "string",
-            "season": "string"
-        }
-    )
+RESULTS_DTYPES = {
+    "desc": "string",
+    "time_day": "string",
+    "time": "string",
+    "diff": "string",
+    "fullname": "string",
+    "age_class": "string",
+    "start_no": "string",
+    "event_id": "string",
+    "season": "string"
+}
+
+def load_data(path, columns=None, filters=None):
+    """
+    Loads raw results from a results CSV or from the Parquet results store.
+
+    Args:
+    path: A results CSV, or a Parquet dataset directory (see functions/results_store.py).
+    columns: Optional list of columns to read.
+    filters: Optional dict of column -> allowed values, e.g. {"season": ["2023-2024"]}.
+        On the Parquet store, season/event_id/division filters only read matching partitions.
+
+    Returns:
+    A de-duplicated DataFrame of string columns.
+    """
+    if str(path).endswith(".parquet") or os.path.isdir(path):
+        from functions.results_store import read_results_parquet
+        results = read_results_parquet(path, columns=columns, filters=filters)
+    else:
+        results = pd.read_csv(path, usecols=columns, dtype=RESULTS_DTYPES)
+        if filters:
+            for column, values in filters.items():
+                if column == "division":
+                    results = results[results["event_id"].str.split("_").str[1].isin(values)]
+                else:
+                    results = results[results[column].isin(values)]
     results = results.drop_duplicates()
     return results
 
+SPLIT_MAPPING = {
+    1: "Run-1",
+    2: "Post-Run-1-Rox",
+    3: "SkiErg",
+    4: "Post-SkiErg-Rox",
+    5: "Run-2",
+    6: "Post-Run-2-Rox",
+    7: "Sled-Push",
+    8: "Post-Sled-Push-Rox",
+    9: "Run-3",
+    10: "Post-Run-3-Rox",
+    11: "Sled-Pull",
+    12: "Post-Sled-Pull-Rox",
+    13: "Run-4",
+    14: "Post-Run-4-Rox",
+    15: "Burpee-Broad-Jump",
+    16: "Post-Burpee-Broad-Jump-Rox",
+    17: "Run-5",
+    18: "Post-Run-5-Rox",
+    19: "Row",
+    20: "Post-Row-Rox",
+    21: "Run-6",
+    22: "Post-Run-6-Rox",
+    23: "Farmers-Carry",
+    24: "Post-Farmers-Carry-Rox",
+    25: "Run-7",
+    26: "Post-Run-7-Rox",
+    27: "Lunges",
+    28: "Post-Lunges-Rox",
+    29: "Run-8",
+    30: "Wallballs"
+}
+
+NO_ROX_SPLIT_MAPPING = {
+    1: "Run-1",
+    2: "SkiErg",
+    3: "Run-2",
+    4: "Sled-Push",
+    5: "Run-3",
+    6: "Sled-Pull",
+    7: "Run-4",
+    8: "Burpee-Broad-Jump",
+    9: "Run-5",
+    10: "Row",
+    11: "Run-6",
+    12: "Farmers-Carry",
+    13: "Run-7",
+    14: "Lunges",
+    15: "Run-8",
+    16: "Wallballs"
+}
+
+# Fixed column layout of the wide split table
+SPLIT_LAYOUT = list(SPLIT_MAPPING.values()) + ["Unknown"]
+
+def _split_lookup(mapping):
+    # Array indexed by split_num; index 0 and the last slot hold "Unknown"
+    lookup = np.full(max(mapping) + 2, "Unknown", dtype=object)
+    for split_num, split_name in mapping.items():
+        lookup[split_num] = split_name
+    return lookup
+
+SPLIT_LOOKUP = _split_lookup(SPLIT_MAPPING)
+NO_ROX_SPLIT_LOOKUP = _split_lookup(NO_ROX_SPLIT_MAPPING)
+
 def map_splits(results, no_rox_event_ids=NO_ROXZONE_LIST):
-    # mapping
-    split_mapping = {
-        1: "Run-1",
-        2: "Post-Run-1-Rox",
-        3: "SkiErg",
-        4: "Post-SkiErg-Rox",
-        5: "Run-2",
-        6: "Post-Run-2-Rox",
-        7: "Sled-Push",
-        8: "Post-Sled-Push-Rox",
-        9: "Run-3",
-        10: "Post-Run-3-Rox",
-        11: "Sled-Pull",
-        12: "Post-Sled-Pull-Rox",
-        13: "Run-4",
-        14: "Post-Run-4-Rox",
-        15: "Burpee-Broad-Jump",
-        16: "Post-Burpee-Broad-Jump-Rox",
-        17: "Run-5",
-        18: "Post-Run-5-Rox",
-        19: "Row",
-        20: "Post-Row-Rox",
-        21: "Run-6",
-        22: "Post-Run-6-Rox",
-        23: "Farmers-Carry",
-        24: "Post-Farmers-Carry-Rox",
-        25: "Run-7",
-        26: "Post-Run-7-Rox",
-        27: "Lunges",
-        28: "Post-Lunges-Rox",
-        29: "Run-8",
-        30: "Wallballs"
-    }
-
-    no_rox_split_mapping = {
-        1: "Run-1",
-        2: "SkiErg",
-        3: "Run-2",
-        4: "Sled-Push",
-        5: "Run-3",
-        6: "Sled-Pull",
-        7: "Run-4",
-        8: "Burpee-Broad-Jump",
-        9: "Run-5",
-        10: "Row",
-        11: "Run-6",
-        12: "Farmers-Carry",
-        13: "Run-7",
-        14: "Lunges",
-        15: "Run-8",
-        16: "Wallballs"
-    }
-
-    # Apply mapping
+    # Split number within each athlete's race
     results["split_num"] = results.groupby(["event_id", "race_person_id"]).cumcount()+1
-    results["split_name"] = results.apply(
-        lambda row: no_rox_split_mapping[row["split_num"]]
-        if row["event_id"] in no_rox_event_ids 
-        else split_mapping.get(row["split_num"], "Unknown"),
-        axis=1
-    )
+    split_num = results["split_num"].to_numpy()
+    no_rox = results["event_id"].isin(no_rox_event_ids).to_numpy()
+
+    # Look up names for both layouts, out of range split numbers map to "Unknown"
+    rox_names = SPLIT_LOOKUP[np.minimum(split_num, len(SPLIT_LOOKUP) - 1)]
+    no_rox_names = NO_ROX_SPLIT_LOOKUP[np.minimum(split_num, len(NO_ROX_SPLIT_LOOKUP) - 1)]
+    results["split_name"] = np.where(no_rox, no_rox_names, rox_names)
     return results
 
-def get_clean_results(path):
-    results = load_data(path).drop_duplicates()
+def get_clean_results(path, filters=None, compact=False):
+    results = load_data(path, filters=filters)
+    clean_results = clean_raw_results(results)
+    if compact:
+        # Categorical identities and int32 seconds, see functions/compact_results.py
+        from functions.compact_results import compact_clean_results
+        clean_results = compact_clean_results(clean_results)
+    return clean_results
 
+def clean_raw_results(results, verbose=True):
+    """
+    Cleans de-duplicated raw results (as returned by load_data): adds athlete ids,
+    split names and split seconds, and drops races with malformed times.
+    """
     # Race-Person ID
     results["race_person_id"] = results["event_id"] + "_" + results["fullname"] + results["start_no"]
     # Remove coutnry clean name
@@ -108,27 +165,27 @@ def get_clean_results(path):
     # Map splits
     results = map_splits(results)
 
-    # Regular expression for matching "HH:MM:SS" format
-    time_pattern = r"^[\d]{1,2}:[\d]{2}:[\d]{2}$"
-
-    # Add an indicator column 'time_format_valid'
-    # True if 'time' matches the "HH:MM:SS" format, False otherwise
-    results["time_format_valid"] = results["time"].str.match(time_pattern)
+    # Validate and parse "HH:MM:SS" times in one pass
+    # time_format_valid is <NA> for missing times, which are not treated as bad
+    seconds, valid, missing = parse_durations(results["time"])
+    results["time_format_valid"] = pd.array(np.where(missing, None, valid), dtype="boolean")
     bad_race_data = (
-        results[results["time_format_valid"] == False]
+        results[~valid & ~missing]
         ["race_person_id"]
         .drop_duplicates()
         .to_list()
     )
-    print(f"Bad race data count: {len(bad_race_data)}")
+    if verbose:
+        print(f"Bad race data count: {len(bad_race_data)}")
     # Drop bad race data to create clean results
-    clean_results = results[~results["race_person_id"].isin(bad_race_data)].reset_index(drop=True)
+    keep = ~results["race_person_id"].isin(bad_race_data).to_numpy()
+    clean_results = results[keep].reset_index(drop=True)
     # Get total seconds
-    clean_results["total_seconds"] = pd.to_timedelta(clean_results["time"]).dt.total_seconds()
-    # Get new time diff
+    clean_results["total_seconds"] = seconds[keep]
+    # Get new time diff, per race so two athletes of the same name in one event stay apart
     clean_results["split_seconds"] = (
         clean_results
-        .groupby(["event_id", "fullname"])["total_seconds"]
+        .groupby("race_person_id", sort=False)["total_seconds"]
         .diff()
     )
     clean_results["split_seconds"] = clean_results["split_seconds"].fillna(clean_results["total_seconds"])
@@ -152,82 +209,187 @@ def convert_to_min_sec(seconds):
     sec = int(seconds % 60)
     return f"{hours:02d}:{minutes:02d}:{sec:02d}"
 
-def get_race_finisher_df(clean_results, elite_athletes, stations=STATIONS):
+def get_wide_split_matrix(clean_results, race_person_ids):
+    """
+    Builds the wide split table for a set of races straight into a NumPy array.
+
+    Args:
+    clean_results: Clean results (one row per split).
+    race_person_ids: Races to include, one output row each, in this order.
+
+    Returns:
+    (matrix, observed): a float (races x len(SPLIT_LAYOUT)) array of split seconds
+    with NaN for splits a race does not have, and a boolean mask of the
+    SPLIT_LAYOUT columns that appear for any of the races.
+    """
+    race_index = pd.Index(race_person_ids)
+    # Factorize first so only the distinct ids and split names are looked up
+    race_codes, race_uniques = pd.factorize(clean_results["race_person_id"])
+    split_codes, split_uniques = pd.factorize(clean_results["split_name"])
+    rows = race_index.get_indexer(race_uniques)[race_codes]
+    cols = pd.Index(SPLIT_LAYOUT).get_indexer(split_uniques)[split_codes]
+    keep = (rows >= 0) & (race_codes >= 0)
+    rows, cols = rows[keep], cols[keep]
+    if (cols < 0).any() or (split_codes[keep] < 0).any():
+        raise ValueError("Unexpected split names, expected only SPLIT_LAYOUT names")
+    cells = rows * len(SPLIT_LAYOUT) + cols
+    if len(cells) and np.bincount(cells).max() > 1:
+        raise ValueError("Index contains duplicate entries, cannot reshape")
+
+    matrix = np.full((len(race_index), len(SPLIT_LAYOUT)), np.nan)
+    matrix[rows, cols] = clean_results["split_seconds"].to_numpy(dtype=np.float64, na_value=np.nan)[keep]
+    observed = np.bincount(cols, minlength=len(SPLIT_LAYOUT)) > 0
+    return matrix, observed
+
+def _sum_and_mean(values):
+    # Row sums (0 when every value is missing) and means (NaN when every value is missing)
+    counts = (~np.isnan(values)).sum(axis=1)
+    totals = np.nansum(values, axis=1)
+    means = np.divide(totals, counts, out=np.full(len(totals), np.nan), where=counts > 0)
+    return totals, means
+
+@lru_cache(maxsize=None)
+def parse_event_id(event_id):
+    """
+    Splits an event_id into (event_name, division, gender, race_division).
+    """
+    parts = event_id.split("_")
+    race_division = next((label for pattern, label in DIVISION_RULES if pattern in event_id), "Unknown")
+    division = "_".join(parts[1:-1]) if len(parts) > 2 else None
+    gender = parts[-1] if len(parts) > 1 else None
+    return parts[0], division, gender, race_division
+
+def get_event_columns(event_ids):
+    """
+    Parses event ids once per unique id (there are a few hundred against
+    millions of rows) and broadcasts the parts back to every row.
+
+    Returns:
+    A DataFrame with event_name, division, gender and race_division columns.
+    """
+    codes, uniques = pd.factorize(event_ids)
+    parsed = np.array([parse_event_id(event_id) for event_id in uniques], dtype=object).reshape(-1, 4)
+    index = event_ids.index if isinstance(event_ids, pd.Series) else None
+    return pd.DataFrame(
+        {
+            column: parsed[codes, i]
+            for i, column in enumerate(["event_name", "division", "gender", "race_division"])
+        },
+        index=index
+    )
+
+def get_time_bucket_columns(total_seconds, time_buckets=TIME_BUCKETS):
+    """
+    Buckets finish times against time_buckets (minutes) with one searchsorted.
+
+    Returns:
+    A DataFrame with a time_bucket label ("sub_60", ..., "over_90", None for
+    missing times) and the cumulative sub_N flags (total_seconds < N minutes).
+    """
+    thresholds = np.asarray(sorted(time_buckets))
+    seconds = np.asarray(total_seconds, dtype=np.float64)
+    bucket = np.searchsorted(thresholds * 60, seconds, side="right")
+    labels = np.array([f"sub_{n}" for n in thresholds] + [f"over_{thresholds[-1]}", None], dtype=object)
+    bucket = np.where(np.isnan(seconds), len(thresholds) + 1, bucket)
+    columns = {f"sub_{n}": bucket <= i for i, n in enumerate(thresholds)}
+    columns["time_bucket"] = labels[bucket]
+    index = total_seconds.index if isinstance(total_seconds, pd.Series) else None
+    return pd.DataFrame(columns, index=index)
+
+def get_race_finisher_df(clean_results, elite_athletes, stations=STATIONS, time_buckets=TIME_BUCKETS):
+    # athlete_id is kept when the results were resolved by functions/athlete_index.py
+    identity_columns = [
+        "fullname",
+        "clean_name",
+        "athlete_id",
+        "age_class",
+        "event_id",
+        "race_person_id",
+        "season",
+        "total_seconds"
+    ]
     race_finisher_df = (
         clean_results[clean_results["split_name"]=="Wallballs"]
-        .assign(
-            sub_60=lambda df: df["total_seconds"] < (60*60),
-            sub_65=lambda df: df["total_seconds"] < (65*60),
-            sub_70=lambda df: df["total_seconds"] < (70*60),
-            sub_75=lambda df: df["total_seconds"] < (75*60),
-            sub_80=lambda df: df["total_seconds"] < (80*60),
-            sub_85=lambda df: df["total_seconds"] < (85*60),
-            sub_90=lambda df: df["total_seconds"] < (90*60),
-            elite_athlete=lambda df: df["clean_name"].isin(elite_athletes)
-        )
-        [[
-            "fullname",
-            "clean_name",
-            "age_class",
-            "event_id",
-            "race_person_id",
-            "season",
-            "total_seconds",
-            "sub_60",
-            "sub_65",
-            "sub_70",
-            "sub_75",
-            "sub_80",
-            "sub_85",
-            "sub_90",
-            "elite_athlete"
-        ]]
+        [[column for column in identity_columns if column in clean_results.columns]]
         .reset_index(drop=True)
     )
-    race_finishers = race_finisher_df["race_person_id"].drop_duplicates().to_list()
-
-    race_wide_splits = (
-        clean_results[clean_results["race_person_id"].isin(race_finishers)]
-        [["race_person_id", "split_name", "split_seconds"]]
-        .pivot(index="race_person_id", columns="split_name", values="split_seconds")
+    race_finisher_df = pd.concat(
+        [race_finisher_df, get_time_bucket_columns(race_finisher_df["total_seconds"], time_buckets)],
+        axis=1
     )
-    race_finisher_full = (
-        pd.merge(race_finisher_df, race_wide_splits, on="race_person_id", how="left")
-        .assign(
-            total_run=lambda x: x.filter(regex=r"^Run-").sum(axis=1),
-            total_rox_zone=lambda x: x.filter(like="Rox").sum(axis=1),
-            total_station=lambda x: x.filter(items=stations).sum(axis=1),
-            avg_run_all=lambda x: x.filter(regex=r"^Run-").mean(axis=1),
-            avg_run_exclude_first=lambda x: x.filter(regex=r"^Run-(2|3|4|5|6|7)$").mean(axis=1),
-            min_run_exclude_first=lambda x: x.filter(regex=r"^Run-(2|3|4|5|6|7)$").min(axis=1),
-            max_run_exclude_first=lambda x: x.filter(regex=r"^Run-(2|3|4|5|6|7)$").max(axis=1)
-        )
-        .assign(total_run_and_rox=lambda x: x["total_run"] + x["total_rox_zone"])
-        .assign(
-            run_and_rox_pct=lambda x: x["total_run_and_rox"] / x["total_seconds"],
-            station_pct=lambda x: x["total_station"] / x["total_seconds"],
-            run_range_exclude_first=lambda x: x["max_run_exclude_first"] - x["min_run_exclude_first"],
-            run_range_pct_exclude_first=lambda x: 
-                (x["max_run_exclude_first"] - x["min_run_exclude_first"])
-                / x["avg_run_exclude_first"]
-        )
+    race_finisher_df["elite_athlete"] = race_finisher_df["clean_name"].isin(elite_athletes)
+    # Wide splits as one (finishers x splits) array in the fixed SPLIT_LAYOUT order
+    wide_splits, observed = get_wide_split_matrix(clean_results, race_finisher_df["race_person_id"])
+    split_columns = sorted(SPLIT_LAYOUT[i] for i in np.flatnonzero(observed))
+    race_wide_splits = pd.DataFrame(
+        {column: wide_splits[:, SPLIT_LAYOUT.index(column)] for column in split_columns},
+        index=race_finisher_df.index
     )
 
-
-    # Race Division
-    race_finisher_full["event_name"] = race_finisher_full["event_id"].apply(lambda x: x.split("_")[0]) 
-    race_finisher_full['race_division'] = np.where(
-        race_finisher_full['event_id'].str.contains("PRO_Men"), 'Pro Men',
-        np.where(race_finisher_full['event_id'].str.contains("ELITE_Men"), 'Elite Men',
-        np.where(race_finisher_full['event_id'].str.contains("PRO_Women"), 'Pro Women',
-        np.where(race_finisher_full['event_id'].str.contains("ELITE_Women"), 'Elite Women',
-        np.where(race_finisher_full['event_id'].str.contains("HYROX_Men"), 'Open Men',
-        np.where(race_finisher_full['event_id'].str.contains("HYROX_Women"), 'Open Women',
-        'Unknown')))))
+    # Aggregates over precomputed column groups, NaN (missing split) is skipped
+    run_cols = [i for i, name in enumerate(SPLIT_LAYOUT) if name.startswith("Run-")]
+    rox_cols = [i for i, name in enumerate(SPLIT_LAYOUT) if "Rox" in name]
+    station_cols = [SPLIT_LAYOUT.index(station) for station in stations if station in SPLIT_LAYOUT]
+    run_exclude_first_cols = [SPLIT_LAYOUT.index(f"Run-{i}") for i in range(2, 8)]
+    total_run, avg_run_all = _sum_and_mean(wide_splits[:, run_cols])
+    total_rox_zone, _ = _sum_and_mean(wide_splits[:, rox_cols])
+    total_station, _ = _sum_and_mean(wide_splits[:, station_cols])
+    run_exclude_first = wide_splits[:, run_exclude_first_cols]
+    _, avg_run_exclude_first = _sum_and_mean(run_exclude_first)
+    min_run_exclude_first = np.fmin.reduce(run_exclude_first, axis=1)
+    max_run_exclude_first = np.fmax.reduce(run_exclude_first, axis=1)
+    total_seconds = race_finisher_df["total_seconds"].to_numpy(dtype=np.float64)
+    total_run_and_rox = total_run + total_rox_zone
+    race_finisher_aggregates = pd.DataFrame(
+        {
+            "total_run": total_run,
+            "total_rox_zone": total_rox_zone,
+            "total_station": total_station,
+            "avg_run_all": avg_run_all,
+            "avg_run_exclude_first": avg_run_exclude_first,
+            "min_run_exclude_first": min_run_exclude_first,
+            "max_run_exclude_first": max_run_exclude_first,
+            "total_run_and_rox": total_run_and_rox,
+            "run_and_rox_pct": total_run_and_rox / total_seconds,
+            "station_pct": total_station / total_seconds,
+            "run_range_exclude_first": max_run_exclude_first - min_run_exclude_first,
+            "run_range_pct_exclude_first":
+                (max_run_exclude_first - min_run_exclude_first) / avg_run_exclude_first
+        },
+        index=race_finisher_df.index
     )
+    race_finisher_full = pd.concat([race_finisher_df, race_wide_splits, race_finisher_aggregates], axis=1)
+
+    # Event name, division and gender, parsed once per event_id
+    event_columns = get_event_columns(race_finisher_full["event_id"])
+    race_finisher_full = pd.concat([race_finisher_full, event_columns], axis=1)
 
     return race_finisher_full
 
+def add_percentile_and_time_columns(df, columns, group_col=None):
+    """
+    Adds a {column}_percentile and a {column}_time column for every column in
+    columns, ranking all of them in one (optionally grouped) rank and formatting
+    them with one format_durations call.
+
+    Args:
+    df: DataFrame with the metric columns. It is not modified.
+    columns: Metric columns to rank and format.
+    group_col: Optional column to rank within, otherwise ranks are over all rows.
+
+    Returns:
+    A new DataFrame: df followed by the percentile and time column of each metric.
+    """
+    values = df[columns]
+    ranks = values.groupby(df[group_col]).rank(pct=True) if group_col else values.rank(pct=True)
+    percentiles = (1 - ranks) * 100
+    times = format_durations(values.to_numpy(dtype=np.float64).ravel()).to_numpy().reshape(values.shape)
+    stats = {}
+    for i, column in enumerate(columns):
+        stats[f"{column}_percentile"] = percentiles[column]
+        stats[f"{column}_time"] = pd.Series(times[:, i], index=df.index)
+    return pd.concat([df, pd.DataFrame(stats, index=df.index)], axis=1)
+
 def get_race_averages_df(race_finisher_df, group_cols=["event_name", "race_division", "sub_75"], stations=STATIONS):
     columns_to_average = [
         "total_seconds",
@@ -252,22 +414,9 @@ def get_race_averages_df(race_finisher_df, group_cols=["event_name", "race_divis
         )
     )
 
-    for column in columns_to_average:
-        if len(group_cols) > 1:
-            race_averages[f"{column}_percentile"] = (
-                race_averages
-                .groupby(group_cols[1])[f"{column}"].transform(percentile_rank)
-            )
-        else:
-            race_averages[f"{column}_percentile"] = (
-                race_averages[f"{column}"].transform(percentile_rank)
-            )
-
-        race_averages[f"{column}_time"] = (
-            race_averages[f"{column}"]
-            .apply(convert_to_min_sec)
-        )
-    return race_averages
+    # Percentiles within the division (second group column) when there is one
+    group_col = group_cols[1] if len(group_cols) > 1 else None
+    return add_percentile_and_time_columns(race_averages, columns_to_average, group_col=group_col)
 
 def get_final_race_average_df(race_averages, keep_percentiles=True, time_group=None):
     final_column_order = [
@@ -335,16 +484,7 @@ def get_final_ind_race_df(df, stations=STATIONS):
         "run_range_exclude_first",
         "run_range_pct_exclude_first"
     ] + stations
-
-    for column in percentile_cols:
-        df[f"{column}_percentile"] = (
-            df[f"{column}"].transform(percentile_rank)
-        )
-
-        df[f"{column}_time"] = (
-            df[f"{column}"]
-            .apply(convert_to_min_sec)
-        )
+    df = add_percentile_and_time_columns(df, percentile_cols)
 
     # Col selection
     final_column_order = [
@@ -394,6 +534,7 @@ def get_final_ind_race_df(df, stations=STATIONS):
 def write_df_to_google_sheet(sheet_name, df, credentials_json, tab_name='Sheet1'):
     """
     Writes a pandas DataFrame to a specified Google Sheet and tab.
+    See functions/sheets_publisher.py for publishing several tabs at once.
     
     Args:
     sheet_name: The name of the Google Sheet.
@@ -404,31 +545,9 @@ def write_df_to_google_sheet(sheet_name, df, credentials_json, tab_name='Sheet1'
     Returns:
     None
     """
-    # Define the scope and authorize the client
-    scope = [
-        "https://spreadsheets.google.com/feeds",
-        "https://www.googleapis.com/auth/spreadsheets",
-        "https://www.googleapis.com/auth/drive.file",
-        "https://www.googleapis.com/auth/drive"
-    ]
-    credentials = ServiceAccountCredentials.from_json_keyfile_name(credentials_json, scope)
-    client = gspread.authorize(credentials)
-    
-    # Open the spreadsheet
-    sheet = client.open(sheet_name)
-    
-    # Select the right tab or create it if it doesn't exist
-    try:
-        worksheet = sheet.worksheet(tab_name)
-    except gspread.WorksheetNotFound:
-        worksheet = sheet.add_worksheet(title=tab_name, rows="100", cols="20")
-
-    # Convert DataFrame to list of lists (including header)
-    values = [df.columns.tolist()] + df.values.tolist()
-    
-    # Update the worksheet with values
-    worksheet.clear()  # Clear existing values
-    worksheet.update('A1', values)
+    # One authorized client per credentials file, only changed cells are written
+    from functions.sheets_publisher import get_google_publisher
+    get_google_publisher(credentials_json).publish(df, sheet_name, tab_name)
 
 def round_float_columns(df):
     """
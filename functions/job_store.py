@@ -0,0 +1,210 @@
+# ------------------ Imports
+import json
+import sqlite3
+import time
+
+DEFAULT_JOB_STORE_PATH = "data/scrape_jobs.sqlite"
+# Runs of a job that may end incomplete before it is marked failed and no longer picked up
+DEFAULT_MAX_JOB_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    event_id TEXT NOT NULL,
+    season TEXT NOT NULL,
+    export_path TEXT,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (event_id, season)
+);
+CREATE TABLE IF NOT EXISTS pages (
+    event_id TEXT NOT NULL,
+    season TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    athletes INTEGER,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (event_id, season, page)
+);
+CREATE TABLE IF NOT EXISTS athletes (
+    event_id TEXT NOT NULL,
+    season TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    status TEXT NOT NULL,
+    rows_json TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (event_id, season, url)
+);
+"""
+
+
+def get_event_id(config):
+    return config["city"] + "_" + config["event"] + "_" + config["gender"]
+
+
+def get_job_id(config):
+    # Summary scrapes (list pages only) are tracked apart from the detail scrape of the same event
+    event_id = get_event_id(config)
+    return f"{event_id} [summary]" if config.get("scrape_mode") == "summary" else event_id
+
+
+class JobStore:
+    """
+    Persistent work queue for scraping jobs backed by SQLite.
+
+    Every event/division/gender (a job), each results page of a job, and each
+    athlete detail page is recorded with a status, so an interrupted scrape can
+    resume from the last completed unit instead of starting over. A job is
+    started at most max_attempts times: a run that leaves it incomplete after
+    that marks it failed, with its failed pages kept for the report.
+
+    Args:
+    path: Location of the SQLite database (defaults to data/scrape_jobs.sqlite).
+    """
+    def __init__(self, path=DEFAULT_JOB_STORE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.executescript(SCHEMA)
+        # Job stores created before jobs counted their attempts
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(jobs)")]
+        if "attempts" not in columns:
+            self.conn.execute("ALTER TABLE jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    # --- Jobs
+    def job_status(self, event_id, season):
+        row = self.conn.execute(
+            "SELECT status FROM jobs WHERE event_id = ? AND season = ?", (event_id, season)
+        ).fetchone()
+        return row[0] if row else None
+
+    def is_job_done(self, event_id, season):
+        return self.job_status(event_id, season) == "done"
+
+    def job_attempts(self, event_id, season):
+        row = self.conn.execute(
+            "SELECT attempts FROM jobs WHERE event_id = ? AND season = ?", (event_id, season)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def start_job(self, event_id, season, export_path=None):
+        """Marks a job running and counts the attempt. Returns the attempt number, from 1."""
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO jobs (event_id, season, export_path, status, attempts, updated_at)
+                VALUES (?, ?, ?, 'running', 1, ?)
+                ON CONFLICT (event_id, season) DO UPDATE SET
+                    status = 'running', attempts = attempts + 1, updated_at = excluded.updated_at
+                """,
+                (event_id, season, export_path, time.time())
+            )
+        return self.job_attempts(event_id, season)
+
+    def finish_job(self, event_id, season, status="done"):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE event_id = ? AND season = ?",
+                (status, time.time(), event_id, season)
+            )
+
+    def reopen_job(self, event_id, season):
+        """Gives a failed job a new retry budget, keeping its completed pages and athletes."""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET status = 'incomplete', attempts = 0, updated_at = ? WHERE event_id = ? AND season = ?",
+                (time.time(), event_id, season)
+            )
+
+    def reset_job(self, event_id, season):
+        """Forgets all progress for a job so it is scraped again from scratch."""
+        with self.conn:
+            for table in ["jobs", "pages", "athletes"]:
+                self.conn.execute(f"DELETE FROM {table} WHERE event_id = ? AND season = ?", (event_id, season))
+
+    # --- Pages
+    def completed_pages(self, event_id, season):
+        rows = self.conn.execute(
+            "SELECT page FROM pages WHERE event_id = ? AND season = ? AND status = 'done'", (event_id, season)
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def page_athletes(self, event_id, season):
+        """Athletes scraped from each completed page, keyed by page."""
+        rows = self.conn.execute(
+            "SELECT page, athletes FROM pages WHERE event_id = ? AND season = ? AND status = 'done'", (event_id, season)
+        ).fetchall()
+        return {page: athletes or 0 for page, athletes in rows}
+
+    def failed_pages(self, event_id, season):
+        rows = self.conn.execute(
+            "SELECT page FROM pages WHERE event_id = ? AND season = ? AND status = 'failed' ORDER BY page",
+            (event_id, season)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def is_page_done(self, event_id, season, page):
+        return page in self.completed_pages(event_id, season)
+
+    def finish_page(self, event_id, season, page, athletes=None):
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO pages (event_id, season, page, status, athletes, updated_at) VALUES (?, ?, ?, 'done', ?, ?)
+                ON CONFLICT (event_id, season, page) DO UPDATE SET
+                    status = 'done', athletes = excluded.athletes, updated_at = excluded.updated_at
+                """,
+                (event_id, season, page, athletes, time.time())
+            )
+
+    def fail_page(self, event_id, season, page):
+        # Not done, so the next run scrapes the page again (only its athletes without rows)
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO pages (event_id, season, page, status, updated_at) VALUES (?, ?, ?, 'failed', ?)
+                ON CONFLICT (event_id, season, page) DO UPDATE SET status = 'failed', updated_at = excluded.updated_at
+                """,
+                (event_id, season, page, time.time())
+            )
+
+    # --- Athletes
+    def get_athlete_rows(self, event_id, season, urls):
+        """
+        Returns the stored split columns for athletes already scraped, keyed by URL.
+        """
+        done = {}
+        for url in urls:
+            row = self.conn.execute(
+                "SELECT rows_json FROM athletes WHERE event_id = ? AND season = ? AND url = ? AND status = 'done'",
+                (event_id, season, url)
+            ).fetchone()
+            if row:
+                done[url] = json.loads(row[0])
+        return done
+
+    def finish_athlete(self, event_id, season, page, url, columns):
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO athletes (event_id, season, page, url, status, rows_json, updated_at)
+                VALUES (?, ?, ?, ?, 'done', ?, ?)
+                ON CONFLICT (event_id, season, url) DO UPDATE SET
+                    status = 'done', rows_json = excluded.rows_json, updated_at = excluded.updated_at
+                """,
+                (event_id, season, page, url, json.dumps(columns), time.time())
+            )
+
+    def fail_athlete(self, event_id, season, page, url):
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO athletes (event_id, season, page, url, status, updated_at) VALUES (?, ?, ?, ?, 'failed', ?)
+                ON CONFLICT (event_id, season, url) DO UPDATE SET status = 'failed', updated_at = excluded.updated_at
+                """,
+                (event_id, season, page, url, time.time())
+            )
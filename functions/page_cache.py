@@ -0,0 +1,325 @@
+# ------------------ Imports
+import argparse
+import gzip
+import hashlib
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from datetime import date
+import pandas as pd
+from functions.scrape_functions import get_athlete_urls, parse_athlete_pages
+
+DEFAULT_PAGE_CACHE_DIR = "data/page_cache"
+DEFAULT_REPARSE_DIR = "data/reparsed"
+# Compressed bytes kept on disk before the least recently used pages are evicted
+DEFAULT_MAX_BYTES = 5 * 2**30
+# Eviction frees space down to this share of max_bytes, so it does not run on every put
+EVICT_TO = 0.9
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT NOT NULL,
+    scrape_date TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    event_id TEXT NOT NULL DEFAULT '',
+    season TEXT NOT NULL DEFAULT '',
+    page INTEGER NOT NULL DEFAULT 0,
+    export_path TEXT,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (url, scrape_date, event_id, season, page)
+);
+CREATE INDEX IF NOT EXISTS pages_by_event ON pages (kind, event_id, season, scrape_date);
+CREATE TABLE IF NOT EXISTS blobs (
+    content_hash TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+"""
+
+
+class PageCache:
+    """
+    On-disk cache of fetched results list pages and athlete detail pages, so
+    the results files can be rebuilt after a parser change without scraping
+    again (see reparse_results).
+
+    Pages are stored gzip-compressed under the SHA-256 of their HTML, so a page
+    fetched again unchanged costs no space. A SQLite index maps (url, scrape
+    date) to the content, together with the event, season and list page it
+    was scraped for. Once the compressed size passes max_bytes, the least
+    recently used pages are evicted.
+
+    Args:
+    cache_dir: Cache directory (defaults to data/page_cache).
+    max_bytes: Compressed size limit in bytes, None for no limit.
+    """
+    def __init__(self, cache_dir=DEFAULT_PAGE_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(cache_dir, "index.sqlite"), timeout=30)
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        self.total_bytes = self.size()
+
+    def close(self):
+        self.conn.close()
+
+    def blob_path(self, content_hash):
+        return os.path.join(self.cache_dir, "pages", content_hash[:2], f"{content_hash}.html.gz")
+
+    def size(self):
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    # --- Writing
+    def _write_blob(self, html):
+        content = html.encode("utf-8")
+        content_hash = hashlib.sha256(content).hexdigest()
+        path = self.blob_path(content_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Written under a temporary name first, so a reader (or another
+            # worker process) never sees a partial file
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(gzip.compress(content, compresslevel=6, mtime=0))
+            os.replace(tmp_path, path)
+        return content_hash, os.path.getsize(path)
+
+    def put_many(self, pages, kind, event_id="", season="", page=0, export_path=None, scrape_date=None):
+        """
+        Stores fetched pages.
+
+        Args:
+        pages: Iterable of (url, html). None html (a failed fetch) is skipped.
+        kind: "list" for results list pages, "athlete" for athlete detail pages.
+        event_id: Event the pages were scraped for (see job_store.get_event_id).
+        season: Season of the event.
+        page: Results list page number the pages belong to.
+        export_path: Results CSV the scrape wrote to, used by reparse_results.
+        scrape_date: ISO date of the scrape, defaults to today.
+
+        Returns:
+        Number of pages stored.
+        """
+        scrape_date = scrape_date or date.today().isoformat()
+        now = time.time()
+        stored = 0
+        with self.conn:
+            for url, html in pages:
+                if html is None:
+                    continue
+                content_hash, size = self._write_blob(html)
+                inserted = self.conn.execute(
+                    "INSERT OR IGNORE INTO blobs (content_hash, size, last_used) VALUES (?, ?, ?)",
+                    (content_hash, size, now)
+                ).rowcount
+                if inserted:
+                    self.total_bytes += size
+                else:
+                    self.conn.execute("UPDATE blobs SET last_used = ? WHERE content_hash = ?", (now, content_hash))
+                self.conn.execute(
+                    """
+                    INSERT INTO pages (url, scrape_date, kind, content_hash, event_id, season, page, export_path, fetched_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (url, scrape_date, event_id, season, page) DO UPDATE SET
+                        kind = excluded.kind, content_hash = excluded.content_hash,
+                        export_path = excluded.export_path, fetched_at = excluded.fetched_at
+                    """,
+                    (url, scrape_date, kind, content_hash, event_id, season, page, export_path, now)
+                )
+                stored += 1
+        if self.max_bytes is not None and self.total_bytes > self.max_bytes:
+            self.evict()
+        return stored
+
+    def put(self, url, html, kind, **kwargs):
+        """Stores one fetched page, see put_many."""
+        return self.put_many([(url, html)], kind, **kwargs)
+
+    def evict(self, max_bytes=None):
+        """
+        Removes the least recently used pages until the cache is at most
+        EVICT_TO of max_bytes (or of the max_bytes passed here).
+
+        Returns:
+        Number of bytes freed.
+        """
+        limit = int((max_bytes if max_bytes is not None else self.max_bytes) * EVICT_TO)
+        # Recount, other processes may have written to the same cache
+        self.total_bytes = self.size()
+        freed = 0
+        rows = self.conn.execute("SELECT content_hash, size FROM blobs ORDER BY last_used, content_hash").fetchall()
+        evicted = []
+        for content_hash, size in rows:
+            if self.total_bytes - freed <= limit:
+                break
+            evicted.append(content_hash)
+            freed += size
+        with self.conn:
+            self.conn.executemany("DELETE FROM pages WHERE content_hash = ?", [(h,) for h in evicted])
+            self.conn.executemany("DELETE FROM blobs WHERE content_hash = ?", [(h,) for h in evicted])
+        for content_hash in evicted:
+            try:
+                os.remove(self.blob_path(content_hash))
+            except FileNotFoundError:
+                pass
+        self.total_bytes -= freed
+        if evicted:
+            print(f"Page cache: evicted {len(evicted)} pages, {freed / 2**20:.0f} MB")
+        return freed
+
+    # --- Reading
+    def read(self, content_hash):
+        with gzip.open(self.blob_path(content_hash), "rb") as f:
+            return f.read().decode("utf-8")
+
+    def get(self, url, scrape_date=None):
+        """
+        HTML of url from scrape_date (default: the latest scrape), or None when
+        it is not cached.
+        """
+        query = "SELECT content_hash FROM pages WHERE url = ?"
+        params = [url]
+        if scrape_date is not None:
+            query += " AND scrape_date = ?"
+            params.append(scrape_date)
+        row = self.conn.execute(query + " ORDER BY scrape_date DESC LIMIT 1", params).fetchone()
+        if row is None or not os.path.exists(self.blob_path(row[0])):
+            return None
+        with self.conn:
+            self.conn.execute("UPDATE blobs SET last_used = ? WHERE content_hash = ?", (time.time(), row[0]))
+        return self.read(row[0])
+
+    def get_content_hashes(self, urls, kind="athlete"):
+        """
+        Content hash of the latest cached version of each url, for the urls
+        that are cached.
+        """
+        hashes = {}
+        for url in urls:
+            row = self.conn.execute(
+                "SELECT content_hash FROM pages WHERE url = ? AND kind = ? ORDER BY scrape_date DESC LIMIT 1",
+                (url, kind)
+            ).fetchone()
+            if row:
+                hashes[url] = row[0]
+        return hashes
+
+    def get_list_pages(self, event_ids=None):
+        """
+        The latest cached copy of every list page of every event, events in the
+        order they were first scraped and pages in page order. Pages are taken
+        one by one, so a page a resumed scrape skipped on a later day keeps
+        its copy from the day it was scraped.
+
+        Args:
+        event_ids: Optional list of event_ids to return.
+
+        Returns:
+        A DataFrame with url, content_hash, event_id, season, page and export_path.
+        """
+        list_pages = pd.read_sql_query(
+            """
+            SELECT url, content_hash, event_id, season, page, export_path, scrape_date, fetched_at
+            FROM pages WHERE kind = 'list'
+            """,
+            self.conn
+        )
+        if event_ids is not None:
+            list_pages = list_pages[list_pages["event_id"].isin(event_ids)]
+        list_pages = (
+            list_pages
+            .sort_values(["scrape_date", "fetched_at"])
+            .drop_duplicates(["event_id", "season", "page"], keep="last")
+            .copy()
+        )
+        list_pages["first_fetched"] = list_pages.groupby(["event_id", "season"])["fetched_at"].transform("min")
+        list_pages = list_pages.sort_values(["first_fetched", "event_id", "season", "page"])
+        return list_pages[["url", "content_hash", "event_id", "season", "page", "export_path"]].reset_index(drop=True)
+
+
+# ------------------ Re-parse
+def _reparse_list_page(cache_dir, list_url, list_hash):
+    # Runs in a worker process: the list page and its athletes from the cache
+    cache = PageCache(cache_dir, max_bytes=None)
+    try:
+        athlete_urls = get_athlete_urls(cache.read(list_hash), list_url)
+        hashes = cache.get_content_hashes(athlete_urls)
+        pages = (cache.read(hashes[url]) for url in athlete_urls if url in hashes)
+        return parse_athlete_pages(pages), len(athlete_urls) - len(hashes)
+    finally:
+        cache.close()
+
+
+def reparse_results(
+    cache_dir=DEFAULT_PAGE_CACHE_DIR,
+    output_dir=DEFAULT_REPARSE_DIR,
+    event_ids=None,
+    num_workers=None,
+    parquet_path=None
+):
+    """
+    Rebuilds the results files from cached pages instead of scraping, e.g.
+    after a fix in parse_athlete_columns. Each cached list page (with its
+    athletes) is parsed on a process pool, and the rows are written in scrape
+    order to output_dir/<file name of the CSV the scrape wrote to>.
+
+    Args:
+    cache_dir: PageCache directory.
+    output_dir: Directory for the rebuilt results CSVs. Pass data/ to replace the scraped files.
+    event_ids: Optional list of event_ids to rebuild, defaults to every cached event.
+    num_workers: Process pool size, defaults to the number of CPUs. 1 parses in this process.
+    parquet_path: Also write the rows to this Parquet results store.
+
+    Returns:
+    Dict of output CSV path -> number of rows written.
+    """
+    cache = PageCache(cache_dir, max_bytes=None)
+    list_pages = cache.get_list_pages(event_ids)
+    cache.close()
+    if list_pages.empty:
+        print(f"No cached list pages in {cache_dir}")
+        return {}
+
+    os.makedirs(output_dir, exist_ok=True)
+    written = {}
+    missing = 0
+    start = time.perf_counter()
+    num_workers = num_workers or os.cpu_count()
+    tasks = ([cache_dir] * len(list_pages), list_pages["url"], list_pages["content_hash"])
+    with ProcessPoolExecutor(max_workers=num_workers) if num_workers > 1 else nullcontext() as pool:
+        parsed = pool.map(_reparse_list_page, *tasks) if pool is not None else map(_reparse_list_page, *tasks)
+        for list_page, (page_df, page_missing) in zip(list_pages.itertuples(index=False), parsed):
+            missing += page_missing
+            if page_df.empty:
+                continue
+            page_df["event_id"] = list_page.event_id
+            page_df["season"] = list_page.season
+            file_name = os.path.basename(list_page.export_path or "hyrox_results.csv")
+            path = os.path.join(output_dir, file_name)
+            page_df.to_csv(path, mode="a" if path in written else "w", header=path not in written, index=False)
+            written[path] = written.get(path, 0) + len(page_df)
+            if parquet_path:
+                from functions.results_store import write_results_parquet
+                write_results_parquet(page_df, parquet_path)
+
+    elapsed = time.perf_counter() - start
+    print(f"Re-parsed {len(list_pages)} list pages in {elapsed:.1f}s, {missing} athlete pages not cached")
+    for path, rows in written.items():
+        print(f"  {path}: {rows} rows")
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the results files from cached pages")
+    parser.add_argument("--cache-dir", default=DEFAULT_PAGE_CACHE_DIR, help="Page cache directory")
+    parser.add_argument("--output-dir", default=DEFAULT_REPARSE_DIR, help="Directory for the rebuilt results CSVs")
+    parser.add_argument("--events", nargs="+", help="event_ids to rebuild, defaults to all")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size")
+    parser.add_argument("--parquet-path", default=None, help="Also write to the Parquet results store")
+    args = parser.parse_args()
+    reparse_results(args.cache_dir, args.output_dir, args.events, args.workers, args.parquet_path)
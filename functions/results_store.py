@@ -0,0 +1,130 @@
+# ------------------ Imports
+import argparse
+import uuid
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from functions.time_codec import parse_durations
+
+RESULTS_COLUMNS = ["desc", "time_day", "time", "diff", "fullname", "age_class", "start_no", "event_id", "season"]
+PARTITION_COLUMNS = ["season", "event_id", "division"]
+CATEGORY_COLUMNS = ["desc", "fullname", "age_class"]
+DEFAULT_PARQUET_PATH = "data/hyrox_results_parquet"
+
+RESULTS_SCHEMA = pa.schema([
+    ("desc", pa.dictionary(pa.int32(), pa.string())),
+    ("time_day", pa.string()),
+    ("time", pa.string()),
+    ("time_seconds", pa.int32()),
+    ("diff", pa.string()),
+    ("fullname", pa.dictionary(pa.int32(), pa.string())),
+    ("age_class", pa.dictionary(pa.int32(), pa.string())),
+    ("start_no", pa.string()),
+    ("event_id", pa.string()),
+    ("season", pa.string()),
+    ("division", pa.string()),
+])
+
+
+# ------------------ Typing
+def _duration_seconds(times):
+    # "H:MM:SS" / "HH:MM:SS" -> integer seconds, anything else -> <NA>
+    seconds, valid, missing = parse_durations(times)
+    return pd.Series(pd.array(seconds, dtype="Int32"), index=times.index)
+
+
+def to_typed_results(results):
+    """
+    Converts raw scraped results (the 9 string columns written by the scraper)
+    into the typed layout stored in Parquet.
+
+    Args:
+    results: DataFrame with RESULTS_COLUMNS.
+
+    Returns:
+    A new DataFrame with categorical name/class columns, integer time_seconds
+    and a division column taken from event_id.
+    """
+    typed = results[RESULTS_COLUMNS].astype("string")
+    typed["time_seconds"] = _duration_seconds(typed["time"])
+    typed["division"] = typed["event_id"].str.split("_").str[1]
+    for column in CATEGORY_COLUMNS:
+        typed[column] = typed[column].astype("category")
+    return typed[RESULTS_SCHEMA.names]
+
+
+# ------------------ Writing
+def write_results_parquet(results, root=DEFAULT_PARQUET_PATH, replace=False):
+    """
+    Writes raw scraped results to a Parquet dataset partitioned by
+    season/event_id/division.
+
+    Args:
+    results: DataFrame with RESULTS_COLUMNS.
+    root: Dataset directory.
+    replace: Replace the partitions being written instead of appending a new file to them.
+
+    Returns:
+    None
+    """
+    if results.empty:
+        return
+    table = pa.Table.from_pandas(to_typed_results(results), schema=RESULTS_SCHEMA, preserve_index=False)
+    pq.write_to_dataset(
+        table,
+        root_path=root,
+        partition_cols=PARTITION_COLUMNS,
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior="delete_matching" if replace else "overwrite_or_ignore"
+    )
+
+
+def migrate_csv_to_parquet(csv_paths, root=DEFAULT_PARQUET_PATH):
+    """
+    Copies existing results CSVs into the Parquet dataset, replacing any
+    partitions that were already migrated.
+    """
+    for csv_path in csv_paths:
+        results = pd.read_csv(csv_path, dtype="string").drop_duplicates()
+        write_results_parquet(results, root, replace=True)
+        print(f"Migrated {csv_path}: {len(results)} rows, {results['event_id'].nunique()} events")
+
+
+# ------------------ Reading
+def _to_filters(filters):
+    if not filters:
+        return None
+    return [(column, "in", list(values)) for column, values in filters.items()]
+
+
+def read_results_parquet(root=DEFAULT_PARQUET_PATH, columns=None, filters=None, typed=False):
+    """
+    Reads results from the Parquet dataset, touching only the partitions and
+    columns that are asked for.
+
+    Args:
+    root: Dataset directory.
+    columns: Columns to read (defaults to RESULTS_COLUMNS).
+    filters: Optional dict of column -> allowed values, e.g. {"season": ["2023-2024"]}.
+        Filters on season, event_id or division only open matching partitions.
+    typed: Keep the stored types. When False, columns come back as the same
+        string dtypes load_data produces for CSVs.
+
+    Returns:
+    A DataFrame.
+    """
+    columns = list(columns or RESULTS_COLUMNS)
+    results = pd.read_parquet(root, columns=columns, filters=_to_filters(filters))
+    if typed:
+        return results
+    string_columns = [column for column in columns if column != "time_seconds"]
+    return results.astype({column: "string" for column in string_columns})
+
+
+# ------------------ Migration
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate results CSVs to the Parquet results store")
+    parser.add_argument("csv_paths", nargs="+", help="Results CSVs, e.g. data/hyrox_results_pro.csv")
+    parser.add_argument("--root", default=DEFAULT_PARQUET_PATH, help="Parquet dataset directory")
+    args = parser.parse_args()
+    migrate_csv_to_parquet(args.csv_paths, args.root)
@@ -0,0 +1,424 @@
+# ------------------ Imports
+import math
+import re
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
+from urllib.request import Request, urlopen
+import lxml.html
+import pandas as pd
+from bs4 import BeautifulSoup
+from functions.timing import SCRAPE_TIMER
+
+ATHLETE_LINK_SELECTOR = "h4.list-field.type-fullname a"
+DEFAULT_USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+
+# ------------------ Parsing
+ATHLETE_COLUMNS = ["desc", "time_day", "time", "diff", "fullname", "age_class", "start_no"]
+SPLIT_TABLE_XPATH = (
+    "//table[contains(concat(' ', normalize-space(@class), ' '), ' table-condensed ')"
+    " and contains(concat(' ', normalize-space(@class), ' '), ' table-striped ')][1]/tbody/tr"
+)
+
+
+def _cell_text(element):
+    # Matches BeautifulSoup get_text(strip=True)
+    return "".join(text.strip() for text in element.itertext())
+
+
+def _header_field(tree, css_class, default=None):
+    cells = tree.xpath(f"//td[@class='{css_class}']")
+    if not cells:
+        if default is None:
+            raise ValueError(f"Missing athlete field: {css_class}")
+        return default
+    return _cell_text(cells[0])
+
+
+def parse_athlete_columns(page_source, columns=None):
+    """
+    Parses an athlete detail page straight into column lists.
+
+    Args:
+    page_source: HTML of the athlete detail page.
+    columns: Optional dict of lists (keyed by ATHLETE_COLUMNS) to append to,
+        so many pages can be collected before building a single DataFrame.
+
+    Returns:
+    The dict of column lists.
+    """
+    if columns is None:
+        columns = {column: [] for column in ATHLETE_COLUMNS}
+    tree = lxml.html.fromstring(page_source)
+
+    # Find additional information
+    fullname = _header_field(tree, "f-__fullname last")
+    age_class = _header_field(tree, "f-_type_age_class last", "_NONE_")
+    start_no = _header_field(tree, "f-start_no_text last", "_NONE_")
+
+    rows = tree.xpath(SPLIT_TABLE_XPATH)
+    if not rows:
+        raise ValueError("Missing split table")
+
+    time_day, split_time, diff = "_NONE_", "_NONE_", "_NONE_"
+    for row in rows:
+        cells = [_cell_text(cell) for cell in row.iter("td")]
+        desc = _cell_text(next(row.iter("th")))
+        if len(cells) == 3:
+            time_day, split_time, diff = cells
+        if len(cells) == 2:
+            time_day = "_NONE_"
+            split_time, diff = cells
+        columns["desc"].append(desc)
+        columns["time_day"].append(time_day)
+        columns["time"].append(split_time)
+        columns["diff"].append(diff)
+
+    columns["fullname"].extend([fullname] * len(rows))
+    columns["age_class"].extend([age_class] * len(rows))
+    columns["start_no"].extend([start_no] * len(rows))
+    return columns
+
+
+def parse_athlete_pages(pages):
+    """
+    Parses many athlete detail pages into one DataFrame.
+
+    Args:
+    pages: Iterable of athlete detail page sources. None entries (failed fetches) are skipped.
+
+    Returns:
+    A DataFrame with one row per split, in ATHLETE_COLUMNS order.
+    """
+    columns = {column: [] for column in ATHLETE_COLUMNS}
+    for page in pages:
+        if page is None:
+            continue
+        try:
+            parse_athlete_columns(page, columns)
+        except Exception as e:
+            print(f"Failed to parse athlete page: {e}")
+            # Drop any partial rows from the failed page (fullname is filled last)
+            length = len(columns["fullname"])
+            for column in ATHLETE_COLUMNS:
+                del columns[column][length:]
+    return pd.DataFrame(columns, columns=ATHLETE_COLUMNS)
+
+
+def parse_athlete_page(page_source):
+    return pd.DataFrame(parse_athlete_columns(page_source), columns=ATHLETE_COLUMNS)
+
+
+def get_athlete_urls(page_source, base_url):
+    """
+    Collects the athlete detail page URLs from a results list page.
+
+    Args:
+    page_source: HTML of the results list page.
+    base_url: URL the list page was loaded from, used to resolve relative links.
+
+    Returns:
+    A list of absolute athlete detail URLs in list order.
+    """
+    soup = BeautifulSoup(page_source, 'html.parser')
+    links = soup.select(ATHLETE_LINK_SELECTOR)
+    return [urljoin(base_url, link["href"]) for link in links if link.get("href")]
+
+
+# Summary scrape: one row per athlete straight from the results list page
+SUMMARY_COLUMNS = ["fullname", "age_class", "start_no", "time", "detail_url"]
+# Class of the list row field holding each summary column
+SUMMARY_FIELD_CLASSES = {"age_class": "type-age_class", "start_no": "type-start_no", "time": "type-time"}
+LIST_ROW_XPATH = (
+    "//h4[contains(concat(' ', normalize-space(@class), ' '), ' type-fullname ')]"
+    "/ancestor::*[contains(concat(' ', normalize-space(@class), ' '), ' list-group-item ') or self::li][1]"
+)
+
+
+def _list_field_text(row, css_class):
+    # Field value without its "list-label" caption (shown on small screens)
+    fields = row.xpath(f".//*[contains(concat(' ', normalize-space(@class), ' '), ' {css_class} ')]")
+    if not fields:
+        return "_NONE_"
+    field = fields[0]
+    labels = set(field.xpath(".//*[contains(@class, 'list-label')]//text()"))
+    return "".join(text.strip() for text in field.xpath(".//text()") if text not in labels) or "_NONE_"
+
+
+def parse_summary_page(page_source, base_url):
+    """
+    Parses the athlete rows of a results list page: name, age class, start
+    number and finish time, without opening any athlete detail page.
+
+    Args:
+    page_source: HTML of the results list page.
+    base_url: URL the list page was loaded from, used to resolve the detail links.
+
+    Returns:
+    A DataFrame with one row per athlete, in SUMMARY_COLUMNS order.
+    """
+    columns = {column: [] for column in SUMMARY_COLUMNS}
+    for row in lxml.html.fromstring(page_source).xpath(LIST_ROW_XPATH):
+        link = row.xpath(".//h4[contains(@class, 'type-fullname')]//a")
+        name_element = link[0] if link else row.xpath(".//h4[contains(@class, 'type-fullname')]")[0]
+        columns["fullname"].append(_cell_text(name_element))
+        columns["detail_url"].append(urljoin(base_url, link[0].get("href")) if link and link[0].get("href") else None)
+        for column, css_class in SUMMARY_FIELD_CLASSES.items():
+            columns[column].append(_list_field_text(row, css_class))
+    return pd.DataFrame(columns, columns=SUMMARY_COLUMNS)
+
+
+# ------------------ Pagination
+# Advertised number of results on a list page, e.g. "1 - 100 of 2,345" or
+# "2345 Results". The list-info elements are searched first, then the whole page.
+RESULT_INFO_XPATH = "//*[contains(@class, 'list-info')]"
+RESULT_TOTAL_PATTERNS = [
+    r"\b(?:of|von)\s+(\d[\d,.']*)",
+    r"(\d[\d,.']*)\s+(?:results|hits|ergebnisse|treffer)\b"
+]
+# Only trusted inside the list-info elements, elsewhere it matches dates
+RESULT_INFO_PATTERNS = RESULT_TOTAL_PATTERNS + [r"/\s*(\d[\d,.']*)"]
+PAGE_LINK_XPATH = "//a[contains(@href, 'page=')]/@href"
+PAGE_PARAM = re.compile(r"([?&])page=(\d+)")
+
+
+def _first_number(texts, patterns):
+    for text in texts:
+        for pattern in patterns:
+            match = re.search(pattern, text, flags=re.IGNORECASE)
+            if match:
+                return int(re.sub(r"\D", "", match.group(1)))
+    return None
+
+
+def get_result_total(page_source):
+    """
+    The number of results a list page says the search has, or None when the
+    page does not show it.
+    """
+    tree = lxml.html.fromstring(page_source)
+    info_texts = [" ".join(element.itertext()) for element in tree.xpath(RESULT_INFO_XPATH)]
+    total = _first_number(info_texts, RESULT_INFO_PATTERNS)
+    if total is None:
+        total = _first_number([" ".join(tree.itertext())], RESULT_TOTAL_PATTERNS)
+    return total
+
+
+def set_page(url, page):
+    """url with its page= query parameter set to page (added when missing)."""
+    if PAGE_PARAM.search(url):
+        return PAGE_PARAM.sub(rf"\g<1>page={page}", url)
+    return f"{url}{'&' if '?' in url else '?'}page={page}"
+
+
+def get_page_links(page_source, base_url):
+    """
+    The pagination links of a list page, as page number -> absolute URL.
+    """
+    links = {}
+    for href in lxml.html.fromstring(page_source).xpath(PAGE_LINK_XPATH):
+        match = PAGE_PARAM.search(href)
+        if match:
+            links.setdefault(int(match.group(2)), urljoin(base_url, href))
+    return links
+
+
+def plan_list_pages(page_source, base_url, num_results):
+    """
+    Works out every list page of a search from its first page, so the rest can
+    be fetched at once instead of clicking through them.
+
+    The page count comes from the advertised result total and the page size.
+    Page URLs are built from a pagination link of the first page (or its own
+    URL), which carries the search parameters.
+
+    Args:
+    page_source: HTML of the first list page.
+    base_url: URL of the first list page.
+    num_results: Results per page selected in the search (num_results).
+
+    Returns:
+    Dict with "total" (None when the page does not show a usable total),
+    "listed" (athletes on the first page) and "urls" (pages 2..N, in order).
+    """
+    listed = len(get_athlete_urls(page_source, base_url))
+    total = get_result_total(page_source)
+    if total is None or total < listed:
+        return {"total": None, "listed": listed, "urls": []}
+    num_pages = max(1, math.ceil(total / num_results))
+    links = get_page_links(page_source, base_url)
+    template = next(iter(links.values())) if links else base_url
+    return {"total": total, "listed": listed, "urls": [set_page(template, page) for page in range(2, num_pages + 1)]}
+
+
+# ------------------ HTTP Fetching
+class HostRateLimiter:
+    """
+    Thread-safe limiter that spaces out requests to the same host.
+
+    Args:
+    requests_per_second: Maximum request rate allowed per host.
+    """
+    def __init__(self, requests_per_second=5.0):
+        self.min_interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self.lock = threading.Lock()
+        self.next_slot = {}
+
+    def wait(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.min_interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+def get_session_headers(driver):
+    """
+    Copies the cookies and user agent from a live browser session so plain
+    HTTP requests are served the same pages as the browser.
+
+    Args:
+    driver: A selenium / seleniumbase driver that has already loaded the results site.
+
+    Returns:
+    A dict of request headers.
+    """
+    cookies = "; ".join(f"{c['name']}={c['value']}" for c in driver.get_cookies())
+    try:
+        user_agent = driver.execute_script("return navigator.userAgent")
+    except Exception:
+        user_agent = DEFAULT_USER_AGENT
+    return {"Cookie": cookies, "User-Agent": user_agent}
+
+
+def fetch_url(url, headers=None, timeout=30, retries=2, rate_limiter=None):
+    attempt = 0
+    while True:
+        if rate_limiter is not None:
+            rate_limiter.wait(url)
+        try:
+            request = Request(url, headers=headers or {"User-Agent": DEFAULT_USER_AGENT})
+            with SCRAPE_TIMER.step("http fetch"):
+                with urlopen(request, timeout=timeout) as response:
+                    charset = response.headers.get_content_charset() or "utf-8"
+                    return response.read().decode(charset, errors="replace")
+        except Exception as e:
+            attempt += 1
+            if attempt > retries:
+                raise
+            print(f"Retrying {url} ({attempt}/{retries}) after error: {e}")
+            # Exponential backoff
+            time.sleep(0.5 * 2 ** (attempt - 1))
+
+
+def fetch_pages(urls, headers=None, max_workers=8, requests_per_second=5.0, timeout=30, retries=2):
+    """
+    Fetches a list of URLs with a bounded thread pool and a per-host rate limit.
+
+    Args:
+    urls: URLs to fetch.
+    headers: Request headers, usually from get_session_headers.
+    max_workers: Maximum number of requests in flight.
+    requests_per_second: Maximum request rate per host.
+    timeout: Socket timeout in seconds for each request.
+    retries: Number of retries per URL before giving up.
+
+    Returns:
+    A list of page sources in the same order as urls (None for pages that failed).
+    """
+    rate_limiter = HostRateLimiter(requests_per_second)
+
+    def fetch(url):
+        try:
+            return fetch_url(url, headers, timeout, retries, rate_limiter)
+        except Exception as e:
+            print(f"Failed to fetch {url}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(fetch, urls))
+
+
+def scrape_athletes_http(
+    all_athlete_list,
+    page_source,
+    base_url,
+    headers=None,
+    max_workers=8,
+    requests_per_second=5.0,
+    job_store=None,
+    job=None,
+    page_cache=None,
+    failed_urls=None
+):
+    """
+    Scrapes every athlete linked from a results list page over plain HTTP.
+
+    Args:
+    all_athlete_list: List that parsed athlete DataFrames are appended to.
+    page_source: HTML of the results list page.
+    base_url: URL of the results list page.
+    headers: Request headers, usually from get_session_headers.
+    max_workers: Maximum number of requests in flight.
+    requests_per_second: Maximum request rate per host.
+    job_store: Optional JobStore; athletes it already holds are not fetched again.
+    job: (event_id, season, page) tuple identifying the list page in the job store.
+    page_cache: Optional PageCache the fetched athlete pages are stored in.
+    failed_urls: Optional list the URLs of athletes that could not be scraped are appended to.
+
+    Returns:
+    all_athlete_list with one DataFrame for the whole page appended.
+    """
+    athlete_urls = get_athlete_urls(page_source, base_url)
+    print(f"Athletes found: {len(athlete_urls)}")
+    start = time.perf_counter()
+
+    stored = {}
+    if job_store is not None:
+        event_id, season, page = job
+        stored = job_store.get_athlete_rows(event_id, season, athlete_urls)
+        if stored:
+            print(f"Athletes already scraped: {len(stored)}")
+    todo_urls = [url for url in athlete_urls if url not in stored]
+    fetched = dict(zip(todo_urls, fetch_pages(todo_urls, headers, max_workers, requests_per_second)))
+    if page_cache is not None:
+        event_id, season, page = job
+        page_cache.put_many(fetched.items(), "athlete", event_id=event_id, season=season, page=page)
+
+    columns = {column: [] for column in ATHLETE_COLUMNS}
+    scraped = 0
+    for url in athlete_urls:
+        if url in stored:
+            athlete_columns = stored[url]
+        else:
+            athlete_columns = None
+            # A page fetch_pages returned as None has already been reported there
+            if fetched[url] is not None:
+                try:
+                    with SCRAPE_TIMER.step("athlete parse"):
+                        athlete_columns = parse_athlete_columns(fetched[url])
+                except Exception as e:
+                    print(f"Failed to scrape {url}: {e}")
+            if athlete_columns is None:
+                if job_store is not None:
+                    job_store.fail_athlete(event_id, season, page, url)
+                if failed_urls is not None:
+                    failed_urls.append(url)
+                continue
+            if job_store is not None:
+                job_store.finish_athlete(event_id, season, page, url, athlete_columns)
+            scraped += 1
+        for column in ATHLETE_COLUMNS:
+            columns[column].extend(athlete_columns[column])
+
+    page_df = pd.DataFrame(columns, columns=ATHLETE_COLUMNS)
+    if len(page_df):
+        all_athlete_list.append(page_df)
+    elapsed = time.perf_counter() - start
+    rate = scraped / elapsed if elapsed > 0 else 0.0
+    print(f"Athletes scraped: {scraped} in {elapsed:.1f}s ({rate:.2f} athletes/sec)")
+    return all_athlete_list
@@ -0,0 +1,393 @@
+# ------------------ Imports
+import csv
+import json
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+DEFAULT_SNAPSHOT_DIR = "data/sheets_snapshots"
+GOOGLE_SCOPE = [
+    "https://spreadsheets.google.com/feeds",
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive.file",
+    "https://www.googleapis.com/auth/drive"
+]
+# Sheets API write quota is 60 requests per minute per user
+DEFAULT_REQUESTS_PER_MINUTE = 50
+# Cells per values.batchUpdate call, keeps request payloads well under the API limit
+MAX_CELLS_PER_CALL = 200_000
+
+
+# ------------------ Values & Ranges
+def _cell_text(value):
+    # Sheets reads every cell back as text, compare on that
+    if isinstance(value, (bool, np.bool_)):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    return str(value)
+
+
+def _column_text(series):
+    # _cell_text for a whole column, vectorized for bool / int / float columns
+    if pd.api.types.is_bool_dtype(series.dtype) and not series.hasnans:
+        return np.where(series.to_numpy(dtype=bool), "TRUE", "FALSE").tolist()
+    if pd.api.types.is_integer_dtype(series.dtype) and not series.hasnans:
+        return series.to_numpy(dtype=np.int64).astype(str).tolist()
+    if pd.api.types.is_float_dtype(series.dtype):
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        finite = np.isfinite(values)
+        whole = finite & (values == np.floor(np.where(finite, values, 0)))
+        text = np.where(whole, values, 0).astype(np.int64).astype(str).tolist()
+        for i in np.flatnonzero(~whole).tolist():
+            text[i] = _cell_text(values[i].item())
+        return text
+    return [_cell_text(value) for value in series.tolist()]
+
+
+def _column_values(series):
+    # Plain Python values, missing values as ""
+    values = series.tolist()
+    if series.hasnans:
+        values = ["" if pd.isna(value) else value for value in values]
+    return values
+
+
+def to_sheet_rows(df):
+    """
+    The table as sheet rows, header row first: the values to send and the same
+    cells as the text Sheets reads back.
+
+    Returns:
+    (values, texts): two lists of row lists.
+    """
+    columns = [df.iloc[:, i] for i in range(df.shape[1])]
+    values = [df.columns.tolist()] + [list(row) for row in zip(*[_column_values(column) for column in columns])]
+    texts = [[_cell_text(column) for column in df.columns]] + [
+        list(row) for row in zip(*[_column_text(column) for column in columns])
+    ]
+    return values, texts
+
+
+def _column_letter(col):
+    letters = ""
+    while col:
+        col, remainder = divmod(col - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def _a1_range(first_row, first_col, num_rows, num_cols):
+    # 0-based block -> "B2:D4"
+    return (
+        f"{_column_letter(first_col + 1)}{first_row + 1}:"
+        f"{_column_letter(first_col + num_cols)}{first_row + num_rows}"
+    )
+
+
+def _parse_a1(cell):
+    # "B2" -> (1, 1), 0-based row and column
+    letters = cell.rstrip("0123456789")
+    col = 0
+    for letter in letters:
+        col = col * 26 + ord(letter) - ord("A") + 1
+    return int(cell[len(letters):]) - 1, col - 1
+
+
+def diff_blocks(old_texts, new_texts, new_values):
+    """
+    Blocks of cells that must be written to turn a tab showing old_texts into
+    one showing new_texts.
+
+    Rows are compared as text. Consecutive changed rows are merged into one
+    block spanning their changed columns, and cells that are no longer part of
+    the table are blanked.
+
+    Args:
+    old_texts: Current rows of the tab, as text.
+    new_texts: New rows as text, see to_sheet_rows.
+    new_values: New rows as the values to send.
+
+    Returns:
+    List of (first_row, first_col, values) with 0-based positions.
+    """
+    num_rows = max(len(old_texts), len(new_texts))
+    num_cols = max([len(row) for row in old_texts] + [len(row) for row in new_texts] + [0])
+
+    def padded(rows, row):
+        cells = list(rows[row]) if row < len(rows) else []
+        return cells + [""] * (num_cols - len(cells))
+
+    changed = []
+    for row in range(num_rows):
+        old_row, new_row = padded(old_texts, row), padded(new_texts, row)
+        if old_row == new_row:
+            changed.append(None)
+            continue
+        cols = [col for col in range(num_cols) if old_row[col] != new_row[col]]
+        changed.append((cols[0], cols[-1]))
+
+    blocks = []
+    row = 0
+    while row < num_rows:
+        if changed[row] is None:
+            row += 1
+            continue
+        first_row = row
+        first_col, last_col = changed[row]
+        while row + 1 < num_rows and changed[row + 1] is not None:
+            row += 1
+            first_col, last_col = min(first_col, changed[row][0]), max(last_col, changed[row][1])
+        width = last_col - first_col + 1
+        values = []
+        for r in range(first_row, row + 1):
+            cells = new_values[r][first_col:last_col + 1] if r < len(new_values) else []
+            values.append(cells + [""] * (width - len(cells)))
+        blocks.append((first_row, first_col, values))
+        row += 1
+    return blocks
+
+
+def to_batches(blocks, max_cells=MAX_CELLS_PER_CALL):
+    """
+    Turns diff blocks into batches of {"range", "values"} updates, splitting
+    tall blocks so no batch is over max_cells.
+    """
+    pieces = []
+    for first_row, first_col, values in blocks:
+        rows_per_piece = max(1, max_cells // len(values[0]))
+        for offset in range(0, len(values), rows_per_piece):
+            piece = values[offset:offset + rows_per_piece]
+            pieces.append({
+                "range": _a1_range(first_row + offset, first_col, len(piece), len(piece[0])),
+                "values": piece
+            })
+    batches, batch, cells = [], [], 0
+    for piece in pieces:
+        size = len(piece["values"]) * len(piece["values"][0])
+        if batch and cells + size > max_cells:
+            batches.append(batch)
+            batch, cells = [], 0
+        batch.append(piece)
+        cells += size
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+# ------------------ Backends
+class GoogleSheetsBackend:
+    """
+    Google Sheets through gspread, with one authorized client and opened
+    spreadsheets and worksheets reused across tabs.
+
+    Args:
+    credentials_json: Path to the Google service account credentials.
+    """
+    name = "google"
+
+    def __init__(self, credentials_json):
+        import gspread
+        from oauth2client.service_account import ServiceAccountCredentials
+        self.gspread = gspread
+        credentials = ServiceAccountCredentials.from_json_keyfile_name(credentials_json, GOOGLE_SCOPE)
+        self.client = gspread.authorize(credentials)
+        self.lock = threading.Lock()
+        self.spreadsheets = {}
+        self.worksheets = {}
+
+    def _worksheet(self, sheet_name, tab_name):
+        with self.lock:
+            key = (sheet_name, tab_name)
+            if key not in self.worksheets:
+                if sheet_name not in self.spreadsheets:
+                    self.spreadsheets[sheet_name] = self.client.open(sheet_name)
+                sheet = self.spreadsheets[sheet_name]
+                try:
+                    self.worksheets[key] = sheet.worksheet(tab_name)
+                except self.gspread.WorksheetNotFound:
+                    self.worksheets[key] = sheet.add_worksheet(title=tab_name, rows="100", cols="20")
+            return self.worksheets[key]
+
+    def read_values(self, sheet_name, tab_name):
+        return self._worksheet(sheet_name, tab_name).get_all_values()
+
+    def write_ranges(self, sheet_name, tab_name, updates, num_rows, num_cols):
+        worksheet = self._worksheet(sheet_name, tab_name)
+        if worksheet.row_count < num_rows or worksheet.col_count < num_cols:
+            worksheet.resize(rows=max(worksheet.row_count, num_rows), cols=max(worksheet.col_count, num_cols))
+        worksheet.batch_update(updates)
+
+
+class LocalSheetsBackend:
+    """
+    Stand-in for Google Sheets that keeps every tab in memory, or as
+    root/<sheet name>/<tab name>.csv when root is given. Counts write calls so
+    publishing can be checked without a network.
+
+    Args:
+    root: Optional directory for the tab CSVs.
+    """
+    name = "local"
+
+    def __init__(self, root=None):
+        self.root = root
+        self.lock = threading.Lock()
+        self.tabs = {}
+        self.write_calls = 0
+
+    def _path(self, sheet_name, tab_name):
+        return os.path.join(self.root, sheet_name, f"{tab_name}.csv")
+
+    def read_values(self, sheet_name, tab_name):
+        with self.lock:
+            if (sheet_name, tab_name) in self.tabs:
+                return [list(row) for row in self.tabs[(sheet_name, tab_name)]]
+        if self.root and os.path.exists(self._path(sheet_name, tab_name)):
+            with open(self._path(sheet_name, tab_name), newline="") as f:
+                return [row for row in csv.reader(f)]
+        return []
+
+    def write_ranges(self, sheet_name, tab_name, updates, num_rows, num_cols):
+        values = self.read_values(sheet_name, tab_name)
+        touched = set()
+        for update in updates:
+            first_row, first_col = _parse_a1(update["range"].split(":")[0])
+            for r, row_values in enumerate(update["values"]):
+                while len(values) <= first_row + r:
+                    values.append([])
+                row = values[first_row + r]
+                row.extend([""] * (first_col + len(row_values) - len(row)))
+                row[first_col:first_col + len(row_values)] = [_cell_text(value) for value in row_values]
+                touched.add(first_row + r)
+        # Like Google Sheets, trailing blank rows and cells are not part of the values
+        for r in touched:
+            row = values[r]
+            while row and row[-1] == "":
+                row.pop()
+        while values and not values[-1]:
+            values.pop()
+        with self.lock:
+            self.tabs[(sheet_name, tab_name)] = values
+            self.write_calls += 1
+        if self.root:
+            os.makedirs(os.path.join(self.root, sheet_name), exist_ok=True)
+            with open(self._path(sheet_name, tab_name), "w", newline="") as f:
+                csv.writer(f).writerows(values)
+
+
+# ------------------ Publisher
+class SheetsPublisher:
+    """
+    Publishes DataFrames to spreadsheet tabs, writing only what changed.
+
+    The last published values of every tab are kept as a snapshot in
+    snapshot_dir. A new table is diffed against the snapshot (or, without one,
+    against the values read back from the backend) and only the changed ranges
+    are sent, in batched write calls. Tabs are published concurrently, spaced
+    out to stay within the API write quota.
+
+    Args:
+    backend: GoogleSheetsBackend, LocalSheetsBackend or any object with
+        read_values and write_ranges.
+    snapshot_dir: Directory for published snapshots, None keeps them in memory only.
+    max_workers: Tabs published at the same time.
+    requests_per_minute: Maximum backend write calls per minute.
+    """
+    def __init__(self, backend, snapshot_dir=DEFAULT_SNAPSHOT_DIR, max_workers=4, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE):
+        self.backend = backend
+        self.snapshot_dir = snapshot_dir
+        self.max_workers = max_workers
+        self.min_interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self.lock = threading.Lock()
+        self.next_slot = time.monotonic()
+        self.snapshots = {}
+
+    def _wait_for_quota(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def _snapshot_path(self, sheet_name, tab_name):
+        return os.path.join(self.snapshot_dir, self.backend.name, sheet_name, f"{tab_name}.json")
+
+    def _load_snapshot(self, sheet_name, tab_name):
+        key = (sheet_name, tab_name)
+        if key in self.snapshots:
+            return self.snapshots[key]
+        if self.snapshot_dir and os.path.exists(self._snapshot_path(sheet_name, tab_name)):
+            with open(self._snapshot_path(sheet_name, tab_name)) as f:
+                return json.load(f)
+        return None
+
+    def _save_snapshot(self, sheet_name, tab_name, snapshot):
+        self.snapshots[(sheet_name, tab_name)] = snapshot
+        if self.snapshot_dir:
+            path = self._snapshot_path(sheet_name, tab_name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(snapshot, f)
+
+    def publish(self, df, sheet_name, tab_name, refresh=False):
+        """
+        Publishes one table to one tab.
+
+        Args:
+        df: The DataFrame to publish (header row plus values).
+        sheet_name: Spreadsheet name.
+        tab_name: Tab (worksheet) name.
+        refresh: Diff against the values read from the backend instead of the snapshot,
+            e.g. after the tab was edited by hand.
+
+        Returns:
+        Number of cells written.
+        """
+        new_values, new_texts = to_sheet_rows(df)
+        old_texts = None if refresh else self._load_snapshot(sheet_name, tab_name)
+        if old_texts is None:
+            old_texts = self.backend.read_values(sheet_name, tab_name)
+        blocks = diff_blocks(old_texts, new_texts, new_values)
+        num_rows = max(len(old_texts), len(new_texts))
+        num_cols = max([len(row) for row in old_texts + new_texts] + [0])
+        for batch in to_batches(blocks):
+            self._wait_for_quota()
+            self.backend.write_ranges(sheet_name, tab_name, batch, num_rows, num_cols)
+        self._save_snapshot(sheet_name, tab_name, new_texts)
+        cells = sum(len(values) * len(values[0]) for _, _, values in blocks)
+        print(f"Published {sheet_name}/{tab_name}: {len(df)} rows, {cells} cells changed")
+        return cells
+
+    def publish_many(self, tables, refresh=False):
+        """
+        Publishes several tables concurrently.
+
+        Args:
+        tables: List of (df, sheet_name, tab_name).
+
+        Returns:
+        List of cells written per table, in the same order.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [
+                pool.submit(self.publish, df, sheet_name, tab_name, refresh)
+                for df, sheet_name, tab_name in tables
+            ]
+            return [future.result() for future in futures]
+
+
+@lru_cache(maxsize=None)
+def get_google_publisher(credentials_json, snapshot_dir=DEFAULT_SNAPSHOT_DIR):
+    """
+    One SheetsPublisher (and authorized client) per credentials file for the process.
+    """
+    return SheetsPublisher(GoogleSheetsBackend(credentials_json), snapshot_dir=snapshot_dir)
@@ -0,0 +1,171 @@
+# ------------------ Imports
+import argparse
+import json
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from functions.data_functions import RESULTS_DTYPES, clean_raw_results
+
+DEFAULT_CHUNKSIZE = 500_000
+# Rows of one race, the race_person_id of clean_raw_results (event, name and
+# start number): everything it groups by (de-duplication, split numbers, bad
+# races and split diffs) stays inside it. Two athletes of the same name in one
+# event are two races.
+ATHLETE_KEY = ["event_id", "fullname", "start_no"]
+
+
+def _filter_chunk(chunk, filters):
+    # Same row filters as load_data
+    for column, values in (filters or {}).items():
+        if column == "division":
+            chunk = chunk[chunk["event_id"].str.split("_").str[1].isin(values)]
+        else:
+            chunk = chunk[chunk[column].isin(values)]
+    return chunk
+
+
+def iter_athlete_chunks(path, chunksize=DEFAULT_CHUNKSIZE, filters=None):
+    """
+    Reads a results CSV in chunks of about chunksize rows that never split the
+    rows of one race (one athlete in one event): the trailing race of each chunk
+    is carried over to the next.
+
+    Yields:
+    Raw results DataFrames with the same dtypes as load_data.
+    """
+    carry = None
+    for chunk in pd.read_csv(path, dtype=RESULTS_DTYPES, chunksize=chunksize):
+        chunk = _filter_chunk(chunk, filters)
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        if chunk.empty:
+            carry = chunk
+            continue
+        keys = pd.util.hash_pandas_object(chunk[ATHLETE_KEY], index=False).to_numpy()
+        boundaries = np.flatnonzero(keys != keys[-1])
+        start = boundaries[-1] + 1 if len(boundaries) else 0
+        carry = chunk.iloc[start:]
+        if start:
+            yield chunk.iloc[:start]
+    if carry is not None and len(carry):
+        yield carry
+
+
+class _EmittedAthletes:
+    """
+    Athletes already cleaned, as a 64-bit key hash -> hash of their distinct
+    raw rows. Memory grows with the number of athletes, not rows.
+
+    Scraped results hold each athlete's rows together. An athlete seen again
+    later with exactly the same rows (a page scraped twice) is dropped, as
+    drop_duplicates would drop it. Anything else cannot be cleaned one chunk
+    at a time and raises.
+    """
+    def __init__(self):
+        self.fingerprints = {}
+
+    def drop_repeats(self, chunk):
+        keys = pd.util.hash_pandas_object(chunk[ATHLETE_KEY], index=False).to_numpy()
+        rows = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+        distinct = pd.DataFrame({"key": keys, "row": rows}).drop_duplicates()
+        fingerprints = distinct.groupby("key", sort=False)["row"].sum()
+        repeated = [key for key in fingerprints.index if key in self.fingerprints]
+        for key in repeated:
+            if self.fingerprints[key] != fingerprints[key]:
+                raise ValueError(
+                    "Results are not grouped by athlete: an athlete's rows reappear later in the file "
+                    "with different rows. Use get_clean_results for this file."
+                )
+        self.fingerprints.update(zip(fingerprints.index.tolist(), fingerprints.tolist()))
+        if repeated:
+            chunk = chunk[~np.isin(keys, repeated)]
+        return chunk
+
+
+def iter_clean_results(path, chunksize=DEFAULT_CHUNKSIZE, filters=None):
+    """
+    Streaming get_clean_results for results CSVs larger than memory: cleans one
+    athlete-aligned chunk at a time (see iter_athlete_chunks). Concatenated, the
+    chunks equal get_clean_results(path, filters) row for row.
+
+    Yields:
+    (clean_chunk, num_bad_races) per chunk.
+    """
+    emitted = _EmittedAthletes()
+    for chunk in iter_athlete_chunks(path, chunksize, filters):
+        chunk = emitted.drop_repeats(chunk.drop_duplicates())
+        if chunk.empty:
+            continue
+        num_races = (chunk["event_id"] + "_" + chunk["fullname"] + chunk["start_no"]).nunique()
+        clean_chunk = clean_raw_results(chunk.reset_index(drop=True), verbose=False)
+        yield clean_chunk, num_races - clean_chunk["race_person_id"].nunique()
+
+
+def _arrow_schema(clean_results):
+    # From the dtypes rather than the values, so a column that is empty in the
+    # first chunk is not typed as null. The pandas dtypes are kept in the
+    # metadata for read_clean_results.
+    fields = []
+    for column, dtype in clean_results.dtypes.items():
+        if dtype == object or pd.api.types.is_string_dtype(dtype):
+            arrow_type = pa.string()
+        elif pd.api.types.is_bool_dtype(dtype):
+            arrow_type = pa.bool_()
+        else:
+            arrow_type = pa.from_numpy_dtype(dtype)
+        fields.append(pa.field(column, arrow_type))
+    dtypes = {column: str(dtype) for column, dtype in clean_results.dtypes.items()}
+    return pa.schema(fields, metadata={"clean_dtypes": json.dumps(dtypes)})
+
+
+def stream_clean_results(path, output_path, chunksize=DEFAULT_CHUNKSIZE, filters=None):
+    """
+    Cleans a results CSV chunk by chunk into a Parquet file, so peak memory
+    depends on chunksize rather than the size of the file.
+
+    Args:
+    path: Results CSV.
+    output_path: Parquet file to write (see read_clean_results).
+    chunksize: Rows read per chunk.
+    filters: Optional load_data filters.
+
+    Returns:
+    Number of clean rows written.
+    """
+    writer = None
+    num_rows = 0
+    num_bad_races = 0
+    try:
+        for clean_chunk, bad_races in iter_clean_results(path, chunksize, filters):
+            if writer is None:
+                schema = _arrow_schema(clean_chunk)
+                writer = pq.ParquetWriter(output_path, schema)
+            writer.write_table(pa.Table.from_pandas(clean_chunk, schema=schema, preserve_index=False))
+            num_rows += len(clean_chunk)
+            num_bad_races += bad_races
+    finally:
+        if writer is not None:
+            writer.close()
+    print(f"Bad race data count: {num_bad_races}")
+    print(f"Streamed {num_rows} clean rows to {output_path}")
+    return num_rows
+
+
+def read_clean_results(output_path, columns=None):
+    """
+    Reads clean results written by stream_clean_results, with the dtypes
+    get_clean_results returns.
+    """
+    dtypes = json.loads(pq.read_schema(output_path).metadata[b"clean_dtypes"])
+    clean_results = pd.read_parquet(output_path, columns=columns)
+    return clean_results.astype({column: dtypes[column] for column in clean_results.columns})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean a results CSV in bounded memory")
+    parser.add_argument("path", help="Results CSV, e.g. data/hyrox_results_open_Men.csv")
+    parser.add_argument("output_path", help="Parquet file for the clean results")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="Rows read per chunk")
+    args = parser.parse_args()
+    stream_clean_results(args.path, args.output_path, args.chunksize)
@@ -0,0 +1,151 @@
+# ------------------ Imports
+import os
+import numpy as np
+import pandas as pd
+from functions.data_functions import TIME_BUCKETS, get_event_columns, get_time_bucket_columns, round_float_columns
+from functions.time_codec import parse_durations, format_durations
+
+# Summary tables hold one row per athlete per event from the results list pages
+# (scraper.py summary mode): no splits, but ~100x fewer page loads than the
+# detail scrape. Finish time percentiles, sub-N counts and Elo only need these.
+SUMMARY_RESULTS_COLUMNS = ["fullname", "age_class", "start_no", "time", "detail_url", "event_id", "season"]
+SUMMARY_DTYPES = {column: "string" for column in SUMMARY_RESULTS_COLUMNS}
+# Columns of a summary finisher table, also taken from detail finishers when combining
+FINISH_TIME_COLUMNS = [
+    "fullname",
+    "clean_name",
+    "athlete_id",
+    "age_class",
+    "event_id",
+    "race_person_id",
+    "season",
+    "total_seconds"
+]
+
+
+def get_summary_path(export_path):
+    """
+    Summary table next to a detail results CSV, e.g. data/hyrox_results_pro.csv ->
+    data/hyrox_summary_pro.csv.
+    """
+    directory, file_name = os.path.split(export_path)
+    return os.path.join(directory, file_name.replace("hyrox_results", "hyrox_summary", 1))
+
+
+def get_results_path(summary_path):
+    """
+    Detail results CSV of a summary table, the inverse of get_summary_path.
+    """
+    directory, file_name = os.path.split(summary_path)
+    return os.path.join(directory, file_name.replace("hyrox_summary", "hyrox_results", 1))
+
+
+def get_clean_names(fullnames):
+    # Name without the nationality, e.g. "Doe, John (GBR)" -> "Doe, John"
+    return fullnames.str.split(" \\(").str[0].str.strip()
+
+
+def write_summary(summary, path, mode="a"):
+    """
+    Writes summary rows to path, with a header row when the file is new or
+    overwritten (scrapes only ever append to the detail CSVs).
+    """
+    header = mode == "w" or not os.path.exists(path)
+    summary[SUMMARY_RESULTS_COLUMNS].to_csv(path, mode=mode, index=False, header=header)
+
+
+def load_summary(path, filters=None):
+    """
+    Loads a summary table, with the same filters as load_data.
+    """
+    summary = pd.read_csv(path, dtype=SUMMARY_DTYPES)
+    for column, values in (filters or {}).items():
+        if column == "division":
+            summary = summary[summary["event_id"].str.split("_").str[1].isin(values)]
+        else:
+            summary = summary[summary[column].isin(values)]
+    return summary.drop_duplicates().reset_index(drop=True)
+
+
+def clean_summary_results(summary, verbose=True):
+    """
+    Adds race_person_id, clean_name (as clean_raw_results does) and
+    total_seconds to a summary table, and drops rows without a valid finish
+    time (DNF, DSQ, ...).
+    """
+    summary = summary.copy()
+    summary["race_person_id"] = summary["event_id"] + "_" + summary["fullname"] + summary["start_no"]
+    summary["clean_name"] = get_clean_names(summary["fullname"])
+    seconds, valid, _ = parse_durations(summary["time"])
+    if verbose:
+        print(f"Summary rows without a finish time: {int((~valid).sum())}")
+    clean_summary = summary[valid].reset_index(drop=True)
+    clean_summary["total_seconds"] = seconds[valid]
+    return clean_summary
+
+
+def get_summary_finisher_df(clean_summary, elite_athletes, time_buckets=TIME_BUCKETS):
+    """
+    Finisher table from a clean summary: the identity, time bucket, elite and
+    event columns of get_race_finisher_df, without split columns. get_elo_prep_df
+    and get_finish_time_df take it as they take race finishers.
+    """
+    finishers = clean_summary[[column for column in FINISH_TIME_COLUMNS if column in clean_summary.columns]]
+    finishers = finishers.reset_index(drop=True)
+    return pd.concat(
+        [
+            finishers,
+            get_time_bucket_columns(finishers["total_seconds"], time_buckets),
+            pd.DataFrame({"elite_athlete": finishers["clean_name"].isin(elite_athletes)}),
+            get_event_columns(finishers["event_id"])
+        ],
+        axis=1
+    )
+
+
+def combine_finishers(race_finisher_df, summary_finisher_df):
+    """
+    Finish times of every race: the detail finishers (split columns dropped)
+    plus the summary finishers of races the detail scrape does not have.
+    """
+    columns = [column for column in summary_finisher_df.columns if column in race_finisher_df.columns]
+    summary_only = summary_finisher_df[~summary_finisher_df["race_person_id"].isin(race_finisher_df["race_person_id"])]
+    return pd.concat([race_finisher_df[columns], summary_only[columns]], ignore_index=True)
+
+
+def get_finish_time_df(finishers, group_cols=["event_name"], time_buckets=TIME_BUCKETS):
+    """
+    Finish time distribution of every group: number of racers, fastest,
+    quartile and median times, and the number of racers under each bucket.
+    """
+    grouped = finishers.groupby(group_cols, sort=False)
+    quantiles = grouped["total_seconds"].quantile([0.25, 0.5, 0.75]).unstack()
+    stats = pd.DataFrame({
+        "total_racers": grouped["total_seconds"].count(),
+        "fastest": grouped["total_seconds"].min(),
+        "fastest_quarter": quantiles[0.25],
+        "median": quantiles[0.5],
+        "slowest_quarter": quantiles[0.75]
+    })
+    sub_columns = [f"sub_{n}" for n in sorted(time_buckets)]
+    stats = pd.concat([stats, grouped[sub_columns].sum()], axis=1)
+    return stats.reset_index()
+
+
+def get_final_finish_time_df(finish_time_df):
+    """
+    Publishable finish time table: times as "HH:MM:SS", sub-N counts and
+    shares, fastest median first.
+    """
+    time_columns = ["fastest", "fastest_quarter", "median", "slowest_quarter"]
+    sub_columns = [column for column in finish_time_df.columns if column.startswith("sub_")]
+    final_df = finish_time_df.sort_values("median", kind="stable").reset_index(drop=True)
+    for column in time_columns:
+        final_df[column] = format_durations(final_df[column].to_numpy(dtype=np.float64))
+    for column in sub_columns:
+        final_df[f"{column}_pct"] = final_df[column] / final_df["total_racers"] * 100
+    final_df = final_df.rename(columns={column: f"{column}_time" for column in time_columns})
+    final_df.columns = [
+        ' '.join(word.capitalize() for word in col.replace('_', ' ').replace('-', ' ').split()) for col in final_df.columns
+    ]
+    return round_float_columns(final_df)
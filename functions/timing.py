@@ -0,0 +1,108 @@
+# ------------------ Imports
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60]
+
+
+class StepTimer:
+    """
+    Thread-safe recorder of per-step wall-clock latencies.
+
+    Each named step keeps a count, a total and a histogram over LATENCY_BUCKETS,
+    so a long scrape can show where its time actually goes.
+
+    Args:
+    buckets: Sorted histogram bucket upper bounds in seconds.
+    """
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = list(buckets)
+        self.lock = threading.Lock()
+        self.steps = {}
+
+    def record(self, step_name, seconds):
+        with self.lock:
+            step = self.steps.setdefault(
+                step_name,
+                {"count": 0, "total": 0.0, "max": 0.0, "histogram": [0] * (len(self.buckets) + 1)}
+            )
+            step["count"] += 1
+            step["total"] += seconds
+            step["max"] = max(step["max"], seconds)
+            step["histogram"][bisect.bisect_left(self.buckets, seconds)] += 1
+
+    @contextmanager
+    def step(self, step_name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(step_name, time.perf_counter() - start)
+
+    def reset(self):
+        with self.lock:
+            self.steps = {}
+
+    def take_samples(self):
+        """
+        Returns the raw per-step samples recorded so far and resets the timer,
+        so a worker process can send them to its parent (see merge).
+        """
+        with self.lock:
+            steps, self.steps = self.steps, {}
+        return steps
+
+    def merge(self, steps):
+        """
+        Adds raw per-step samples from take_samples, e.g. of another process,
+        to this timer. The buckets of both timers must match.
+        """
+        with self.lock:
+            for step_name, other in steps.items():
+                step = self.steps.setdefault(
+                    step_name,
+                    {"count": 0, "total": 0.0, "max": 0.0, "histogram": [0] * (len(self.buckets) + 1)}
+                )
+                step["count"] += other["count"]
+                step["total"] += other["total"]
+                step["max"] = max(step["max"], other["max"])
+                step["histogram"] = [a + b for a, b in zip(step["histogram"], other["histogram"])]
+
+    def summary(self):
+        """
+        Returns a dict of step name -> count, total, mean, max and histogram
+        (keyed by bucket upper bound, with "inf" for the overflow bucket).
+        """
+        labels = [str(bound) for bound in self.buckets] + ["inf"]
+        with self.lock:
+            return {
+                name: {
+                    "count": step["count"],
+                    "total": step["total"],
+                    "mean": step["total"] / step["count"],
+                    "max": step["max"],
+                    "histogram": dict(zip(labels, step["histogram"]))
+                }
+                for name, step in self.steps.items()
+            }
+
+    def report(self):
+        summary = self.summary()
+        if not summary:
+            return
+        grand_total = sum(step["total"] for step in summary.values())
+        print("Step latencies:")
+        for name, step in sorted(summary.items(), key=lambda item: -item[1]["total"]):
+            share = step["total"] / grand_total * 100 if grand_total else 0.0
+            histogram = " ".join(f"<={label}:{count}" for label, count in step["histogram"].items() if count)
+            print(
+                f"  {name}: n={step['count']} total={step['total']:.1f}s ({share:.0f}%) "
+                f"mean={step['mean']:.2f}s max={step['max']:.2f}s | {histogram}"
+            )
+
+
+# Shared timer for the scraper
+SCRAPE_TIMER = StepTimer()
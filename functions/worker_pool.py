@@ -0,0 +1,197 @@
+# ------------------ Imports
+import multiprocessing as mp
+import time
+from multiprocessing.connection import wait
+from functions.timing import SCRAPE_TIMER
+
+
+# ------------------ Worker
+def _quit_driver(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+def _worker(worker_id, task_queue, result_conn, scrape_fn, driver_factory):
+    # Each worker keeps one long-lived browser session and reuses it for every task
+    driver = None
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        task_index, config = task
+        result_conn.send(("start", worker_id, task_index, None))
+        try:
+            if driver is None:
+                driver = driver_factory()
+            df = scrape_fn(config, driver)
+            # Step latencies of this task, the parent merges them into its report
+            result_conn.send(("timings", worker_id, task_index, SCRAPE_TIMER.take_samples()))
+            result_conn.send(("result", worker_id, task_index, df))
+        except Exception as e:
+            result_conn.send(("timings", worker_id, task_index, SCRAPE_TIMER.take_samples()))
+            result_conn.send(("error", worker_id, task_index, repr(e)))
+            # Recycle the browser, it may be left on an unknown page or crashed
+            if driver is not None:
+                _quit_driver(driver)
+            driver = None
+    if driver is not None:
+        _quit_driver(driver)
+    result_conn.close()
+
+
+# ------------------ Writer
+def write_results(config, df, written_paths):
+    """
+    Appends one scraped event to its export CSV (and, for detail scrapes, the
+    Parquet store when config has a parquet_path). Only the pool's parent
+    process calls this, so appends from different workers never interleave.
+    """
+    path = config["export_path"]
+    mode = "a" if path in written_paths else config.get("mode", "a")
+    written_paths.add(path)
+    if config.get("scrape_mode") == "summary":
+        from functions.summary_results import write_summary
+        write_summary(df, path, mode)
+        return
+    df.to_csv(path, mode=mode, index=False, header=False)
+    if config.get("parquet_path"):
+        from functions.results_store import write_results_parquet
+        write_results_parquet(df, config["parquet_path"])
+
+
+# ------------------ Pool
+def run_worker_pool(
+    configs,
+    scrape_fn,
+    driver_factory,
+    num_workers=3,
+    max_attempts=3,
+    writer=write_results,
+    on_complete=None,
+    poll_seconds=1.0
+):
+    """
+    Scrapes event configs in parallel with N long-lived browser sessions.
+
+    Configs are handed out from a queue to worker processes. A failed config is
+    retried on a fresh driver up to max_attempts times, and a worker process that
+    dies is replaced. Results are sent back to this process and written by a
+    single writer, and the step latencies each worker records in SCRAPE_TIMER
+    are merged into this process's SCRAPE_TIMER.
+
+    Args:
+    configs: List of scrape config dicts (see scraper.main).
+    scrape_fn: Picklable function (config, driver) -> DataFrame.
+    driver_factory: Picklable function () -> driver, called inside the worker.
+    num_workers: Number of browser sessions / worker processes.
+    max_attempts: Attempts per config before it is reported as failed.
+    writer: Function (config, df, written_paths) that persists one result.
+    on_complete: Optional function (config) called after a result is written.
+    poll_seconds: Maximum time to block while waiting for worker messages.
+
+    Returns:
+    A list of the configs that failed every attempt.
+    """
+    if not configs:
+        return []
+    ctx = mp.get_context("spawn")
+    task_queue = ctx.Queue()
+
+    def start_worker(worker_id):
+        # Results come back over a dedicated pipe; sends are synchronous so
+        # nothing is lost if the worker process dies right afterwards
+        parent_conn, child_conn = ctx.Pipe(duplex=False)
+        process = ctx.Process(
+            target=_worker,
+            args=(worker_id, task_queue, child_conn, scrape_fn, driver_factory),
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        return process, parent_conn
+
+    attempts = {i: 0 for i in range(len(configs))}
+    for i, config in enumerate(configs):
+        task_queue.put((i, config))
+    num_workers = min(num_workers, len(configs))
+    workers = {worker_id: start_worker(worker_id) for worker_id in range(num_workers)}
+    in_flight = {}
+    remaining = len(configs)
+    failed = []
+    written_paths = set()
+    start = time.perf_counter()
+
+    def retry_or_fail(task_index, reason):
+        nonlocal remaining
+        attempts[task_index] += 1
+        if attempts[task_index] < max_attempts:
+            print(f"Retrying {configs[task_index]['city']} after: {reason}")
+            task_queue.put((task_index, configs[task_index]))
+        else:
+            print(f"Failed {configs[task_index]['city']} after {attempts[task_index]} attempts: {reason}")
+            failed.append(configs[task_index])
+            remaining -= 1
+
+    while remaining > 0:
+        waitables = {}
+        for worker_id, (process, conn) in workers.items():
+            waitables[conn] = worker_id
+            waitables[process.sentinel] = worker_id
+        ready = wait(list(waitables), timeout=poll_seconds)
+
+        messages = []
+        dead_workers = set()
+        for item in ready:
+            worker_id = waitables[item]
+            if item is workers[worker_id][1]:
+                try:
+                    while item.poll():
+                        messages.append(item.recv())
+                except (EOFError, OSError):
+                    dead_workers.add(worker_id)
+            else:
+                dead_workers.add(worker_id)
+
+        for kind, worker_id, task_index, payload in messages:
+            if kind == "start":
+                in_flight[worker_id] = task_index
+            elif kind == "timings":
+                SCRAPE_TIMER.merge(payload)
+            elif kind == "result":
+                in_flight.pop(worker_id, None)
+                config = configs[task_index]
+                if payload is not None and len(payload):
+                    writer(config, payload, written_paths)
+                if on_complete is not None:
+                    on_complete(config)
+                remaining -= 1
+                print(f"Finished {config['city']} ({len(configs) - remaining}/{len(configs)}, {time.perf_counter() - start:.0f}s)")
+            elif kind == "error":
+                in_flight.pop(worker_id, None)
+                retry_or_fail(task_index, payload)
+
+        # Replace crashed worker processes and requeue their task
+        for worker_id in dead_workers:
+            process, conn = workers[worker_id]
+            process.join(timeout=5)
+            if process.is_alive():
+                continue
+            print(f"Worker {worker_id} exited with code {process.exitcode}, restarting")
+            conn.close()
+            if worker_id in in_flight:
+                retry_or_fail(in_flight.pop(worker_id), "worker process died")
+            if remaining > 0:
+                workers[worker_id] = start_worker(worker_id)
+            else:
+                del workers[worker_id]
+
+    for _ in workers:
+        task_queue.put(None)
+    for process, conn in workers.values():
+        process.join(timeout=30)
+        if process.is_alive():
+            process.terminate()
+        conn.close()
+    return failed
@@ -1,103 +1,152 @@
 # ------------------ Imports
+# Selenium and seleniumbase are imported where they are used, so importing this
+# module (e.g. from cli.py) does not load a browser stack
+from functools import partial
 import pandas as pd
-import time
-import re
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.support.ui import Select
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.common.action_chains import ActionChains
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
-from seleniumbase import Driver
-
-# ------------------ Events Data
-hyrox_events = pd.read_csv("data/hyrox_events.csv")
+from functions.scrape_functions import (
+    parse_athlete_page,
+    get_page_links,
+    plan_list_pages,
+    get_session_headers,
+    fetch_url,
+    fetch_pages,
+    parse_summary_page,
+    scrape_athletes_http
+)
+from functions.job_store import JobStore, get_event_id, get_job_id, DEFAULT_JOB_STORE_PATH, DEFAULT_MAX_JOB_ATTEMPTS
+from functions.page_cache import PageCache, DEFAULT_PAGE_CACHE_DIR
+from functions.summary_results import get_clean_names, get_results_path, get_summary_path, load_summary, write_summary
+from functions.worker_pool import run_worker_pool
+from functions.timing import SCRAPE_TIMER
+
+DEFAULT_WAIT_TIMEOUT = 10
+ATHLETE_LIST_SELECTOR = "h4.list-field.type-fullname"
+SPLIT_TABLE_SELECTOR = "table.table-condensed.table-striped"
 
 # ------------------ Helper Functions
-def select_helper(select_name, option, driver):
-    wait = WebDriverWait(driver, 10)
-    element = wait.until(EC.presence_of_element_located((By.NAME, select_name)))
+def wait_for(driver, condition, step_name, timeout=DEFAULT_WAIT_TIMEOUT, attempts=3, backoff=2.0):
+    """
+    Waits for a DOM condition instead of sleeping for a fixed time.
+
+    The wait is retried with an exponentially longer timeout before giving up,
+    and the time spent is recorded in SCRAPE_TIMER under step_name.
+
+    Args:
+    driver: The selenium driver.
+    condition: An expected_conditions style callable taking the driver.
+    step_name: Name the latency is recorded under.
+    timeout: Timeout in seconds for the first attempt.
+    attempts: Number of attempts before the TimeoutException is raised.
+    backoff: Multiplier applied to the timeout after each failed attempt.
+
+    Returns:
+    Whatever the condition returned.
+    """
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.common.exceptions import TimeoutException
+    with SCRAPE_TIMER.step(step_name):
+        for attempt in range(attempts):
+            try:
+                return WebDriverWait(driver, timeout * backoff ** attempt).until(condition)
+            except TimeoutException:
+                if attempt == attempts - 1:
+                    raise
+                print(f"Timed out waiting for {step_name}, retrying ({attempt + 1}/{attempts - 1})")
+
+
+def page_loaded(driver):
+    return driver.execute_script("return document.readyState") == "complete"
+
+
+def option_present(select_name, option):
+    # The event selects are filled by AJAX after the previous selection changes
+    from selenium.webdriver.common.by import By
+    def condition(driver):
+        for element in driver.find_elements(By.NAME, select_name):
+            for item in element.find_elements(By.TAG_NAME, "option"):
+                if item.text.strip() == option:
+                    return element
+        return False
+    return condition
+
+
+def select_helper(select_name, option, driver, timeout=DEFAULT_WAIT_TIMEOUT):
+    from selenium.webdriver.support.ui import Select
+    element = wait_for(driver, option_present(select_name, option), f"select {select_name}", timeout)
     select = Select(element)
     select.select_by_visible_text(option)
 
 
-def get_athlete_table(driver):
-    # Create an empty DataFrame
-    df = pd.DataFrame(columns=["desc", "time_day", "time", "diff", "fullname", "age_class", "start_no"])
+def results_list_ready(driver):
+    # Results list rendered, or the page finished loading without any results
+    from selenium.webdriver.common.by import By
+    return bool(driver.find_elements(By.CSS_SELECTOR, ATHLETE_LIST_SELECTOR)) or page_loaded(driver)
 
-    # Parse the page source with BeautifulSoup
-    soup = BeautifulSoup(driver.page_source, 'html.parser')
 
-    # Find the table
-    table = soup.select_one('table.table-condensed.table-striped')
+def wait_for_new_page(driver, old_element, step_name, timeout=DEFAULT_WAIT_TIMEOUT):
+    # The old element goes stale once the browser has navigated away
+    from selenium.webdriver.support import expected_conditions as EC
+    if old_element is not None:
+        wait_for(driver, EC.staleness_of(old_element), f"{step_name} navigate", timeout)
+    wait_for(driver, results_list_ready, step_name, timeout)
 
-    # Extract the rows from the table body
-    rows = table.tbody.find_all('tr')
 
-    # Find additional information
-    fullname = soup.find("td", class_="f-__fullname last").get_text(strip=True)
-    try:
-        age_class = soup.find("td", class_="f-_type_age_class last").get_text(strip=True)
-    except:
-        age_class = "_NONE_"
-    try:
-        start_no = soup.find("td", class_="f-start_no_text last").get_text(strip=True)
-    except:
-        start_no = "_NONE_"
-
-    # Loop through each row
-    all_rows = []
-    for row in rows:
-        # Extract the cells from the row
-        cells = row.find_all('td')
-
-        # Extract the description from the row header
-        desc = row.find('th').get_text(strip=True)
-
-        # Extract the time of day, time, and diff from the cells
-        if len(cells) == 3:
-            time_day = cells[0].get_text(strip=True)
-            time = cells[1].get_text(strip=True)
-            diff = cells[2].get_text(strip=True)
-        if len(cells) == 2:
-            time_day = "_NONE_"
-            time = cells[0].get_text(strip=True)
-            diff = cells[1].get_text(strip=True)
-
-        # Create a dictionary with the row data
-        row_data = pd.DataFrame({
-            "desc": [desc], 
-            "time_day": [time_day], 
-            "time": [time], 
-            "diff": [diff], 
-            "fullname": [fullname], 
-            "age_class": [age_class], 
-            "start_no": [start_no]
-        })
-        all_rows.append(row_data)
-
-    # Create final df
-    df = pd.concat(all_rows, axis=0,ignore_index=True)
-    return df
-
-
-def scrape_page(all_athlete_list, driver):
+def get_athlete_table(driver, page_source=None):
+    return parse_athlete_page(driver.page_source if page_source is None else page_source)
+
+
+def scrape_page(
+    all_athlete_list,
+    driver,
+    fetch_mode="browser",
+    headers=None,
+    job_store=None,
+    job=None,
+    timeout=DEFAULT_WAIT_TIMEOUT,
+    page_cache=None,
+    page_source=None,
+    base_url=None,
+    failed_urls=None
+):
+    # Fetch detail pages over HTTP, the browser is only used for the list page
+    if fetch_mode == "http":
+        return scrape_athletes_http(
+            all_athlete_list,
+            driver.page_source if page_source is None else page_source,
+            driver.current_url if base_url is None else base_url,
+            headers,
+            job_store=job_store,
+            job=job,
+            page_cache=page_cache,
+            failed_urls=failed_urls
+        )
+
     # Scrape name pages
-    count = len(driver.find_elements(By.CSS_SELECTOR, "h4.list-field.type-fullname"))
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    count = len(driver.find_elements(By.CSS_SELECTOR, ATHLETE_LIST_SELECTOR))
     print(f"Athletes found: {count}")
     index = 0
     while index < count:
         # Fetch the list of h4 elements on each iteration
-        h4_elements = driver.find_elements(By.CSS_SELECTOR, "h4.list-field.type-fullname")
-        
+        h4_elements = wait_for(
+            driver,
+            EC.presence_of_all_elements_located((By.CSS_SELECTOR, ATHLETE_LIST_SELECTOR)),
+            "athlete list",
+            timeout
+        )
+
         # Click on the h4 element at the current index
         link = h4_elements[index].find_element(By.TAG_NAME, 'a')
         link.click()
-        time.sleep(.5)
-        athlete_df = get_athlete_table(driver)
+        wait_for(driver, EC.staleness_of(link), "athlete navigate", timeout)
+        wait_for(driver, EC.presence_of_element_located((By.CSS_SELECTOR, SPLIT_TABLE_SELECTOR)), "athlete page", timeout)
+        athlete_source = driver.page_source
+        with SCRAPE_TIMER.step("athlete parse"):
+            athlete_df = get_athlete_table(driver, athlete_source)
+        if page_cache is not None:
+            event_id, season, page = job
+            page_cache.put(driver.current_url, athlete_source, "athlete", event_id=event_id, season=season, page=page)
         all_athlete_list.append(athlete_df)
         # Go back to the previous page
         driver.back()
@@ -106,89 +155,256 @@ def scrape_page(all_athlete_list, driver):
     return all_athlete_list
 
 
-def main(config, write=True):
-    # Start driver
-    driver = Driver(uc=True)
-    driver.get(config["hyrox_path"])
-    time.sleep(2)
-    # Get config selections
-    select_helper("event_main_group", config["city"], driver)
-    time.sleep(2)
-    select_helper("event", config["event"], driver)
-    time.sleep(.5)
-    select_helper("search[sex]", config["gender"], driver)
-    time.sleep(.5)
-    select_helper("num_results", config["results"], driver)
-    time.sleep(.5)
-    submit_button = driver.find_element(By.ID, "default-submit")
-    time.sleep(2)
+def start_driver():
+    from seleniumbase import Driver
+    return Driver(uc=True)
+
+
+def main(config, write=True, driver=None):
+    # Start driver, unless a long-lived one is passed in (worker pool)
+    own_driver = driver is None
+    if own_driver:
+        driver = start_driver()
+    try:
+        return scrape_event(config, driver, write)
+    finally:
+        if own_driver:
+            driver.quit()
+
+
+def scrape_event(config, driver, write=True):
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    timeout = config.get("wait_timeout", DEFAULT_WAIT_TIMEOUT)
+    with SCRAPE_TIMER.step("search page"):
+        driver.get(config["hyrox_path"])
+    # Get config selections, each select waits until its options are loaded
+    select_helper("event_main_group", config["city"], driver, timeout)
+    select_helper("event", config["event"], driver, timeout)
+    select_helper("search[sex]", config["gender"], driver, timeout)
+    select_helper("num_results", config["results"], driver, timeout)
+    submit_button = wait_for(driver, EC.element_to_be_clickable((By.ID, "default-submit")), "submit button", timeout)
     submit_button.click()
-    time.sleep(2)
+    wait_for_new_page(driver, submit_button, "list page", timeout)
+
+    # Reuse the browser session cookies for plain HTTP detail page requests
+    fetch_mode = config.get("fetch_mode", "http")
+    headers = get_session_headers(driver) if fetch_mode == "http" else None
+
+    # Summary mode keeps the list rows (name, age class, start number, finish
+    # time) and never opens an athlete page: one request per 100 athletes
+    scrape_mode = config.get("scrape_mode", "detail")
+
+    # Resume from the job store, completed pages are already in the export file.
+    # Without write the caller persists the results, so only athletes are checkpointed.
+    event_id = get_event_id(config)
+    job_id = get_job_id(config)
+    season = config["season"]
+    job_store = JobStore(config["job_store_path"]) if config.get("job_store_path") else None
+    completed_pages = set()
+    attempt = 0
+    if job_store is not None:
+        attempt = job_store.start_job(job_id, season, config["export_path"])
+        if write:
+            completed_pages = job_store.completed_pages(job_id, season)
+    write_mode = "a" if completed_pages else config["mode"]
+    # Raw list and athlete pages, so the results can be re-parsed without scraping.
+    # Summary rows are cheap to scrape again, so summary mode does not cache.
+    page_cache = None
+    if config.get("page_cache_dir") and scrape_mode == "detail":
+        page_cache = PageCache(config["page_cache_dir"])
 
     all_athlete_list = []
-    page = 1
-    cont = True
-    # Scrape all pages with selection
-    while page < 30:
+    failed_pages = []
+    # Athletes written (or returned) from each list page in this run
+    page_athletes = {}
+
+    def process_page(page, page_source, list_url):
+        # Scrape one results page and export it immediately
+        nonlocal write_mode
         print(f"page: {page}")
-        if page == 1:
-            all_athlete_list = scrape_page(all_athlete_list, driver)
-            page += 1
-        elif page == 2:
+        failed_urls = []
+        try:
+            if page_cache is not None:
+                page_cache.put(
+                    list_url, page_source, "list",
+                    event_id=event_id, season=season, page=page, export_path=config["export_path"]
+                )
+            if scrape_mode == "summary":
+                summary_df = parse_summary_page(page_source, list_url)
+                page_athlete_list = [summary_df] if len(summary_df) else []
+            else:
+                page_athlete_list = scrape_page(
+                    [], driver, fetch_mode, headers, job_store, (event_id, season, page),
+                    timeout=timeout, page_cache=page_cache, page_source=page_source, base_url=list_url,
+                    failed_urls=failed_urls
+                )
+        except Exception as e:
+            print(f"Failed page {page}: {e}")
+            failed_pages.append(page)
+            return
+        if failed_urls:
+            # Nothing is written: the scraped athletes are in the job store, and
+            # the next run fetches only the failed ones before writing the page
+            print(f"Failed page {page}: {len(failed_urls)} athletes not scraped")
+            failed_pages.append(page)
+            return
+        athletes = 0
+        if page_athlete_list:
+            page_df = pd.concat(page_athlete_list, axis=0, ignore_index=True)
+            page_df["event_id"] = event_id
+            page_df["season"] = season
+            athletes = len(page_df[["fullname", "start_no"]].drop_duplicates())
+            if write and scrape_mode == "summary":
+                write_summary(page_df, config["export_path"], write_mode)
+                write_mode = "a"
+            elif write:
+                page_df.to_csv(config["export_path"], mode=write_mode, index=False, header=False)
+                write_mode = "a"
+                if config.get("parquet_path"):
+                    from functions.results_store import write_results_parquet
+                    write_results_parquet(page_df, config["parquet_path"])
+            else:
+                all_athlete_list.append(page_df)
+        page_athletes[page] = athletes
+        if job_store is not None and write:
+            job_store.finish_page(job_id, season, page, athletes)
+
+    def load_list_page(url):
+        # Browser mode loads the page in the driver, so scrape_page can click through it
+        if fetch_mode == "http":
+            return fetch_url(url, headers)
+        with SCRAPE_TIMER.step("list page load"):
+            driver.get(url)
+        wait_for(driver, results_list_ready, "list page", timeout)
+        return driver.page_source
+
+    # The first list page says how many results there are, so every other
+    # page URL is known up front
+    first_url = driver.current_url
+    first_source = driver.page_source
+    plan = plan_list_pages(first_source, first_url, int(config["results"]))
+    if 1 in completed_pages:
+        print("Skipping completed page 1")
+    else:
+        process_page(1, first_source, first_url)
+    if plan["total"] is not None:
+        print(f"Results: {plan['total']} on {len(plan['urls']) + 1} pages")
+        todo = [(page, url) for page, url in enumerate(plan["urls"], start=2) if page not in completed_pages]
+        fetched = {}
+        if fetch_mode == "http":
+            # All list pages at once, fetch_pages keeps to the per-host rate limit
+            fetched = dict(zip([page for page, _ in todo], fetch_pages([url for _, url in todo], headers)))
+        for page, url in todo:
             try:
-                next_page_button = driver.find_element(By.CSS_SELECTOR, "li.pages-nav-button a:not([disabled])")
-                next_page_button.click()
-                time.sleep(1.25)
-                all_athlete_list = scrape_page(all_athlete_list, driver)
-                page+=1
-            except:
-                page+=1
-        else:
+                page_source = fetched[page] if fetch_mode == "http" else load_list_page(url)
+            except Exception as e:
+                print(f"Failed to load page {page}: {e}")
+                page_source = None
+            if page_source is None:
+                failed_pages.append(page)
+                continue
+            process_page(page, page_source, url)
+    else:
+        # No advertised total: follow the next page links one page at a time
+        print("Result total not found, following the page links")
+        page, page_source, url = 1, first_source, first_url
+        while page + 1 in (links := get_page_links(page_source, url)):
+            page, url = page + 1, links[page + 1]
             try:
-                # Get the current URL
-                current_url = driver.current_url
-                print(current_url)
-                # Regex to find the 'page=x' part of the URL and replace it with the new page number
-                new_page_number = f"page={page}"
-                if "page=" in current_url:
-                    # If 'page=' is already in the URL, replace it with the new page number
-                    new_url = re.sub(r"page=\d+", new_page_number, current_url)
-                    print(new_url)
-                else:
-                    # If 'page=' is not in the URL, add it
-                    new_url = current_url + f"&{new_page_number}"
-                # Navigate to the new URL
-                driver.get(new_url)
-                time.sleep(1.25)  # Adjust delay as needed
-                # Scrape the new page
-                all_athlete_list = scrape_page(all_athlete_list, driver)
-                # Increment page number
-                page += 1
+                page_source = load_list_page(url)
             except Exception as e:
                 print(f"Stopped on page {page} due to error: {e}")
-                page = 30
-            
-    # Create and export csv
-    all_athlete_df = pd.concat(all_athlete_list, axis=0, ignore_index=True)
-    all_athlete_df["event_id"] = config["city"] + "_" + config["event"] + "_" + config["gender"]
-    all_athlete_df["season"] = config["season"]
-    if write:
-        all_athlete_df.to_csv(config["export_path"], mode=config["mode"], index=False, header=False)
-    else:
-        return all_athlete_df
-    driver.close()
+                failed_pages.append(page)
+                break
+            if page in completed_pages:
+                print(f"Skipping completed page {page}")
+                continue
+            process_page(page, page_source, url)
+
+    # Every advertised result should have been scraped. Pages completed in an
+    # earlier run count the same way, with the athletes written from them.
+    incomplete = False
+    if plan["total"] is not None:
+        earlier = job_store.page_athletes(job_id, season) if job_store is not None and write else {}
+        collected = sum(page_athletes.values()) + sum(earlier.get(page, 0) for page in completed_pages)
+        incomplete = collected != plan["total"]
+        print(f"Collected {collected} of {plan['total']} results" + (" (incomplete)" if incomplete else ""))
+
+    if page_cache is not None:
+        page_cache.close()
+    if job_store is not None:
+        if write:
+            for page in failed_pages:
+                job_store.fail_page(job_id, season, page)
+        if write or failed_pages:
+            status = "incomplete" if failed_pages or incomplete else "done"
+            if status == "incomplete":
+                # Completed pages are skipped on the next run, so only the failed
+                # ones are retried; a page that keeps failing closes the job
+                max_attempts = config.get("max_attempts", DEFAULT_MAX_JOB_ATTEMPTS)
+                if attempt >= max_attempts:
+                    status = "failed"
+                    pages = job_store.failed_pages(job_id, season) if write else sorted(failed_pages)
+                    print(f"Job {job_id} failed after {attempt} attempts, failed pages: {pages}")
+                else:
+                    print(f"Job {job_id} incomplete after attempt {attempt} of {max_attempts}")
+            job_store.finish_job(job_id, season, status)
+        job_store.close()
+    if failed_pages and not write:
+        raise RuntimeError(f"Failed to scrape pages {failed_pages}")
+    if not write:
+        if not all_athlete_list:
+            return pd.DataFrame()
+        return pd.concat(all_athlete_list, axis=0, ignore_index=True)
 
 
 # ------------------ Scraping Functions
-def scrape_multiple_events(
-    df,
-    division,
-    gender,
-    season="2023-2024",
-    mode="a",
-    results_url="https://results.hyrox.com/season-6/&lang=EN_CAP"
-):
+def mark_job_done(config):
+    if not config.get("job_store_path"):
+        return
+    job_store = JobStore(config["job_store_path"])
+    job_store.finish_job(get_job_id(config), config["season"])
+    job_store.close()
+
+
+def skip_job(config, retry_failed=False):
+    """
+    Whether a job needs no run: it is done, or it failed after using up its
+    retry budget. Failed jobs are reported with their failed pages, and with
+    retry_failed they get a new budget instead.
+    """
+    if not config.get("job_store_path"):
+        return False
+    job_id, season = get_job_id(config), config["season"]
+    job_store = JobStore(config["job_store_path"])
+    status = job_store.job_status(job_id, season)
+    if status not in (None, "done", "failed"):
+        # A run that crashed before finishing the job still used up an attempt
+        if job_store.job_attempts(job_id, season) >= config.get("max_attempts", DEFAULT_MAX_JOB_ATTEMPTS):
+            job_store.finish_job(job_id, season, "failed")
+            status = "failed"
+    if status == "failed" and retry_failed:
+        job_store.reopen_job(job_id, season)
+        status = "incomplete"
+    if status == "done":
+        print(f"Skipping completed job: {config}")
+    elif status == "failed":
+        print(
+            f"Skipping failed job {job_id} ({job_store.job_attempts(job_id, season)} attempts), "
+            f"failed pages: {job_store.failed_pages(job_id, season)}; --retry-failed runs it again"
+        )
+    job_store.close()
+    return status in ("done", "failed")
+
 
+def get_division_event(division, gender):
+    """
+    Name of a division on the results site and the results CSV it is scraped to.
+
+    Returns:
+    (event, export_path)
+    """
     if division == "pro":
         event = "HYROX PRO"
         export_path = f"data/hyrox_results_pro.csv"
@@ -207,7 +423,32 @@ def scrape_multiple_events(
     if division == "pro doubles":
         event = "HYROX PRO DOUBLES"
         export_path = f"data/hyrox_results_{division}_{gender}.csv"
+    return event, export_path
+
+
+def scrape_multiple_events(
+    df,
+    division,
+    gender,
+    season="2023-2024",
+    mode="a",
+    results_url="https://results.hyrox.com/season-6/&lang=EN_CAP",
+    fetch_mode="http",
+    job_store_path=DEFAULT_JOB_STORE_PATH,
+    num_workers=1,
+    wait_timeout=DEFAULT_WAIT_TIMEOUT,
+    parquet_path=None,
+    page_cache_dir=DEFAULT_PAGE_CACHE_DIR,
+    scrape_mode="detail",
+    max_attempts=DEFAULT_MAX_JOB_ATTEMPTS,
+    retry_failed=False
+):
 
+    event, export_path = get_division_event(division, gender)
+    if scrape_mode == "summary":
+        export_path = get_summary_path(export_path)
+
+    configs = []
     for i in df.index:
         event_name = df.iat[i,0]
         config = {
@@ -218,10 +459,35 @@ def scrape_multiple_events(
             "season": season,
             "hyrox_path": results_url,
             "mode": mode, # 'a' or 'w'
-            "export_path": export_path
+            "export_path": export_path,
+            "fetch_mode": fetch_mode, # 'http' or 'browser'
+            "job_store_path": job_store_path, # None disables resuming
+            "wait_timeout": wait_timeout, # seconds, doubled on each retry
+            "parquet_path": parquet_path, # also write to the Parquet results store
+            "page_cache_dir": page_cache_dir, # raw pages for re-parsing, None disables
+            "scrape_mode": scrape_mode, # 'detail' or 'summary' (list pages only)
+            "max_attempts": max_attempts # runs of the job before it is marked failed
         }
+        if skip_job(config, retry_failed):
+            continue
+        configs.append(config)
+
+    if num_workers > 1:
+        # Parallel browsers, results are written by this process only
+        failed = run_worker_pool(
+            configs,
+            partial(scrape_event, write=False),
+            start_driver,
+            num_workers=num_workers,
+            on_complete=mark_job_done
+        )
+        print(f"Failed events: {[config['city'] for config in failed]}")
+        SCRAPE_TIMER.report()
+        return
+    for config in configs:
         print(f"Scraping: {config}")
         main(config)
+    SCRAPE_TIMER.report()
 
 
 def scrape_single_event_all_divisions(
@@ -229,9 +495,24 @@ def scrape_single_event_all_divisions(
     season="2023-2024",
     mode="a",
     results_url="https://results.hyrox.com/season-6/&lang=EN_CAP",
-    write_results=True
+    write_results=True,
+    fetch_mode="http",
+    job_store_path=DEFAULT_JOB_STORE_PATH,
+    wait_timeout=DEFAULT_WAIT_TIMEOUT,
+    parquet_path=None,
+    page_cache_dir=DEFAULT_PAGE_CACHE_DIR,
+    scrape_mode="detail",
+    max_attempts=DEFAULT_MAX_JOB_ATTEMPTS,
+    retry_failed=False
 ):
+    """
+    Scrapes every division of one event. A division that fails is reported and
+    the others are still scraped.
 
+    Returns:
+    With write_results=False, dict of division (e.g. "Pro Men") -> scraped
+    DataFrame for the divisions that succeeded; otherwise an empty dict.
+    """
     divisions = {
         "Pro Men": {"name": "HYROX PRO", "gender": "Men", "file": "data/hyrox_results_pro.csv"},
         "Pro Women": {"name": "HYROX PRO", "gender": "Women", "file": "data/hyrox_results_pro.csv"},
@@ -241,6 +522,8 @@ def scrape_single_event_all_divisions(
         "Open Women": {"name": "HYROX", "gender": "Women", "file": "data/hyrox_results_open_Women.csv"},
     }
 
+    division_results = {}
+    failed = []
     for key, value in divisions.items():
         config = {
             "city": city,
@@ -250,32 +533,93 @@ def scrape_single_event_all_divisions(
             "season": season,
             "hyrox_path": results_url,
             "mode": mode, # 'a' or 'w'
-            "export_path": value["file"]
+            "export_path": get_summary_path(value["file"]) if scrape_mode == "summary" else value["file"],
+            "fetch_mode": fetch_mode, # 'http' or 'browser'
+            "job_store_path": job_store_path, # None disables resuming
+            "wait_timeout": wait_timeout, # seconds, doubled on each retry
+            "parquet_path": parquet_path, # also write to the Parquet results store
+            "page_cache_dir": page_cache_dir, # raw pages for re-parsing, None disables
+            "scrape_mode": scrape_mode, # 'detail' or 'summary' (list pages only)
+            "max_attempts": max_attempts # runs of the job before it is marked failed
         }
+        if skip_job(config, retry_failed):
+            continue
         print(f"Scraping: {config}")
-        #main(config, write=write_results)
+        try:
+            results = main(config, write=write_results)
+        except Exception as e:
+            print(f"Failed division {key}: {e}")
+            failed.append(key)
+            continue
+        if not write_results:
+            division_results[key] = results
+    if failed:
+        print(f"Failed divisions: {failed}")
+    SCRAPE_TIMER.report()
+    return division_results
 
-# ------------------ Process
 
-event_list = [
-    "2024 Amsterdam"
-]
-scrape_events = hyrox_events[hyrox_events["Event Name"].isin(event_list)].reset_index(drop=True)
+def scrape_athlete_details(summary_path, athletes, export_path=None, cities=None, headers=None):
+    """
+    Scrapes the detail pages (splits) of chosen athletes from a summary table,
+    instead of every athlete of their events.
 
-scrape_multiple_events(
-    scrape_events,
-    "HYROX ELITE - Thursday",
-    "Men",
-    season="2024-2025",
-    mode="a",
-    results_url="https://results.hyrox.com/season-7/&lang=EN_CAP"
-)
+    Args:
+    summary_path: Summary CSV written by a summary mode scrape.
+    athletes: Athlete names, with or without the nationality, e.g. "Doe, John".
+    export_path: Results CSV the rows are appended to, defaults to the one next to summary_path.
+    cities: Optional list of event names (e.g. "2024 Amsterdam") to restrict to.
+    headers: Request headers, usually from get_session_headers.
+
+    Returns:
+    The scraped rows.
+    """
+    summary = load_summary(summary_path)
+    chosen = summary[summary["fullname"].isin(athletes) | get_clean_names(summary["fullname"]).isin(athletes)]
+    if cities is not None:
+        chosen = chosen[chosen["event_id"].str.split("_").str[0].isin(cities)]
+    chosen = chosen[chosen["detail_url"].notna()].drop_duplicates("detail_url").reset_index(drop=True)
+    print(f"Athlete results found: {len(chosen)}")
+    if chosen.empty:
+        return pd.DataFrame()
+
+    athlete_list = []
+    for row, page_source in zip(chosen.itertuples(index=False), fetch_pages(list(chosen["detail_url"]), headers)):
+        if page_source is None:
+            print(f"Failed athlete page: {row.detail_url}")
+            continue
+        athlete_df = parse_athlete_page(page_source)
+        athlete_df["event_id"] = row.event_id
+        athlete_df["season"] = row.season
+        athlete_list.append(athlete_df)
+    if not athlete_list:
+        return pd.DataFrame()
+    athlete_results = pd.concat(athlete_list, axis=0, ignore_index=True)
+    athlete_results.to_csv(export_path or get_results_path(summary_path), mode="a", index=False, header=False)
+    return athlete_results
+
+# ------------------ Process
+if __name__ == "__main__":
+    hyrox_events = pd.read_csv("data/hyrox_events.csv")
+    event_list = [
+        "2024 Amsterdam"
+    ]
+    scrape_events = hyrox_events[hyrox_events["Event Name"].isin(event_list)].reset_index(drop=True)
+
+    scrape_multiple_events(
+        scrape_events,
+        "HYROX ELITE - Thursday",
+        "Men",
+        season="2024-2025",
+        mode="a",
+        results_url="https://results.hyrox.com/season-7/&lang=EN_CAP"
+    )
 
-#scrape_multiple_events(
-#    scrape_events,
-#    "pro",
-#    "Women",
-#    season="2023-2024",
-#    mode="a",
-#    results_url="https://results.hyrox.com/season-6/&lang=EN_CAP"
-#)
\ No newline at end of file
+    #scrape_multiple_events(
+    #    scrape_events,
+    #    "pro",
+    #    "Women",
+    #    season="2023-2024",
+    #    mode="a",
+    #    results_url="https://results.hyrox.com/season-6/&lang=EN_CAP"
+    #)
\ No newline at end of file
@@ -0,0 +1,9 @@
+# ------------------ Imports
+import sys
+from pathlib import Path
+
+# Tests import the repo modules, and the synthetic pages and results of benchmarks/
+root_directory = Path(__file__).parent.parent
+for directory in [root_directory, root_directory / "benchmarks"]:
+    if str(directory) not in sys.path:
+        sys.path.append(str(directory))
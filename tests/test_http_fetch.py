@@ -0,0 +1,124 @@
+# Fetch engine of the HTTP scrape mode (functions/scrape_functions.py) against a
+# local results site serving detail pages with a fixed per-request latency.
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import pytest
+from bench_athlete_parser import make_detail_page
+from functions.scrape_functions import fetch_pages, fetch_url, parse_athlete_pages, scrape_athletes_http
+
+LATENCY = 0.01
+FLAKY_FAILURES = 2
+FLAKY_ATHLETE = "flaky"
+BROKEN_ATHLETE = "broken"
+RETRIES = 2
+# The site's own latency, unaffected when a test replaces time.sleep
+site_sleep = time.sleep
+
+
+def make_list_page(athlete_ids):
+    rows = "".join(
+        f'<li class="list-group-item"><h4 class="list-field type-fullname">'
+        f'<a href="?content=detail&amp;idp={athlete_id}">Athlete</a></h4></li>'
+        for athlete_id in athlete_ids
+    )
+    return f'<html><body><ul class="list-group">{rows}</ul></body></html>'
+
+
+@pytest.fixture
+def site():
+    """
+    (request times per athlete id, base url) of a local results site. The flaky
+    athlete answers 503 FLAKY_FAILURES times before its page, the broken one
+    always answers 500.
+    """
+    requests = defaultdict(list)
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            athlete_id = parse_qs(urlparse(self.path).query)["idp"][0]
+            with lock:
+                requests[athlete_id].append(time.monotonic())
+                attempts = len(requests[athlete_id])
+            site_sleep(LATENCY)
+            if athlete_id == BROKEN_ATHLETE or (athlete_id == FLAKY_ATHLETE and attempts <= FLAKY_FAILURES):
+                self.send_response(503 if athlete_id == FLAKY_ATHLETE else 500)
+                self.end_headers()
+                return
+            body = make_detail_page(0 if athlete_id == FLAKY_ATHLETE else int(athlete_id)).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield requests, f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+    server.server_close()
+
+
+def detail_url(base_url, athlete_id):
+    return f"{base_url}?content=detail&idp={athlete_id}"
+
+
+def test_scraped_rows_equal_parsed_pages(site):
+    requests, base_url = site
+    athlete_ids = [str(i) for i in range(40)]
+    athlete_list = scrape_athletes_http([], make_list_page(athlete_ids), base_url, requests_per_second=None)
+    expected = parse_athlete_pages(make_detail_page(int(athlete_id)) for athlete_id in athlete_ids)
+    pd.testing.assert_frame_equal(athlete_list[0], expected)
+    assert all(len(requests[athlete_id]) == 1 for athlete_id in athlete_ids)
+
+
+def test_server_errors_retried_with_backoff(site):
+    requests, base_url = site
+    page = fetch_url(detail_url(base_url, FLAKY_ATHLETE), retries=RETRIES)
+    assert page == make_detail_page(0)
+    times = requests[FLAKY_ATHLETE]
+    assert len(times) == FLAKY_FAILURES + 1
+    # fetch_url waits 0.5 * 2 ** (n - 1) seconds before retry n
+    for attempt in range(1, FLAKY_FAILURES + 1):
+        assert times[attempt] - times[attempt - 1] >= 0.5 * 2 ** (attempt - 1)
+
+
+def test_failed_page_reported_and_others_kept(site, capsys, monkeypatch):
+    requests, base_url = site
+    # Backoff is checked above, skip the waits here
+    backoffs = []
+    monkeypatch.setattr(time, "sleep", backoffs.append)
+    urls = [detail_url(base_url, athlete_id) for athlete_id in ["1", BROKEN_ATHLETE, "2"]]
+    pages = fetch_pages(urls, retries=RETRIES, requests_per_second=None)
+    assert pages == [make_detail_page(1), None, make_detail_page(2)]
+    assert len(requests[BROKEN_ATHLETE]) == RETRIES + 1
+    assert backoffs == [0.5 * 2 ** (attempt - 1) for attempt in range(1, RETRIES + 1)]
+
+    failed_urls = []
+    athlete_list = scrape_athletes_http(
+        [], make_list_page(["3", BROKEN_ATHLETE, "4"]), base_url,
+        requests_per_second=None, failed_urls=failed_urls
+    )
+    assert failed_urls == [detail_url(base_url, BROKEN_ATHLETE)]
+    pd.testing.assert_frame_equal(athlete_list[0], parse_athlete_pages([make_detail_page(3), make_detail_page(4)]))
+    # Only the HTTP error is reported for the failed page, it is never parsed
+    assert "NoneType" not in capsys.readouterr().out
+
+
+def test_requests_per_host_rate_limited(site):
+    requests, base_url = site
+    requests_per_second = 50.0
+    athlete_ids = [str(i) for i in range(10)]
+    fetch_pages([detail_url(base_url, athlete_id) for athlete_id in athlete_ids],
+                requests_per_second=requests_per_second)
+    starts = sorted(requests[athlete_id][0] for athlete_id in athlete_ids)
+    # Small allowance for the time between the limiter and the server reading the request
+    assert min(later - earlier for earlier, later in zip(starts, starts[1:])) >= 1 / requests_per_second - 0.005
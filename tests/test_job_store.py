@@ -0,0 +1,82 @@
+# Retry budget of scraping jobs (functions/job_store.py, scraper.skip_job): a job
+# that keeps ending incomplete is marked failed and no longer picked up.
+import sqlite3
+
+from functions.job_store import JobStore
+from scraper import skip_job
+
+JOB_ID = "2024 City_HYROX_Men"
+SEASON = "2024-2025"
+
+
+def make_config(job_store_path, max_attempts=3):
+    return {
+        "city": "2024 City",
+        "event": "HYROX",
+        "gender": "Men",
+        "season": SEASON,
+        "job_store_path": str(job_store_path),
+        "max_attempts": max_attempts
+    }
+
+
+def test_attempts_counted_and_failed_pages_recorded(tmp_path):
+    job_store = JobStore(str(tmp_path / "jobs.sqlite"))
+    assert [job_store.start_job(JOB_ID, SEASON) for _ in range(3)] == [1, 2, 3]
+    job_store.finish_page(JOB_ID, SEASON, 1, 100)
+    job_store.fail_page(JOB_ID, SEASON, 3)
+    job_store.fail_page(JOB_ID, SEASON, 2)
+    assert job_store.failed_pages(JOB_ID, SEASON) == [2, 3]
+    # A page scraped on a later attempt is no longer failed
+    job_store.finish_page(JOB_ID, SEASON, 2, 100)
+    assert job_store.failed_pages(JOB_ID, SEASON) == [3]
+    job_store.close()
+
+
+def test_failed_job_skipped_until_retried(tmp_path, capsys):
+    path = tmp_path / "jobs.sqlite"
+    job_store = JobStore(str(path))
+    job_store.start_job(JOB_ID, SEASON)
+    job_store.fail_page(JOB_ID, SEASON, 4)
+    job_store.finish_job(JOB_ID, SEASON, "incomplete")
+    assert not skip_job(make_config(path))
+
+    job_store.finish_job(JOB_ID, SEASON, "failed")
+    assert skip_job(make_config(path))
+    assert "failed pages: [4]" in capsys.readouterr().out
+
+    # A new budget, the completed pages are kept
+    assert not skip_job(make_config(path), retry_failed=True)
+    assert job_store.job_status(JOB_ID, SEASON) == "incomplete"
+    assert job_store.job_attempts(JOB_ID, SEASON) == 0
+    assert job_store.failed_pages(JOB_ID, SEASON) == [4]
+    job_store.close()
+
+
+def test_crashed_runs_use_up_the_budget(tmp_path):
+    # Runs that never finished leave the job running
+    path = tmp_path / "jobs.sqlite"
+    job_store = JobStore(str(path))
+    for _ in range(2):
+        job_store.start_job(JOB_ID, SEASON)
+    assert not skip_job(make_config(path))
+    job_store.start_job(JOB_ID, SEASON)
+    assert skip_job(make_config(path))
+    assert job_store.job_status(JOB_ID, SEASON) == "failed"
+    job_store.close()
+
+
+def test_job_store_without_attempts_column(tmp_path):
+    path = tmp_path / "jobs.sqlite"
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE jobs (event_id TEXT NOT NULL, season TEXT NOT NULL, export_path TEXT, "
+        "status TEXT NOT NULL, updated_at REAL NOT NULL, PRIMARY KEY (event_id, season))"
+    )
+    conn.execute("INSERT INTO jobs VALUES (?, ?, NULL, 'incomplete', 0)", (JOB_ID, SEASON))
+    conn.commit()
+    conn.close()
+    job_store = JobStore(str(path))
+    assert job_store.job_attempts(JOB_ID, SEASON) == 0
+    assert job_store.start_job(JOB_ID, SEASON) == 1
+    job_store.close()
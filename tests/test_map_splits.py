@@ -0,0 +1,23 @@
+# Vectorized map_splits (functions/data_functions.py) against the original row-wise apply.
+import pandas as pd
+from bench_map_splits import legacy_map_splits, make_split_rows
+from functions.data_functions import NO_ROXZONE_LIST, map_splits
+
+
+def test_equal_to_row_wise_apply():
+    # Roxzone and no-Roxzone events, and athletes with an extra (Unknown) split
+    rows = make_split_rows(num_rows=5_000, athletes_per_event=20)
+    assert rows["event_id"].isin(NO_ROXZONE_LIST).any()
+    pd.testing.assert_frame_equal(map_splits(rows.copy()), legacy_map_splits(rows.copy()))
+
+
+def test_split_names_by_event_layout():
+    rows = pd.DataFrame({
+        "event_id": pd.array(["2024 City_HYROX_Men"] * 31 + [NO_ROXZONE_LIST[0]] * 3, dtype="string"),
+        "race_person_id": pd.array(["a"] * 31 + ["b"] * 3, dtype="string")
+    })
+    split_names = map_splits(rows)["split_name"].tolist()
+    assert split_names[:3] == ["Run-1", "Post-Run-1-Rox", "SkiErg"]
+    assert split_names[29:31] == ["Wallballs", "Unknown"]
+    assert split_names[31:] == ["Run-1", "SkiErg", "Run-2"]
+
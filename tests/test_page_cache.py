@@ -0,0 +1,38 @@
+# List pages of the raw page cache (functions/page_cache.py) that reparse_results rebuilds from.
+from functions.page_cache import PageCache
+
+EVENT_ID = "2024 City_HYROX_Men"
+SEASON = "2024-2025"
+
+
+def put_list_page(cache, page, scrape_date):
+    cache.put(
+        f"https://results.example/?event={EVENT_ID}&page={page}",
+        f"<html>page {page} of {scrape_date}</html>",
+        "list",
+        event_id=EVENT_ID,
+        season=SEASON,
+        page=page,
+        export_path="results.csv",
+        scrape_date=scrape_date
+    )
+
+
+def test_resumed_scrape_keeps_pages_of_earlier_days(tmp_path):
+    cache = PageCache(str(tmp_path), max_bytes=None)
+    # Pages 1-3 on the first day, the resumed scrape re-fetched page 3 and added page 4
+    for page in [1, 2, 3]:
+        put_list_page(cache, page, "2025-01-01")
+    for page in [3, 4]:
+        put_list_page(cache, page, "2025-01-02")
+
+    list_pages = cache.get_list_pages()
+    assert list_pages["page"].tolist() == [1, 2, 3, 4]
+    sources = [cache.read(content_hash) for content_hash in list_pages["content_hash"]]
+    assert sources == [
+        "<html>page 1 of 2025-01-01</html>",
+        "<html>page 2 of 2025-01-01</html>",
+        "<html>page 3 of 2025-01-02</html>",
+        "<html>page 4 of 2025-01-02</html>"
+    ]
+    cache.close()
@@ -0,0 +1,91 @@
+# Streaming cleaner (functions/stream_clean.py): identical to get_clean_results,
+# and peak memory bounded by the chunk size rather than the file.
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pytest
+from bench_results_store import make_results_csv
+from functions.data_functions import get_clean_results
+from functions.stream_clean import read_clean_results, stream_clean_results
+
+# Peak memory allowed for streaming the memory test file, above the interpreter and imports
+MEMORY_CEILING_MB = 100
+MEMORY_TEST_EVENTS = 20
+MEMORY_TEST_ATHLETES = 500
+MEMORY_TEST_CHUNKSIZE = 20_000
+
+
+def _peak_mb():
+    # Peak resident memory of this process. Unlike ru_maxrss, it starts over at
+    # exec, so a spawned process does not inherit the peak of the test runner.
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    raise RuntimeError("No VmHWM in /proc/self/status")
+
+
+def _streaming_peak(csv_path, output_path):
+    start_mb = _peak_mb()
+    stream_clean_results(csv_path, output_path, chunksize=MEMORY_TEST_CHUNKSIZE)
+    return _peak_mb() - start_mb
+
+
+def _in_memory_peak(csv_path):
+    start_mb = _peak_mb()
+    get_clean_results(csv_path)
+    return _peak_mb() - start_mb
+
+
+def in_fresh_process(fn, *args):
+    # A new interpreter per run, so every peak is measured from the same start
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(fn, *args).result()
+
+
+@pytest.fixture
+def results_csv(tmp_path):
+    path = tmp_path / "results.csv"
+    results = make_results_csv(path, num_events=4, athletes_per_event=25)
+    # A bad time, a missing time, a page scraped twice and two athletes of the same name in one event
+    results.loc[[5, 700], "time"] = "bad"
+    results.loc[[40], "time"] = None
+    same_name = results["fullname"] == results["fullname"].iloc[30]
+    results.loc[same_name, "fullname"] = results["fullname"].iloc[0]
+    results = pd.concat([results, results.iloc[300:330]], ignore_index=True)
+    results.to_csv(path, index=False)
+    return path, results
+
+
+@pytest.mark.parametrize("chunksize", [7, 1_000, 1_000_000])
+def test_identical_to_get_clean_results(results_csv, tmp_path, chunksize):
+    path, _ = results_csv
+    stream_clean_results(path, tmp_path / "clean.parquet", chunksize=chunksize)
+    pd.testing.assert_frame_equal(read_clean_results(tmp_path / "clean.parquet"), get_clean_results(path))
+
+
+def test_identical_with_filters(results_csv, tmp_path):
+    path, _ = results_csv
+    filters = {"season": ["2023-2024"]}
+    stream_clean_results(path, tmp_path / "clean.parquet", chunksize=333, filters=filters)
+    pd.testing.assert_frame_equal(read_clean_results(tmp_path / "clean.parquet"), get_clean_results(path, filters))
+
+
+def test_ungrouped_results_raise(results_csv, tmp_path):
+    path, results = results_csv
+    # An athlete's rows reappearing later with different times
+    pd.concat([results, results.iloc[300:310].assign(time="00:01:00")]).to_csv(path, index=False)
+    with pytest.raises(ValueError, match="not grouped by athlete"):
+        stream_clean_results(path, tmp_path / "clean.parquet", chunksize=500)
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="Peak memory is read from /proc")
+def test_peak_memory_under_ceiling(tmp_path):
+    csv_path = tmp_path / "results.csv"
+    make_results_csv(csv_path, num_events=MEMORY_TEST_EVENTS, athletes_per_event=MEMORY_TEST_ATHLETES)
+    streaming_mb = in_fresh_process(_streaming_peak, csv_path, tmp_path / "clean.parquet")
+    in_memory_mb = in_fresh_process(_in_memory_peak, csv_path)
+    assert streaming_mb <= MEMORY_CEILING_MB, f"Streaming peak {streaming_mb:.0f} MB"
+    assert streaming_mb < in_memory_mb / 2, f"Streaming peak {streaming_mb:.0f} MB, in memory {in_memory_mb:.0f} MB"
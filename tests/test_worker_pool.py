@@ -0,0 +1,101 @@
+# Worker pool of the parallel scrape (functions/worker_pool.py) with a fake
+# browser serving synthetic athlete detail pages, in real spawned workers.
+import os
+import uuid
+from pathlib import Path
+
+import pandas as pd
+from bench_athlete_parser import make_detail_page
+from functions.scrape_functions import ATHLETE_COLUMNS, parse_athlete_pages
+from functions.worker_pool import run_worker_pool, write_results
+
+ATHLETES_PER_EVENT = 3
+SPLITS_PER_ATHLETE = 30
+
+
+class FakeDriver:
+    """
+    Stands in for a browser session: get() loads the detail page of the
+    athlete in the url into page_source.
+    """
+    def __init__(self):
+        self.driver_id = uuid.uuid4().hex
+        self.page_source = None
+
+    def get(self, url):
+        self.page_source = make_detail_page(int(url.rsplit("=", 1)[1]))
+
+    def quit(self):
+        pass
+
+
+def scrape_fixture_event(config, driver):
+    # Tasks flagged fail_once / die_once raise / kill the worker on their first attempt
+    marker = Path(config["marker_dir"]) / config["city"]
+    if config.get("fail_once") and not marker.exists():
+        marker.write_text(driver.driver_id)
+        raise RuntimeError("browser crashed")
+    if config.get("die_once") and not marker.exists():
+        marker.touch()
+        os._exit(1)
+    if config.get("always_fail"):
+        raise RuntimeError("event page missing")
+    pages = []
+    for athlete_num in config["athletes"]:
+        driver.get(f"https://results.example/?content=detail&idp={athlete_num}")
+        pages.append(driver.page_source)
+    df = parse_athlete_pages(pages)
+    df["event_id"] = config["city"]
+    df["driver_id"] = driver.driver_id
+    return df
+
+
+def make_config(tmp_path, event_num, **flags):
+    first = event_num * ATHLETES_PER_EVENT
+    return {
+        "city": f"2024 City {event_num}",
+        "athletes": list(range(first, first + ATHLETES_PER_EVENT)),
+        "export_path": str(tmp_path / "results.csv"),
+        "mode": "w",
+        "marker_dir": str(tmp_path),
+        **flags
+    }
+
+
+def test_pool_retries_replaces_workers_and_writes_once(tmp_path):
+    configs = [make_config(tmp_path, event_num) for event_num in range(4)] + [
+        make_config(tmp_path, 4, fail_once=True),
+        make_config(tmp_path, 5, die_once=True),
+        make_config(tmp_path, 6, always_fail=True)
+    ]
+    completed = []
+    failed = run_worker_pool(
+        configs,
+        scrape_fixture_event,
+        FakeDriver,
+        num_workers=2,
+        max_attempts=2,
+        writer=write_results,
+        on_complete=lambda config: completed.append(config["city"]),
+        poll_seconds=0.1
+    )
+
+    assert [config["city"] for config in failed] == ["2024 City 6"]
+    assert sorted(completed) == [f"2024 City {event_num}" for event_num in range(6)]
+
+    # One writer: every event written once, its rows together, equal to parsing its pages
+    results = pd.read_csv(
+        tmp_path / "results.csv", names=ATHLETE_COLUMNS + ["event_id", "driver_id"], dtype="string"
+    )
+    event_ids = results["event_id"]
+    assert event_ids.value_counts().to_dict() == {city: ATHLETES_PER_EVENT * SPLITS_PER_ATHLETE for city in completed}
+    assert (event_ids != event_ids.shift(fill_value="")).sum() == len(completed)
+    for config in configs[:6]:
+        rows = results.loc[event_ids == config["city"], ATHLETE_COLUMNS].reset_index(drop=True)
+        expected = parse_athlete_pages(make_detail_page(athlete_num) for athlete_num in config["athletes"])
+        pd.testing.assert_frame_equal(rows, expected.astype("string"))
+
+    # The task that crashed its browser was retried on a new one
+    crashed_driver = (tmp_path / "2024 City 4").read_text()
+    retried_driver = results.loc[event_ids == "2024 City 4", "driver_id"].iloc[0]
+    assert retried_driver != crashed_driver